@@ -1,13 +1,15 @@
 import sys
 import signal
 import dotenv
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QTimer
-from src.desktop_pet import DesktopPet
 
 dotenv.load_dotenv()
 
 def main():
+    # Imported here: scan pool workers re-import this module when they spawn.
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+    from src.desktop_pet import DesktopPet
+
     app = QApplication(sys.argv)
 
     signal.signal(signal.SIGINT, lambda sig, frame: app.quit())
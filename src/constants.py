@@ -10,7 +10,11 @@ IMAGE_DIR = ASSETS_DIR / "images"
 MUSIC_DIR = ASSETS_DIR / "music"
 FONTS_DIR = ASSETS_DIR / "fonts"
 SFX_DIR = ASSETS_DIR / "sfx"
+PLAYLIST_DIR = ASSETS_DIR / "playlists"
 
 CONFIG_FILE = BASE_DIR / "config.json"
+CACHE_DIR = BASE_DIR / ".cache"
+LIBRARY_DB_FILE = CACHE_DIR / "library.sqlite3"
+ART_CACHE_DIR = CACHE_DIR / "art"
 ENV_FILE = BASE_DIR / ".env"
 LOGO_ICON = IMAGE_DIR / "logo.png"
\ No newline at end of file
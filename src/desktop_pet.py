@@ -7,21 +7,77 @@ import json
 from random import choice, random, randint
 from datetime import datetime
 from PySide6.QtWidgets import (QApplication, QWidget,
-                               QLabel, QVBoxLayout,
-                               QDialog)
-from PySide6.QtGui import (QPixmap, QMovie, QAction, QFont)
-from PySide6.QtCore import (Qt, QTimer, QUrl)
-from PySide6.QtMultimedia import (QMediaPlayer, QAudioOutput)
+                               QLabel, QVBoxLayout)
+from PySide6.QtGui import (QMovie, QAction, QFont)
+from PySide6.QtCore import Qt
 
 from .tray_menu import TrayMenuManager
 from .help import HelpDialog
-from .music_player import MusicPlayerWindow
-from .music_player.constants import NO_ART_IMAGE_PATH
-from .music_player.utils import format_artist_display, format_title_display
+from .music_player.constants import CROSSFADE_MS, GAPLESS_PLAYBACK, LOUDNESS_NORMALIZATION
 from .onboarding import SpeechBubble, RatingDialog
 from .chat import ChatWindow
 from .pomodoro import PomodoroWindow
 from .constants import (IMAGE_DIR, CONFIG_FILE, LOGO_ICON)
+from .sprites import shared_sprites
+from .scheduler import FrameScheduler
+from .state_machine import StateMachine
+
+# Dancing: minimum music level to start, bounce height in pixels, and how
+# long the dance lingers after the music goes quiet.
+DANCE_MIN_LEVEL = 0.25
+DANCE_BOUNCE_PX = 10
+DANCE_LINGER_MS = 1500
+# The spectrum taps audio before the volume is applied; below this output volume
+# (or while muted) the music is treated as inaudible.
+DANCE_MIN_VOLUME = 0.05
+
+# Walking and wagging frame times in ms; while music with a known beat grid
+# plays, frames land on the nearest subdivision of the beat instead.
+WALK_FRAME_MS = 150
+WAG_FRAME_MS = 300
+BEAT_MIN_STEP_MS = 20
+
+# While hidden the pet keeps living, but every delay stretches by this factor.
+HIDDEN_THROTTLE = 4.0
+
+# State -> states it may move to. Being picked up interrupts anything but
+# the intro; dancing starts from walking, pausing or wagging.
+PET_STATES = {
+    'intro': ('walking',),
+    'walking': ('idling_before_sleep', 'pausing', 'turning', 'wondering', 'wagging', 'dancing', 'shock'),
+    'idling_before_sleep': ('sleeping', 'shock'),
+    'sleeping': ('waking_up', 'shock'),
+    'waking_up': ('walking', 'shock'),
+    'pausing': ('walking', 'dancing', 'shock'),
+    'turning': ('walking', 'shock'),
+    'wondering': ('walking', 'shock'),
+    'wagging': ('walking', 'dancing', 'shock'),
+    'dancing': ('walking', 'shock'),
+    'shock': ('post_trauma',),
+    'post_trauma': ('recovering', 'shock'),
+    'recovering': ('walking', 'shock'),
+}
+# States that count as awake for the countdown to the next nap.
+AWAKE_STATES = ('walking', 'pausing', 'turning', 'wondering', 'wagging')
+
+FOX_SPRITES = {
+    'idle': ["fox-1.png", "fox-2.png"],
+    'walk_left': ["fox-walking-left-1.png", "fox-walking-left-2.png"],
+    'walk_right': ["fox-walking-right-1.png", "fox-walking-right-2.png"],
+    'posture_idle_left': "fox-idle-left.png",
+    'posture_idle_right': "fox-idle-right.png",
+    'shock_left': "fox-shock-left.png",
+    'shock_right': "fox-shock-right.png",
+    'post_trauma_left': ["fox-post-trauma-left-1.png", "fox-post-trauma-left-2.png"],
+    'post_trauma_right': ["fox-post-trauma-right-1.png", "fox-post-trauma-right-2.png"],
+}
+# Left-facing sprites are drawn mirrored when no left-facing file exists.
+FOX_MIRRORS = {
+    'walk_left': 'walk_right',
+    'posture_idle_left': 'posture_idle_right',
+    'shock_left': 'shock_right',
+    'post_trauma_left': 'post_trauma_right',
+}
 
 
 class DesktopPet(QWidget):
@@ -31,18 +87,11 @@ class DesktopPet(QWidget):
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, True)
 
         ### Animations Assets ###
-        self.assets = {
-            'idle': [QPixmap(str(IMAGE_DIR / "fox" / "fox-1.png")), QPixmap(str(IMAGE_DIR / "fox" / "fox-2.png"))],
-            'walk_left': [QPixmap(str(IMAGE_DIR / "fox" / "fox-walking-left-1.png")), QPixmap(str(IMAGE_DIR / "fox" / "fox-walking-left-2.png"))],
-            'walk_right': [QPixmap(str(IMAGE_DIR / "fox" / "fox-walking-right-1.png")), QPixmap(str(IMAGE_DIR / "fox" / "fox-walking-right-2.png"))],
-            'posture_idle_left': QPixmap(str(IMAGE_DIR / "fox" / "fox-idle-left.png")),
-            'posture_idle_right': QPixmap(str(IMAGE_DIR / "fox" / "fox-idle-right.png")),
-            'shock_left': QPixmap(str(IMAGE_DIR / "fox" / "fox-shock-left.png")),
-            'shock_right': QPixmap(str(IMAGE_DIR / "fox" / "fox-shock-right.png")),
-            'post_trauma_left': [QPixmap(str(IMAGE_DIR / "fox" / "fox-post-trauma-left-1.png")), QPixmap(str(IMAGE_DIR / "fox" / "fox-post-trauma-left-2.png"))],
-            'post_trauma_right': [QPixmap(str(IMAGE_DIR / "fox" / "fox-post-trauma-right-1.png")), QPixmap(str(IMAGE_DIR / "fox" / "fox-post-trauma-right-2.png"))],
-            'sleep': QMovie(str(IMAGE_DIR / "fox" / "fox-sleeping.gif")),
-        }
+        # Decoded into one atlas on first use, at the pixel ratio of the pet's screen.
+        sprites = shared_sprites()
+        sprites.define('fox', IMAGE_DIR / "fox", FOX_SPRITES, FOX_MIRRORS)
+        self.assets = sprites.view('fox', self.devicePixelRatioF)
+        self.sleep_movie = QMovie(str(IMAGE_DIR / "fox" / "fox-sleeping.gif"))
 
         ### Onboarding Questions and Responses ###
         self.questions = ["How's your day going?",
@@ -63,7 +112,7 @@ class DesktopPet(QWidget):
         self.pet_label.setPixmap(self.assets['idle'][0])
         self._layout.addWidget(self.pet_label)
         self.setLayout(self._layout)
-        self.resize(self.assets['idle'][0].size())
+        self.resize(self.assets['idle'][0].deviceIndependentSize().toSize())
 
         ### Screen Geometry & Initial Position ###
         self.screen_geometry = QApplication.primaryScreen().geometry()
@@ -72,31 +121,14 @@ class DesktopPet(QWidget):
         self.move(initial_x, 0)
         self.update_position()
 
-        ### Timers ###
-        # Display Check Timer
-        self.display_check_timer = QTimer(self)
-        self.display_check_timer.timeout.connect(self.check_display_changes)
-
-        # Animation Timer
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animation_frame)
-
-        # State Change Timer
-        self.state_change_timer = QTimer(self)
-        self.state_change_timer.setSingleShot(True)
-        self.state_change_timer.timeout.connect(self.switch_state)
-
-        # Walk Logic Timer
-        self.walk_logic_timer = QTimer(self)
-        self.walk_logic_timer.timeout.connect(self.update_walk_logic)
-
-        # Post Trauma Timer
-        self.post_trauma_timer = QTimer(self)
-        self.post_trauma_timer.setSingleShot(True)
-        self.post_trauma_timer.timeout.connect(self.resume_from_trauma)
+        ### Timers & States ###
+        # Every timed step of the pet runs from one deadline queue. Apart from
+        # 'display_check', jobs belong to the state that scheduled them and
+        # are cancelled when the pet leaves it.
+        self.scheduler = FrameScheduler(self)
+        self.fsm = self._build_state_machine()
 
         ### State Initialization ###
-        self.state = 'intro'
         self.frame_index = 0
         self.speed = 2
         self.direction = choice([-1, 1])
@@ -113,7 +145,6 @@ class DesktopPet(QWidget):
         ### Music Player Initialization ###
         self.config = self._load_or_create_config()
         self._initialize_music_player()
-        self._apply_config_to_player()
         self._connect_tray_actions()
 
         ### Tray & Supporting Windows ###
@@ -131,7 +162,7 @@ class DesktopPet(QWidget):
         self.toggle_action = self.tray_manager.toggle_action
 
         self.pomodoro_window = PomodoroWindow(tray_icon=self.tray_icon)
-        self.start_intro_sequence()
+        self.fsm.start('intro')
         self.show()
         
         app = QApplication.instance()
@@ -151,11 +182,51 @@ class DesktopPet(QWidget):
         bold_font = QFont()
         bold_font.setBold(True)
         self.tray_actions['open'].setFont(bold_font)
-
-        self.media_player = QMediaPlayer()
-        self._audio_output = QAudioOutput()
-        self.media_player.setAudioOutput(self._audio_output)
-        self.music_player_window = MusicPlayerWindow(self.media_player, self.tray_actions)
+        # Until the window exists the tray labels come from the saved settings.
+        mode_labels = {'shuffle': "Mode: Shuffle", 'loop_all': "Mode: Loop All"}
+        self.tray_actions['loop'].setText(mode_labels.get(self.config['playback_mode'], "Mode: Normal"))
+        self.tray_actions['mute'].setText("Unmute" if self.config['is_muted'] else "Mute")
+
+        # Created by the first music action: until then startup opens no library,
+        # scans nothing and starts no media backend or analysis threads.
+        self.media_player = None
+        self.music_player_window = None
+        # Tray action waiting for the first scan to restore the last track.
+        self._pending_music_action = None
+        self._music_restored = False
+
+    def ensure_music_player(self):
+        """Create the player and its window on first use; returns the window."""
+        if self.music_player_window is not None:
+            return self.music_player_window
+        # Imported here so pet start-up never loads QtMultimedia.
+        from .music_player import MusicPlayerWindow
+        from .music_player.playback import PlaybackDeck
+
+        self.media_player = PlaybackDeck()
+        win = self.music_player_window = MusicPlayerWindow(self.media_player, self.tray_actions)
+        win.spectrum.frame_ready.connect(self.on_music_frame)
+        self._apply_config_to_player()
+        app = QApplication.instance()
+        if app:
+            app.aboutToQuit.connect(win.scan_engine.cancel)
+            app.aboutToQuit.connect(win.library_watcher.stop)
+            app.aboutToQuit.connect(win.track_analyzer.stop)
+            app.aboutToQuit.connect(win.art_service.shutdown)
+            app.aboutToQuit.connect(win.lyrics_service.shutdown)
+            app.aboutToQuit.connect(win.spectrum.stop)
+        return win
+
+    def _music_action(self, name, after_restore=False):
+        """Slot calling the window's ``name`` method, creating the player first if needed."""
+        def run():
+            win = self.ensure_music_player()
+            if after_restore and not self._music_restored:
+                # The remembered track is only selected once the first scan ends.
+                self._pending_music_action = name
+                return
+            getattr(win, name)()
+        return run
 
     def save_config(self):
         if not self.music_player_window or not self.media_player:
@@ -168,12 +239,31 @@ class DesktopPet(QWidget):
         except (FileNotFoundError, json.JSONDecodeError, IOError):
             config_data = {}
 
-        current_index = self.music_player_window.current_index
+        win = self.music_player_window
+        current_index = win.current_index
+        current = win.track_model.track(current_index)
+        last_track_path = current.path if current is not None else None
+        active_playlist = win.active_playlist
+        queue = win.queued_paths()
+        if win.scan_engine.is_running():
+            # The remembered playlist and queue are only restored once the scan ends.
+            active_playlist = active_playlist or self.config.get('active_playlist')
+            queue = queue or self.config.get('queue', [])
+            if current_index == -1:
+                current_index = self.config.get('last_track_index', -1)
+                last_track_path = self.config.get('last_track_path')
         music_config = {
             "last_track_index": current_index,
+            "last_track_path": last_track_path,
+            "active_playlist": active_playlist,
+            "queue": queue,
             "volume": self.music_player_window.volume_slider.value(),
-            "is_muted": self.media_player.audioOutput().isMuted(),
+            "is_muted": self.media_player.isMuted(),
             "playback_mode": self.music_player_window.playback_mode,
+            "sort_mode": self.music_player_window.sort_mode,
+            "gapless": self.music_player_window.gapless,
+            "crossfade_ms": self.media_player.crossfade_ms,
+            "normalize_loudness": self.music_player_window.normalize_loudness,
         }
 
         for legacy_key in ("last_track_index", "last_track_path", "volume", "is_muted", "playback_mode"):
@@ -193,6 +283,13 @@ class DesktopPet(QWidget):
             "volume": 100,
             "is_muted": False,
             "playback_mode": "normal",
+            "sort_mode": "title",
+            "gapless": GAPLESS_PLAYBACK,
+            "crossfade_ms": CROSSFADE_MS,
+            "normalize_loudness": LOUDNESS_NORMALIZATION,
+            "last_track_path": None,
+            "active_playlist": None,
+            "queue": [],
         }
 
         try:
@@ -219,8 +316,8 @@ class DesktopPet(QWidget):
 
         # Apply volume
         win.volume_slider.setValue(config['volume'])
-        player.audioOutput().setVolume(config['volume'] / 100.0)
-        player.audioOutput().setMuted(config['is_muted'])
+        player.setVolume(config['volume'] / 100.0)
+        player.setMuted(config['is_muted'])
         win.is_muted = config['is_muted']
         win.update_volume_icon()
         win.tray_actions['mute'].setText("Unmute" if win.is_muted else "Mute")
@@ -229,55 +326,53 @@ class DesktopPet(QWidget):
         if mode == 'loop_one':
             mode = 'normal'
         win.apply_playback_mode(mode)
-        last_index = config.get('last_track_index', -1)
+        win.apply_sort_mode(config['sort_mode'])
+        win.gapless = bool(config['gapless'])
+        player.crossfade_ms = max(0, int(config['crossfade_ms']))
+        win.normalize_loudness = bool(config['normalize_loudness'])
+        # The media file itself is only opened when playback starts.
+        win.preview_track(config.get('last_track_path'))
+        win.scan_finished.connect(self._restore_last_track)
+
+    def _restore_last_track(self):
+        """Re-select the remembered track once the library scan has filled the playlist."""
+        win = self.music_player_window
+        config = self.config
+        try:
+            win.scan_finished.disconnect(self._restore_last_track)
+        except RuntimeError:
+            pass
+        if config.get('active_playlist') and win.active_playlist is None:
+            win.open_playlist(config['active_playlist'])
+        if isinstance(config.get('queue'), list):
+            win.restore_queue(config['queue'])
+        if win.current_index == -1:
+            self._restore_current_track()
+        self._music_restored = True
+        if self._pending_music_action:
+            getattr(win, self._pending_music_action)()
+            self._pending_music_action = None
+
+    def _restore_current_track(self):
+        win = self.music_player_window
+        config = self.config
+        last_path = config.get('last_track_path')
+        if last_path:
+            last_index = win.index_of_path(last_path)
+        else:
+            last_index = config.get('last_track_index', -1)
         if not (0 <= last_index < len(win.playlist)):
             last_index = -1
 
         if last_index != -1:
-            win.current_index = last_index
-            song = win.playlist[last_index]
-
-            win.media_player.setSource(QUrl.fromLocalFile(str(song['path'].absolute())))
-
-            title = song.get('title', 'Unknown Title')
-            artist = song.get('artist', 'Unknown Author')
-            win.title_label.setText(format_title_display(title))
-            win.artist_label.setText(format_artist_display(artist))
-
-            thumbnail_pixmap = QPixmap()
-            thumbnail_data = song.get('thumbnail_data')
-            if thumbnail_data:
-                thumbnail_pixmap.loadFromData(thumbnail_data)
-            elif song.get('thumbnail_path'):
-                thumbnail_pixmap = QPixmap(str(song['thumbnail_path']))
-
-            if thumbnail_pixmap and not thumbnail_pixmap.isNull():
-                scaled = thumbnail_pixmap.scaled(
-                    100,
-                    100,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-                win.thumbnail_label.setPixmap(scaled)
-                win.thumbnail_label.setText("")
-            else:
-                fallback = QPixmap(str(NO_ART_IMAGE_PATH))
-                scaled = fallback.scaled(
-                    100,
-                    100,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation,
-                )
-                win.thumbnail_label.setPixmap(scaled)
-                win.thumbnail_label.setText("")
-            win.song_list_widget.setCurrentCell(last_index, 1)
+            win.restore_track(last_index)
 
     def _connect_tray_actions(self):
-        self.tray_actions['play_pause'].triggered.connect(self.music_player_window.toggle_play_pause)
-        self.tray_actions['prev'].triggered.connect(self.music_player_window.prev_song)
-        self.tray_actions['next'].triggered.connect(self.music_player_window.next_song)
-        self.tray_actions['loop'].triggered.connect(self.music_player_window.change_playback_mode)
-        self.tray_actions['mute'].triggered.connect(self.music_player_window.toggle_mute)
+        self.tray_actions['play_pause'].triggered.connect(self._music_action('toggle_play_pause', after_restore=True))
+        self.tray_actions['prev'].triggered.connect(self._music_action('prev_song', after_restore=True))
+        self.tray_actions['next'].triggered.connect(self._music_action('next_song', after_restore=True))
+        self.tray_actions['loop'].triggered.connect(self._music_action('change_playback_mode'))
+        self.tray_actions['mute'].triggered.connect(self._music_action('toggle_mute'))
         self.tray_actions['open'].triggered.connect(self.open_music_player)
 
     def exit_application(self):
@@ -300,8 +395,9 @@ class DesktopPet(QWidget):
         """
         Shows the music player
         """
-        self.music_player_window.show()
-        self.music_player_window.activateWindow()
+        win = self.ensure_music_player()
+        win.show()
+        win.activateWindow()
 
     def open_pomodoro_window(self):
         """Show the pixel-style pomodoro timer."""
@@ -313,26 +409,55 @@ class DesktopPet(QWidget):
         if self.help_dialog:
             self.help_dialog.show_dialog()
 
-    def start_intro_sequence(self):
+    def _build_state_machine(self):
+        """Bind the enter/exit hooks of every state in ``PET_STATES``."""
+        hooks = {
+            'intro': (self.enter_intro_state, None),
+            'walking': (self.enter_walking_state, None),
+            'idling_before_sleep': (self.enter_dozing_state, None),
+            'sleeping': (self.enter_sleeping_state, self.sleep_movie.stop),
+            'waking_up': (self.enter_waking_state, None),
+            'pausing': (self.enter_pausing_state, None),
+            'turning': (self.enter_turning_state, None),
+            'wondering': (self.enter_wondering_state, None),
+            'wagging': (self.enter_wagging_state, None),
+            'dancing': (self.enter_dancing_state, self.exit_dancing_state),
+            'shock': (self.enter_shock_state, None),
+            'post_trauma': (self.enter_post_trauma_state, None),
+            'recovering': (self.enter_recovering_state, None),
+        }
+        fsm = StateMachine(self.scheduler)
+        for name, targets in PET_STATES.items():
+            enter, exit = hooks[name]
+            fsm.add_state(name, targets, enter=enter, exit=exit)
+        return fsm
+
+    @property
+    def state(self):
+        return self.fsm.state
+
+    def enter_intro_state(self):
         hour = datetime.now().hour
         greeting = "Good morning!" if 5 <= hour < 12 else "Good afternoon!" if 12 <= hour < 18 else "Good evening!"
         self.show_bubble(greeting)
-        self.animation_timer.start(300)
-        QTimer.singleShot(1200, self.ask_question)
+        self.start_animation(300, self.idle_frame)
+        self.fsm.after(1200, self.ask_question)
 
     def start_main_lifecycle(self):
         self.tray_manager.set_music_menu_enabled(True)
         if self.bubble:
             self.bubble.hide()
-        self.display_check_timer.start(2000)
-        self.enter_walking_state()
+        self.scheduler.call_every(2000, self.check_display_changes, 'display_check')
+        self.fsm.transition('walking')
     
     def toggle_visibility(self):
         if self.isVisible():
             self.hide()
+            self.scheduler.set_throttle(HIDDEN_THROTTLE)
             self.toggle_action.setText("Show")
         else:
             self.show()
+            self.scheduler.set_throttle(1.0)
             self.toggle_action.setText("Hide")
 
     def closeEvent(self, event):
@@ -342,21 +467,23 @@ class DesktopPet(QWidget):
     def ask_question(self):
         question = choice(self.questions)
         self.show_bubble(question, word_wrap=False)
-        QTimer.singleShot(2000, lambda: self.show_rating_dialog(question))
+        self.fsm.after(2000, lambda: self.show_rating_dialog(question))
 
     def show_rating_dialog(self, question_text):
         if self.bubble:
             self.bubble.hide()
+        # open() rather than exec(): a nested event loop inside a scheduled
+        # callback would hold up the pet's other jobs until the dialog closes.
         dialog = RatingDialog(question_text, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.show_response(dialog.get_rating())
-        else:
-            self.start_main_lifecycle()
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.accepted.connect(lambda: self.show_response(dialog.get_rating()))
+        dialog.rejected.connect(self.start_main_lifecycle)
+        dialog.open()
 
     def show_response(self, rating):
         response_text = choice(self.responses[rating])
         self.show_bubble(response_text)
-        QTimer.singleShot(3000, self.start_main_lifecycle)
+        self.fsm.after(3000, self.start_main_lifecycle)
 
     def show_bubble(self, text, word_wrap=True):
         if self.bubble:
@@ -364,130 +491,141 @@ class DesktopPet(QWidget):
         self.bubble = SpeechBubble(text, self, word_wrap=word_wrap)
         self.bubble.show_smartly_positioned()
 
-    def switch_state(self):
-        if self.state == 'walking':
-            self.state = 'idling_before_sleep'
-            self.walk_logic_timer.stop()
-            self.animation_timer.stop()
-            idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-            self.pet_label.setPixmap(idle_sprite)
-            QTimer.singleShot(randint(700, 1200), self.enter_sleeping_state)
-        elif self.state == 'sleeping':
-            self.state = 'waking_up'
-            self.assets['sleep'].stop()
-            idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-            self.pet_label.setPixmap(idle_sprite)
-            QTimer.singleShot(randint(700, 1200), self.enter_walking_state)
+    def show_idle_posture(self):
+        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
+        self.pet_label.setPixmap(idle_sprite)
 
     def enter_walking_state(self):
-        self.state = 'walking'
-        self.animation_timer.setInterval(150)
-        if not self.animation_timer.isActive():
-            self.animation_timer.start()
-        self.state_change_timer.start(randint(30, 40) * 1000)
+        self.start_animation(self.beat_interval(WALK_FRAME_MS), self.walk_frame)
         self.walk_direction_duration = 0
-        self.walk_logic_timer.start(1000)
+        self.fsm.every(1000, self.update_walk_logic, 'walk_logic')
+        # The nap countdown keeps running through pauses, turns and wags.
+        if not self.fsm.is_pending('nap'):
+            self.fsm.after(randint(30, 40) * 1000, self.fall_asleep, 'nap', within=AWAKE_STATES)
+
+    def fall_asleep(self):
+        if not self.fsm.transition('idling_before_sleep'):
+            # Finish the current turn or wag first.
+            self.fsm.after(1000, self.fall_asleep, 'nap', within=AWAKE_STATES)
+
+    def enter_dozing_state(self):
+        self.show_idle_posture()
+        self.fsm.after(randint(700, 1200), lambda: self.fsm.transition('sleeping'))
 
     def enter_sleeping_state(self):
-        self.state = 'sleeping'
-        self.animation_timer.stop()
-        self.pet_label.setMovie(self.assets['sleep'])
-        self.assets['sleep'].start()
-        self.state_change_timer.start(randint(10, 20) * 1000)
+        self.pet_label.setMovie(self.sleep_movie)
+        self.sleep_movie.start()
+        self.fsm.after(randint(10, 20) * 1000, lambda: self.fsm.transition('waking_up'))
+
+    def enter_waking_state(self):
+        self.show_idle_posture()
+        self.fsm.after(randint(700, 1200), lambda: self.fsm.transition('walking'))
 
     def update_walk_logic(self):
-        if self.state != 'walking':
-            return
         self.walk_direction_duration += 1
         r = random()
         if r < 0.04:
-            self.initiate_wagging()
+            self.fsm.transition('wagging')
         elif r < 0.09:
-            self.initiate_pause()
+            self.fsm.transition('pausing')
         elif r < 0.14:
-            self.initiate_wondering()
+            self.fsm.transition('wondering')
         elif r < 0.22:
             self.initiate_turn()
         elif self.walk_direction_duration > 15:
             self.initiate_turn()
 
-    def initiate_pause(self):
-        if self.state != 'walking':
-            return
-        self.state = 'pausing'
-        self.walk_logic_timer.stop()
-        self.animation_timer.stop()
-        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-        self.pet_label.setPixmap(idle_sprite)
-        QTimer.singleShot(randint(1500, 3000), self.resume_walking)
+    def enter_pausing_state(self):
+        self.show_idle_posture()
+        self.fsm.after(randint(1500, 3000), self.resume_walking)
 
     def initiate_turn(self, new_direction=None):
-        if self.state != 'walking':
-            return
-        self.state = 'turning'
-        self.walk_logic_timer.stop()
-        self.animation_timer.stop()
         self.turn_new_direction = new_direction if new_direction is not None else self.direction * -1
-        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-        self.pet_label.setPixmap(idle_sprite)
-        QTimer.singleShot(randint(300, 500), self.complete_turn)
+        self.fsm.transition('turning')
+
+    def enter_turning_state(self):
+        self.show_idle_posture()
+        self.fsm.after(randint(300, 500), self.complete_turn)
 
     def complete_turn(self):
         self.direction = self.turn_new_direction
-        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-        self.pet_label.setPixmap(idle_sprite)
-        QTimer.singleShot(randint(300, 500), self.resume_walking)
+        self.show_idle_posture()
+        self.fsm.after(randint(300, 500), self.resume_walking)
 
-    def initiate_wondering(self):
-        if self.state != 'walking':
-            return
-        self.state = 'wondering'
-        self.walk_logic_timer.stop()
-        self.animation_timer.stop()
+    def enter_wondering_state(self):
         self.wonder_count = randint(1, 3)
         self.perform_wonder_step()
 
     def perform_wonder_step(self):
         self.wonder_count -= 1
         self.direction *= -1
-        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-        self.pet_label.setPixmap(idle_sprite)
+        self.show_idle_posture()
         if self.wonder_count > 0:
-            QTimer.singleShot(randint(600, 1000), self.perform_wonder_step)
+            self.fsm.after(randint(600, 1000), self.perform_wonder_step)
         else:
-            QTimer.singleShot(randint(500, 800), self.resume_walking)
+            self.fsm.after(randint(500, 800), self.resume_walking)
 
-    def initiate_wagging(self):
-        if self.state != 'walking':
-            return
-        self.state = 'wagging'
-        self.walk_logic_timer.stop()
-        self.animation_timer.setInterval(300)
-        if not self.animation_timer.isActive():
-            self.animation_timer.start()
-        QTimer.singleShot(randint(1500, 3000), self.resume_walking)
+    def enter_wagging_state(self):
+        self.start_animation(self.beat_interval(WAG_FRAME_MS), self.wag_frame)
+        self.fsm.after(randint(1500, 3000), self.resume_walking)
 
     def resume_walking(self):
-        self.state = 'walking'
-        self.animation_timer.setInterval(150)
-        if not self.animation_timer.isActive():
-            self.animation_timer.start()
-        self.walk_direction_duration = 0
-        self.walk_logic_timer.start(1000)
+        self.fsm.transition('walking')
+
+    def start_animation(self, interval_ms, frame):
+        """(Re)start drawing ``frame`` every ``interval_ms`` until the state changes."""
+        self.fsm.every(interval_ms, frame, 'animation')
+
+    def beat_interval(self, default_ms):
+        """Time until the next beat subdivision closest to ``default_ms``, or ``default_ms`` without a beat grid."""
+        grid = self.music_player_window.beat_grid() if self.music_player_window else None
+        if grid is None:
+            return default_ms
+        period, offset = grid
+        step = period
+        while step > default_ms * 1.5:
+            step /= 2
+        while step < default_ms * 0.75:
+            step *= 2
+        until = (offset - self.media_player.position()) % step
+        if until < BEAT_MIN_STEP_MS:
+            until += step
+        return round(until)
+
+    def on_music_frame(self, frame):
+        """Dance while music plays: bounce with the bass and step on beats."""
+        if frame.level < DANCE_MIN_LEVEL or self.is_dragging or not self.music_audible():
+            return
+        if self.state != 'dancing' and not self.fsm.transition('dancing'):
+            return
+        self.fsm.after(DANCE_LINGER_MS, self.resume_walking, 'dance')
+        if frame.beat:
+            frames = self.assets['idle']
+            self.frame_index = (self.frame_index + 1) % len(frames)
+            self.pet_label.setPixmap(frames[self.frame_index])
+        y = self.base_y - round(frame.bass * DANCE_BOUNCE_PX)
+        if y != self.y():
+            self.move(self.x(), y)
+
+    def music_audible(self):
+        player = self.media_player
+        return player is not None and not player.isMuted() and player.volume() >= DANCE_MIN_VOLUME
+
+    def enter_dancing_state(self):
+        self.frame_index = 0
+        self.pet_label.setPixmap(self.assets['idle'][0])
+
+    def exit_dancing_state(self):
+        self.move(self.x(), self.base_y)
 
     def mousePressEvent(self, event):
-        if self.state == 'intro':
-            return
-        if event.button() == Qt.MouseButton.LeftButton:
+        if event.button() == Qt.MouseButton.LeftButton and self.fsm.transition('shock'):
             self.is_dragging = True
             self.drag_start_pos = event.globalPosition()
-            self.state_change_timer.stop()
-            self.walk_logic_timer.stop()
-            self.animation_timer.stop()
-            self.assets['sleep'].stop()
-            self.state = 'shock'
-            shock_sprite = self.assets['shock_right'] if self.direction == 1 else self.assets['shock_left']
-            self.pet_label.setPixmap(shock_sprite)
+
+    def enter_shock_state(self):
+        shock_sprite = self.assets['shock_right'] if self.direction == 1 else self.assets['shock_left']
+        self.pet_label.setPixmap(shock_sprite)
 
     def mouseMoveEvent(self, event):
         if self.is_dragging:
@@ -496,48 +634,47 @@ class DesktopPet(QWidget):
             self.drag_start_pos = event.globalPosition()
 
     def mouseReleaseEvent(self, event):
-        if self.state == 'intro':
-            return
-        if event.button() == Qt.MouseButton.LeftButton:
+        if event.button() == Qt.MouseButton.LeftButton and self.is_dragging:
             self.is_dragging = False
             self.drag_start_pos = None
             self.move(self.x(), self.base_y)
-            self.state = 'post_trauma'
-            self.frame_index = 0
-            self.animation_timer.setInterval(300)
-            if not self.animation_timer.isActive():
-                self.animation_timer.start()
-            self.post_trauma_timer.start(randint(2000, 3000))
-
-    def resume_from_trauma(self):
-        self.state = 'recovering'
-        self.animation_timer.stop()
-        idle_sprite = self.assets['posture_idle_right'] if self.direction == 1 else self.assets['posture_idle_left']
-        self.pet_label.setPixmap(idle_sprite)
-        QTimer.singleShot(randint(500, 1000), self.start_main_lifecycle)
+            self.fsm.transition('post_trauma')
 
-    def update_animation_frame(self):
-        if self.is_dragging:
+    def enter_post_trauma_state(self):
+        self.frame_index = 0
+        self.start_animation(300, self.post_trauma_frame)
+        self.fsm.after(randint(2000, 3000), lambda: self.fsm.transition('recovering'))
+
+    def enter_recovering_state(self):
+        self.show_idle_posture()
+        self.fsm.after(randint(500, 1000), self.start_main_lifecycle)
+
+    def walk_frame(self):
+        if (self.x() >= self.available_geometry.width() - self.width() and self.direction == 1):
+            self.initiate_turn(new_direction=-1)
             return
-        if self.state == 'walking':
-            if (self.x() >= self.available_geometry.width() - self.width() and self.direction == 1):
-                self.initiate_turn(new_direction=-1)
-                return
-            elif (self.x() <= 0 and self.direction == -1):
-                self.initiate_turn(new_direction=1)
-                return
-            self.move(self.x() + (self.speed * self.direction), self.y())
-            frames = self.assets['walk_right'] if self.direction == 1 else self.assets['walk_left']
-            self.frame_index = (self.frame_index + 1) % len(frames)
-            self.pet_label.setPixmap(frames[self.frame_index])
-        elif self.state == 'post_trauma':
-            frames = self.assets['post_trauma_right'] if self.direction == 1 else self.assets['post_trauma_left']
-            self.frame_index = (self.frame_index + 1) % len(frames)
-            self.pet_label.setPixmap(frames[self.frame_index])
-        elif self.state in ['intro', 'wagging']:
-            frames = self.assets['idle']
-            self.frame_index = (self.frame_index + 1) % len(frames)
-            self.pet_label.setPixmap(frames[self.frame_index])
+        elif (self.x() <= 0 and self.direction == -1):
+            self.initiate_turn(new_direction=1)
+            return
+        self.move(self.x() + (self.speed * self.direction), self.y())
+        frames = self.assets['walk_right'] if self.direction == 1 else self.assets['walk_left']
+        self.frame_index = (self.frame_index + 1) % len(frames)
+        self.pet_label.setPixmap(frames[self.frame_index])
+        self.start_animation(self.beat_interval(WALK_FRAME_MS), self.walk_frame)
+
+    def post_trauma_frame(self):
+        frames = self.assets['post_trauma_right'] if self.direction == 1 else self.assets['post_trauma_left']
+        self.frame_index = (self.frame_index + 1) % len(frames)
+        self.pet_label.setPixmap(frames[self.frame_index])
+
+    def idle_frame(self):
+        frames = self.assets['idle']
+        self.frame_index = (self.frame_index + 1) % len(frames)
+        self.pet_label.setPixmap(frames[self.frame_index])
+
+    def wag_frame(self):
+        self.idle_frame()
+        self.start_animation(self.beat_interval(WAG_FRAME_MS), self.wag_frame)
 
     def update_position(self):
         self.available_geometry = QApplication.primaryScreen().availableGeometry()
@@ -1,3 +1,11 @@
-from .music_player import MusicPlayerWindow
+# The window is imported on first use: scan pool workers import submodules of
+# this package and must not pull in Qt widgets and multimedia.
+def __getattr__(name):
+	if name == "MusicPlayerWindow":
+		from .music_player import MusicPlayerWindow
 
-__all__ = ["MusicPlayerWindow"]
\ No newline at end of file
+		return MusicPlayerWindow
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["MusicPlayerWindow"]
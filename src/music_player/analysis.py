@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from typing import Deque, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, Qt, QThread, QTimer, QUrl, Signal, Slot
+from PySide6.QtMultimedia import QAudioDecoder, QAudioFormat
+
+from .constants import ANALYSIS_IDLE_DELAY_MS
+from .library import LibraryIndex
+from .loudness import LoudnessMeter, gain_for
+from .tempo import TempoTracker
+from .waveform import EnvelopeBuilder
+
+ANALYSIS_RATE = 48000
+ANALYSIS_CHANNELS = 2
+
+
+class TrackAnalysis(NamedTuple):
+	gain: float
+	envelope: Optional[bytes]
+	bpm: Optional[float]
+	beat_offset: Optional[float]
+
+
+class _AnalysisWorker(QObject):
+	"""Decodes one file at a time on the analyzer thread, feeding every measurement from the same pass."""
+
+	analyzed = Signal(str, object)
+
+	def __init__(self, library: LibraryIndex):
+		super().__init__()
+		self.library = library
+		self._pending: Deque[str] = deque()
+		self._queued: set[str] = set()
+		self._decoder: Optional[QAudioDecoder] = None
+		self._meter: Optional[LoudnessMeter] = None
+		self._envelope: Optional[EnvelopeBuilder] = None
+		self._tempo: Optional[TempoTracker] = None
+		self._current: Optional[tuple[str, os.stat_result]] = None
+		self._timer: Optional[QTimer] = None
+
+	@Slot()
+	def setup(self) -> None:
+		fmt = QAudioFormat()
+		fmt.setSampleRate(ANALYSIS_RATE)
+		fmt.setChannelCount(ANALYSIS_CHANNELS)
+		fmt.setSampleFormat(QAudioFormat.SampleFormat.Float)
+		self._decoder = QAudioDecoder(self)
+		self._decoder.setAudioFormat(fmt)
+		self._decoder.bufferReady.connect(self._read_buffer)
+		self._decoder.finished.connect(self._finish)
+		self._decoder.error.connect(self._fail)
+		self._timer = QTimer(self)
+		self._timer.setSingleShot(True)
+		self._timer.setInterval(ANALYSIS_IDLE_DELAY_MS)
+		self._timer.timeout.connect(self._next)
+		if self._pending:
+			self._timer.start()
+
+	@Slot(list, bool)
+	def enqueue(self, paths: List[str], urgent: bool) -> None:
+		for path in reversed(paths) if urgent else paths:
+			if urgent:
+				# A stale copy further back is skipped once this one is done.
+				self._pending.appendleft(path)
+			elif path not in self._queued:
+				self._pending.append(path)
+			self._queued.add(path)
+		if self._current is None and self._timer is not None:
+			if urgent:
+				self._timer.start(0)
+			elif not self._timer.isActive():
+				self._timer.start(ANALYSIS_IDLE_DELAY_MS)
+
+	@Slot()
+	def shutdown(self) -> None:
+		self._pending.clear()
+		self._queued.clear()
+		if self._timer is not None:
+			self._timer.stop()
+		if self._decoder is not None:
+			self._decoder.stop()
+		self._current = None
+
+	def _next(self) -> None:
+		while self._pending:
+			path = self._pending.popleft()
+			if path not in self._queued:
+				continue
+			self._queued.discard(path)
+			try:
+				stat = os.stat(path)
+			except OSError:
+				continue
+			self._current = (path, stat)
+			self._meter = LoudnessMeter(ANALYSIS_RATE, ANALYSIS_CHANNELS)
+			self._envelope = EnvelopeBuilder(ANALYSIS_CHANNELS)
+			self._tempo = TempoTracker(ANALYSIS_RATE, ANALYSIS_CHANNELS)
+			self._decoder.setSource(QUrl.fromLocalFile(path))
+			self._decoder.start()
+			return
+
+	def _read_buffer(self) -> None:
+		buffer = self._decoder.read()
+		if self._current is None or not buffer.isValid():
+			return
+		samples = np.frombuffer(buffer.constData(), dtype=np.float32, count=buffer.sampleCount())
+		self._meter.feed(samples)
+		self._envelope.feed(samples)
+		self._tempo.feed(samples)
+
+	def _finish(self) -> None:
+		if self._current is None:
+			return
+		grid = self._tempo.result()
+		self._store(
+			TrackAnalysis(
+				gain_for(self._meter.integrated()),
+				self._envelope.result(),
+				grid.bpm if grid else None,
+				grid.offset if grid else None,
+			)
+		)
+
+	def _fail(self, _error) -> None:
+		if self._current is None:
+			return
+		print(f"Error analyzing {self._current[0]}: {self._decoder.errorString()}")
+		# Record a neutral result so a file the decoder cannot read is not retried every run.
+		self._store(TrackAnalysis(0.0, None, None, None))
+
+	def _store(self, result: TrackAnalysis) -> None:
+		path, stat = self._current
+		self._decoder.stop()
+		self._current = None
+		self._meter = None
+		self._envelope = None
+		self._tempo = None
+		stored = self.library.store_analysis(
+			path, stat.st_size, stat.st_mtime_ns, result.gain, result.envelope, result.bpm, result.beat_offset
+		)
+		if stored:
+			self.analyzed.emit(path, result)
+		if self._pending:
+			self._timer.start(ANALYSIS_IDLE_DELAY_MS)
+
+
+class TrackAnalyzer(QObject):
+	"""Measures loudness, the waveform envelope and the beat grid on a low-priority thread.
+
+	Each file is decoded once, one at a time. Results are written to the
+	library as soon as a file is done, so an interrupted run resumes with
+	whatever is still unmeasured.
+	"""
+
+	analyzed = Signal(str, object)
+
+	_enqueue = Signal(list, bool)
+	_shutdown = Signal()
+
+	def __init__(self, library: LibraryIndex, parent=None):
+		super().__init__(parent)
+		self._thread = QThread(self)
+		self._thread.setObjectName("music-analysis")
+		self._worker = _AnalysisWorker(library)
+		self._worker.moveToThread(self._thread)
+		self._thread.started.connect(self._worker.setup)
+		self._enqueue.connect(self._worker.enqueue)
+		self._shutdown.connect(self._worker.shutdown, Qt.ConnectionType.BlockingQueuedConnection)
+		self._worker.analyzed.connect(self.analyzed)
+		self._thread.start(QThread.Priority.LowestPriority)
+
+	def analyze(self, paths: Iterable[str], urgent: bool = False) -> None:
+		"""Queue ``paths``; urgent ones jump the queue, e.g. the track that just started."""
+		paths = list(paths)
+		if paths:
+			self._enqueue.emit(paths, urgent)
+
+	def stop(self) -> None:
+		if not self._thread.isRunning():
+			return
+		self._shutdown.emit()
+		self._thread.quit()
+		self._thread.wait(2000)
+
+
+__all__ = ["TrackAnalyzer", "TrackAnalysis", "ANALYSIS_RATE", "ANALYSIS_CHANNELS"]
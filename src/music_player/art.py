@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import QObject, Qt, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from .constants import ART_CACHE_DIR, ART_CACHE_ENTRIES, ART_THUMBNAIL_SIZE, NO_ART_IMAGE_PATH
+from .playlist_control import Track, read_embedded_art
+
+_NO_ART_KEY = "no-art"
+
+
+class ArtService(QObject):
+	"""Cover thumbnails decoded and scaled off the GUI thread.
+
+	Thumbnails are keyed by the cover's content hash (embedded art) or the
+	sidecar file's identity, so every track of an album shares one entry.
+	Scaled results are kept in a small LRU of pixmaps and written to disk as
+	PNGs, which later runs load instead of decoding the full-size cover.
+	"""
+
+	art_ready = Signal(str, QPixmap)
+
+	_decoded = Signal(str, QImage)
+
+	def __init__(
+		self,
+		cache_dir: Path = ART_CACHE_DIR,
+		size: int = ART_THUMBNAIL_SIZE,
+		capacity: int = ART_CACHE_ENTRIES,
+		parent=None,
+	):
+		super().__init__(parent)
+		self.cache_dir = cache_dir
+		self.size = size
+		self.capacity = capacity
+		self._memory: OrderedDict[str, QPixmap] = OrderedDict()
+		self._inflight: set[str] = set()
+		self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+			max_workers=1, thread_name_prefix="music-art"
+		)
+		self._decoded.connect(self._store)
+
+	def key_for(self, song: Track, ratio: float = 1.0) -> str:
+		return f"{self._source(song)}-{round(self.size * ratio)}"
+
+	def _source(self, song: Track) -> str:
+		if song.art_hash:
+			return song.art_hash
+		if song.thumbnail_path:
+			try:
+				stat = os.stat(song.thumbnail_path)
+			except OSError:
+				return _NO_ART_KEY
+			identity = f"{song.thumbnail_path}:{stat.st_size}:{stat.st_mtime_ns}"
+			return hashlib.sha1(identity.encode("utf-8", "surrogatepass")).hexdigest()
+		return _NO_ART_KEY
+
+	def request(self, song: Track, ratio: float = 1.0) -> tuple[str, Optional[QPixmap]]:
+		"""Return the thumbnail key and the pixmap if cached; otherwise ``art_ready`` follows."""
+		source = self._source(song)
+		pixels = round(self.size * ratio)
+		key = f"{source}-{pixels}"
+		pixmap = self._memory.get(key)
+		if pixmap is not None:
+			self._memory.move_to_end(key)
+			return key, pixmap
+		if key not in self._inflight and self._executor is not None:
+			self._inflight.add(key)
+			embedded = song.path if source == song.art_hash else None
+			sidecar = song.thumbnail_path if source != _NO_ART_KEY else None
+			self._executor.submit(self._produce, key, embedded, sidecar, pixels)
+		return key, None
+
+	def cached(self, song: Track, ratio: float = 1.0) -> Optional[QPixmap]:
+		"""Thumbnail from memory or the disk cache only; never reads the audio file or the full cover."""
+		key = self.key_for(song, ratio)
+		pixmap = self._memory.get(key)
+		if pixmap is not None:
+			self._memory.move_to_end(key)
+			return pixmap
+		image = QImage(str(self.cache_dir / f"{key}.png"))
+		if image.isNull():
+			return None
+		return self._remember(key, image)
+
+	def shutdown(self) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	def _produce(self, key: str, embedded: Optional[str], sidecar: Optional[str], pixels: int) -> None:
+		# Runs on the worker thread; only QImage is safe to touch here.
+		try:
+			image = self._load(key, embedded, sidecar, pixels)
+		except Exception as e:
+			print(f"Error loading album art: {e}")
+			image = QImage()
+		self._decoded.emit(key, image)
+
+	def _load(self, key: str, embedded: Optional[str], sidecar: Optional[str], pixels: int) -> QImage:
+		cached = self.cache_dir / f"{key}.png"
+		image = QImage(str(cached))
+		if not image.isNull():
+			return image
+		if embedded:
+			data = read_embedded_art(Path(embedded))
+			if data:
+				image.loadFromData(data)
+		if image.isNull() and sidecar:
+			image.load(sidecar)
+		if image.isNull():
+			image.load(str(NO_ART_IMAGE_PATH))
+		if image.isNull():
+			return image
+		image = image.scaled(
+			pixels,
+			pixels,
+			Qt.AspectRatioMode.KeepAspectRatio,
+			Qt.TransformationMode.SmoothTransformation,
+		)
+		try:
+			self.cache_dir.mkdir(parents=True, exist_ok=True)
+			tmp = cached.with_name(f"{cached.name}.tmp")
+			if image.save(str(tmp), "PNG"):
+				os.replace(tmp, cached)
+		except OSError as e:
+			print(f"Error caching album art: {e}")
+		return image
+
+	def _remember(self, key: str, image: QImage) -> QPixmap:
+		pixmap = QPixmap.fromImage(image)
+		if not pixmap.isNull():
+			pixels = int(key.rsplit("-", 1)[1])
+			pixmap.setDevicePixelRatio(pixels / self.size)
+			self._memory[key] = pixmap
+			self._memory.move_to_end(key)
+			while len(self._memory) > self.capacity:
+				self._memory.popitem(last=False)
+		return pixmap
+
+	def _store(self, key: str, image: QImage) -> None:
+		self._inflight.discard(key)
+		self.art_ready.emit(key, self._remember(key, image))
+
+
+__all__ = ["ArtService"]
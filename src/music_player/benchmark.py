@@ -0,0 +1,351 @@
+"""Scanner benchmark on synthetic music libraries.
+
+Generates libraries of tiny but valid MP3 and M4A files with realistic tags,
+embedded covers of varied sizes and an artist/album folder tree, then times
+library scans against them, each in a fresh process so peak RSS is per run:
+
+	python -m src.music_player.benchmark --sizes 1k 10k 100k
+
+Libraries are kept under ``--root`` and reused by later runs; 100k tracks
+take about 2.5 GB. Unix only, since peak RSS comes from ``getrusage``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from mutagen.id3 import APIC, ID3, TALB, TIT2, TPE1, TRCK
+from mutagen.mp4 import MP4, MP4Cover
+
+ENGINES = ("scan", "thread", "process")
+DEFAULT_ROOT = Path(tempfile.gettempdir()) / "karu-scan-bench"
+
+_TRACKS_PER_ALBUM = (6, 14)
+_ALBUMS_PER_ARTIST = (1, 6)
+_M4A_SHARE = 0.2
+# Cover edge in pixels and how often an album gets it; None is an album without art.
+_COVERS = ((None, 0.15), (300, 0.5), (500, 0.3), (1000, 0.05))
+# Albums without embedded art sometimes carry a folder cover instead.
+_SIDECAR_SHARE = 0.5
+_WORDS = (
+	"Midnight", "Summer", "Echo", "River", "Neon", "Golden", "Paper", "Silent", "Wild", "Glass",
+	"Heart", "City", "Fire", "Ocean", "Lights", "Shadow", "Dream", "Stone", "Velvet", "Electric",
+	"Morning", "Highway", "Satellite", "Honey", "Winter", "Fever", "Garden", "Thunder", "Blue", "Home",
+)
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: a 417-byte frame of silence.
+_MP3_FRAME = bytes((0xFF, 0xFB, 0x90, 0x64)) + bytes(413)
+_MARKER = ".karu-bench.json"
+
+
+def _atom(name: bytes, payload: bytes) -> bytes:
+	return struct.pack(">I4s", 8 + len(payload), name) + payload
+
+
+def _full_atom(name: bytes, payload: bytes, flags: int = 0) -> bytes:
+	return _atom(name, struct.pack(">I", flags) + payload)
+
+
+def _m4a_skeleton(seconds: float) -> bytes:
+	"""Smallest AAC-in-MP4 file that tag readers accept: headers only, no samples."""
+	rate = 44100
+	matrix = struct.pack(">9I", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+	mvhd = _full_atom(
+		b"mvhd",
+		struct.pack(">IIII", 0, 0, 1000, int(seconds * 1000))
+		+ struct.pack(">IH", 0x00010000, 0x0100) + bytes(10) + matrix + bytes(24) + struct.pack(">I", 2),
+	)
+	tkhd = _full_atom(
+		b"tkhd",
+		struct.pack(">IIIII", 0, 0, 1, 0, int(seconds * 1000)) + bytes(8)
+		+ struct.pack(">HHHH", 0, 0, 0x0100, 0) + matrix + bytes(8),
+		flags=7,
+	)
+	mdhd = _full_atom(b"mdhd", struct.pack(">IIIIHH", 0, 0, rate, int(seconds * rate), 0x55C4, 0))
+	hdlr = _full_atom(b"hdlr", struct.pack(">I4s", 0, b"soun") + bytes(12) + b"SoundHandler\0")
+	esds = _full_atom(
+		b"esds",
+		bytes((3, 25, 0, 1, 0, 4, 17, 0x40, 0x15, 0, 0, 0, 0, 1, 0xF4, 0, 0, 1, 0xF4, 0, 5, 2, 0x12, 0x10, 6, 1, 2)),
+	)
+	mp4a = _atom(
+		b"mp4a",
+		bytes(6) + struct.pack(">H", 1) + bytes(8) + struct.pack(">HHHHI", 2, 16, 0, 0, rate << 16) + esds,
+	)
+	stbl = _atom(
+		b"stbl",
+		_full_atom(b"stsd", struct.pack(">I", 1) + mp4a)
+		+ _full_atom(b"stts", struct.pack(">I", 0))
+		+ _full_atom(b"stsc", struct.pack(">I", 0))
+		+ _full_atom(b"stsz", struct.pack(">II", 0, 0))
+		+ _full_atom(b"stco", struct.pack(">I", 0)),
+	)
+	mdia = _atom(b"mdia", mdhd + hdlr + _atom(b"minf", _full_atom(b"smhd", bytes(4)) + stbl))
+	moov = _atom(b"moov", mvhd + _atom(b"trak", tkhd + mdia))
+	return _atom(b"ftyp", b"M4A \0\0\0\0M4A mp42isom") + moov + _atom(b"mdat", b"")
+
+
+def _cover_jpeg(edge: int, seed: int) -> bytes:
+	"""A noisy gradient, so the JPEG is about as large as a real cover of that size."""
+	import numpy as np
+	from PySide6.QtCore import QBuffer, QIODevice
+	from PySide6.QtGui import QImage
+
+	rng = np.random.default_rng(seed)
+	ramp = np.linspace(0, 255, edge, dtype=np.float32)
+	base = rng.uniform(0, 255, 3).astype(np.float32)
+	pixels = np.empty((edge, edge, 3), dtype=np.float32)
+	pixels[...] = (base + ramp[:, None, None] * 0.5 + ramp[None, :, None] * 0.3) % 256
+	pixels += rng.normal(0, 6, pixels.shape)
+	data = np.ascontiguousarray(np.clip(pixels, 0, 255).astype(np.uint8))
+	image = QImage(data.data, edge, edge, edge * 3, QImage.Format.Format_RGB888)
+	buffer = QBuffer()
+	buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+	image.save(buffer, "JPEG", 85)
+	return bytes(buffer.data())
+
+
+def _name(rng: random.Random, words: int) -> str:
+	return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _write_mp3(
+	path: Path, title: str, artist: str, album: str, number: int, art: Optional[bytes], frames: int
+) -> None:
+	with open(path, "wb") as handle:
+		handle.write(_MP3_FRAME * frames)
+	tags = ID3()
+	tags.add(TIT2(encoding=3, text=title))
+	tags.add(TPE1(encoding=3, text=artist))
+	tags.add(TALB(encoding=3, text=album))
+	tags.add(TRCK(encoding=3, text=str(number)))
+	if art:
+		tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=art))
+	tags.save(path)
+
+
+def _write_m4a(
+	path: Path, title: str, artist: str, album: str, number: int, art: Optional[bytes], seconds: float
+) -> None:
+	with open(path, "wb") as handle:
+		handle.write(_m4a_skeleton(seconds))
+	audio = MP4(path)
+	audio["\xa9nam"] = [title]
+	audio["\xa9ART"] = [artist]
+	audio["\xa9alb"] = [album]
+	audio["trkn"] = [(number, 0)]
+	if art:
+		audio["covr"] = [MP4Cover(art, MP4Cover.FORMAT_JPEG)]
+	audio.save()
+
+
+def generate_library(directory: Path, count: int, seed: int = 1) -> Path:
+	"""Create ``count`` tracks under ``directory`` as ``Artist/Album/NN - Title.ext``.
+
+	A library generated earlier with the same count and seed is reused as is.
+	"""
+	marker = directory / _MARKER
+	wanted = {"count": count, "seed": seed}
+	try:
+		if json.loads(marker.read_text()) == wanted:
+			return directory
+	except (OSError, ValueError):
+		pass
+	if directory.exists():
+		shutil.rmtree(directory)
+	directory.mkdir(parents=True)
+
+	rng = random.Random(seed)
+	sizes = [edge for edge, _ in _COVERS]
+	weights = [weight for _, weight in _COVERS]
+	# Covers are shared by whole albums; a small pool keeps generation fast.
+	pool: Dict[int, List[bytes]] = {
+		edge: [_cover_jpeg(edge, seed * 100 + idx) for idx in range(4)] for edge in sizes if edge
+	}
+	written = 0
+	artist_index = 0
+	while written < count:
+		artist_index += 1
+		artist = f"{_name(rng, 2)} {artist_index}"
+		for album_index in range(rng.randint(*_ALBUMS_PER_ARTIST)):
+			if written >= count:
+				break
+			album = f"{_name(rng, rng.randint(1, 3))} {album_index + 1}"
+			folder = directory / artist / album
+			folder.mkdir(parents=True)
+			edge = rng.choices(sizes, weights)[0]
+			art = rng.choice(pool[edge]) if edge else None
+			if art is None and rng.random() < _SIDECAR_SHARE:
+				(folder / "cover.jpg").write_bytes(pool[sizes[1]][0])
+			for number in range(1, rng.randint(*_TRACKS_PER_ALBUM) + 1):
+				if written >= count:
+					break
+				title = _name(rng, rng.randint(1, 4))
+				stem = f"{number:02d} - {title}"
+				if rng.random() < _M4A_SHARE:
+					_write_m4a(folder / f"{stem}.m4a", title, artist, album, number, art, rng.uniform(120, 420))
+				else:
+					_write_mp3(folder / f"{stem}.mp3", title, artist, album, number, art, rng.randint(20, 80))
+				written += 1
+	marker.write_text(json.dumps(wanted))
+	return directory
+
+
+def _io_counters() -> Dict[str, int]:
+	try:
+		with open("/proc/self/io") as handle:
+			return {key: int(value) for key, value in (line.split(": ") for line in handle)}
+	except OSError:
+		return {}
+
+
+def _rss_mib() -> float:
+	try:
+		with open("/proc/self/statm") as handle:
+			resident = int(handle.read().split()[1])
+	except (OSError, IndexError, ValueError):
+		return 0.0
+	return resident * resource.getpagesize() / (1024 * 1024)
+
+
+def _peak_rss_mib(who: int) -> float:
+	peak = resource.getrusage(who).ru_maxrss
+	# Linux reports KiB, macOS bytes.
+	return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(engine: str, music_dir: Path, db_path: Path) -> dict:
+	"""Run one scan in this process and report its cost."""
+	from .library import LibraryIndex
+
+	library = LibraryIndex(db_path)
+	# Imports alone (Qt among them) set a high floor for the peak; report it apart.
+	start_rss = _rss_mib()
+	before = _io_counters()
+	started = time.perf_counter()
+	if engine == "scan":
+		from .playlist_control import scan_music_directory
+
+		files = len(scan_music_directory(music_dir, library))
+	else:
+		from PySide6.QtCore import QCoreApplication
+
+		from .scanner import ScanEngine
+
+		# Batches reach the window through the event loop, so run one as the app would.
+		app = QCoreApplication.instance() or QCoreApplication([])
+		scanner = ScanEngine(library, executor=engine)
+		found = []
+		scanner.songs_found.connect(found.extend)
+		scanner.finished.connect(lambda _count: app.quit())
+		scanner.start(music_dir)
+		app.exec()
+		files = len(found)
+	elapsed = time.perf_counter() - started
+	after = _io_counters()
+	library.close()
+	return {
+		"files": files,
+		"seconds": elapsed,
+		"files_per_second": files / elapsed if elapsed else 0.0,
+		"start_rss_mib": start_rss,
+		"peak_rss_mib": _peak_rss_mib(resource.RUSAGE_SELF),
+		"children_peak_rss_mib": _peak_rss_mib(resource.RUSAGE_CHILDREN),
+		"read_syscalls": after.get("syscr", 0) - before.get("syscr", 0),
+		"write_syscalls": after.get("syscw", 0) - before.get("syscw", 0),
+	}
+
+
+def _strace_calls(report: Path) -> Optional[int]:
+	"""Total call count from an ``strace -c`` summary."""
+	try:
+		lines = report.read_text().splitlines()
+	except OSError:
+		return None
+	header = next((line for line in lines if "calls" in line and "syscall" in line), None)
+	total = next((line for line in lines if line.rstrip().endswith("total")), None)
+	if header is None or total is None:
+		return None
+	end = header.index("calls") + len("calls")
+	try:
+		return int(total[:end].split()[-1])
+	except (IndexError, ValueError):
+		return None
+
+
+def _run_child(engine: str, music_dir: Path, db_path: Path, strace: bool) -> dict:
+	command = [sys.executable, "-m", __spec__.name, "--measure", engine, str(music_dir), str(db_path)]
+	report = db_path.with_suffix(".strace")
+	if strace:
+		command = ["strace", "-f", "-c", "-o", str(report), *command]
+	result = subprocess.run(command, capture_output=True, text=True, cwd=Path(__file__).resolve().parents[2])
+	if result.returncode != 0:
+		raise RuntimeError(result.stderr.strip() or f"benchmark child exited with {result.returncode}")
+	stats = json.loads(result.stdout.strip().splitlines()[-1])
+	if strace:
+		stats["syscalls"] = _strace_calls(report)
+	return stats
+
+
+def _parse_size(text: str) -> int:
+	text = text.lower()
+	scale = 1000 if text.endswith("k") else 1
+	return int(float(text.rstrip("k")) * scale)
+
+
+def _print_row(size: int, engine: str, phase: str, stats: dict) -> None:
+	syscalls = stats.get("syscalls")
+	print(
+		f"{size:>7} {engine:>8} {phase:>5} {stats['files']:>7} {stats['seconds']:>9.2f} "
+		f"{stats['files_per_second']:>9.0f} {stats['start_rss_mib']:>8.1f} {stats['peak_rss_mib']:>8.1f} {stats['children_peak_rss_mib']:>8.1f} "
+		f"{stats['read_syscalls']:>9} {stats['write_syscalls']:>8} {syscalls if syscalls is not None else '-':>9}"
+	)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--sizes", nargs="+", default=["1k", "10k"], help="library sizes, e.g. 1k 10k 100k")
+	parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+	parser.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="where libraries are generated and kept")
+	parser.add_argument("--seed", type=int, default=1)
+	parser.add_argument("--strace", action="store_true", help="count all syscalls with strace -f -c (slows the runs)")
+	parser.add_argument("--measure", nargs=3, metavar=("ENGINE", "MUSIC_DIR", "DB"), help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.measure:
+		engine, music_dir, db_path = args.measure
+		print(json.dumps(measure(engine, Path(music_dir), Path(db_path))))
+		return 0
+	if args.strace and shutil.which("strace") is None:
+		parser.error("--strace needs strace on PATH")
+
+	print(
+		f"{'size':>7} {'engine':>8} {'pass':>5} {'files':>7} {'seconds':>9} {'files/s':>9} "
+		f"{'base MiB':>8} {'peak MiB':>8} {'kids MiB':>8} {'read sc':>9} {'write sc':>8} {'syscalls':>9}"
+	)
+	for size in map(_parse_size, args.sizes):
+		started = time.perf_counter()
+		music_dir = generate_library(args.root / f"library-{size}", size, args.seed)
+		generated = time.perf_counter() - started
+		if generated > 1.0:
+			print(f"generated {size} tracks in {generated:.1f}s", file=sys.stderr)
+		for engine in args.engines:
+			with tempfile.TemporaryDirectory(prefix="karu-bench-") as scratch:
+				db_path = Path(scratch) / "library.sqlite3"
+				# Cold parses every file into an empty index; warm finds them all unchanged.
+				for phase in ("cold", "warm"):
+					_print_row(size, engine, phase, _run_child(engine, music_dir, db_path, args.strace))
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
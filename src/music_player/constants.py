@@ -1,6 +1,70 @@
-from ..constants import IMAGE_DIR, MUSIC_DIR
+from ..constants import ART_CACHE_DIR, IMAGE_DIR, LIBRARY_DB_FILE, MUSIC_DIR, PLAYLIST_DIR
 
 MUSIC_PLAYER_ICON_DIR = IMAGE_DIR / "music-player"
 NO_ART_IMAGE_PATH = MUSIC_PLAYER_ICON_DIR / "no-art-found.png"
 
-__all__ = ["IMAGE_DIR", "MUSIC_DIR", "MUSIC_PLAYER_ICON_DIR", "NO_ART_IMAGE_PATH"]
\ No newline at end of file
+# Tag parsing pool: "thread" or "process". Spawned workers cost start-up time and
+# memory; measure with ``python -m src.music_player.benchmark`` before switching.
+SCAN_EXECUTOR = "thread"
+SCAN_MAX_WORKERS = None
+SCAN_BATCH_SIZE = 200
+# Files parsed per pool task, so workers are not paid one round trip per file.
+SCAN_CHUNK_SIZE = 32
+# Below this many changed files a process pool costs more to start than it saves.
+SCAN_PROCESS_THRESHOLD = 64
+
+# Open the predicted next track in a standby player so track changes are gapless.
+GAPLESS_PLAYBACK = True
+# Bytes of the next file to read ahead into the page cache.
+GAPLESS_PREFETCH_BYTES = 4 * 1024 * 1024
+# Overlap between consecutive tracks; 0 switches at the end of the track.
+CROSSFADE_MS = 0
+
+# Loudness normalization: tracks are steered towards this level (ReplayGain 2.0 reference).
+LOUDNESS_NORMALIZATION = True
+LOUDNESS_TARGET_LUFS = -18.0
+# Pause between analyzed files so background decoding stays out of the way.
+ANALYSIS_IDLE_DELAY_MS = 500
+
+# Scrolling of titles too long for the title area, in pixels per second and frames per second.
+MARQUEE_SPEED = 40.0
+MARQUEE_FPS = 30
+
+# Cover thumbnails: logical size in pixels and how many scaled pixmaps stay in memory.
+ART_THUMBNAIL_SIZE = 100
+ART_CACHE_ENTRIES = 64
+
+# Spectrum analysis of the playing audio: tapped sample rate, FFT window, band count and frame cap.
+SPECTRUM_RATE = 22050
+SPECTRUM_FFT_SIZE = 1024
+SPECTRUM_BANDS = 16
+SPECTRUM_FPS = 30
+
+__all__ = [
+	"ART_CACHE_DIR",
+	"IMAGE_DIR",
+	"LIBRARY_DB_FILE",
+	"MUSIC_DIR",
+	"PLAYLIST_DIR",
+	"MUSIC_PLAYER_ICON_DIR",
+	"NO_ART_IMAGE_PATH",
+	"SCAN_EXECUTOR",
+	"SCAN_MAX_WORKERS",
+	"SCAN_BATCH_SIZE",
+	"SCAN_CHUNK_SIZE",
+	"SCAN_PROCESS_THRESHOLD",
+	"GAPLESS_PLAYBACK",
+	"GAPLESS_PREFETCH_BYTES",
+	"CROSSFADE_MS",
+	"LOUDNESS_NORMALIZATION",
+	"LOUDNESS_TARGET_LUFS",
+	"ANALYSIS_IDLE_DELAY_MS",
+	"MARQUEE_SPEED",
+	"MARQUEE_FPS",
+	"ART_THUMBNAIL_SIZE",
+	"ART_CACHE_ENTRIES",
+	"SPECTRUM_RATE",
+	"SPECTRUM_FFT_SIZE",
+	"SPECTRUM_BANDS",
+	"SPECTRUM_FPS",
+]
\ No newline at end of file
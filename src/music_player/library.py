@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+LibraryRow = Dict[str, Any]
+
+# Each entry upgrades the schema by one version; ``PRAGMA user_version`` records
+# how many have been applied so existing caches are migrated in place.
+_MIGRATIONS = (
+	"""
+	CREATE TABLE tracks (
+		path TEXT PRIMARY KEY,
+		size INTEGER NOT NULL,
+		mtime_ns INTEGER NOT NULL,
+		title TEXT,
+		artist TEXT,
+		duration REAL,
+		art_hash TEXT
+	)
+	""",
+	"ALTER TABLE tracks ADD COLUMN added_at REAL",
+	"UPDATE tracks SET added_at = mtime_ns / 1e9 WHERE added_at IS NULL",
+	"ALTER TABLE tracks ADD COLUMN album TEXT",
+	# Rows written before album tags were read must be parsed again.
+	"UPDATE tracks SET mtime_ns = -1",
+	# Loudness gain in dB; NULL until the analyzer has measured the file.
+	"ALTER TABLE tracks ADD COLUMN gain REAL",
+	# Waveform envelopes live apart from track rows so snapshots stay small.
+	"""
+	CREATE TABLE envelopes (
+		path TEXT PRIMARY KEY,
+		size INTEGER NOT NULL,
+		mtime_ns INTEGER NOT NULL,
+		data BLOB NOT NULL
+	)
+	""",
+	# Measure again so tracks analyzed for loudness alone also get an envelope.
+	"UPDATE tracks SET gain = NULL",
+	# Parsed M3U playlists, reused while the file's size and mtime are unchanged.
+	"""
+	CREATE TABLE playlists (
+		name TEXT PRIMARY KEY,
+		size INTEGER NOT NULL,
+		mtime_ns INTEGER NOT NULL
+	)
+	""",
+	"""
+	CREATE TABLE playlist_entries (
+		playlist TEXT NOT NULL,
+		position INTEGER NOT NULL,
+		path TEXT NOT NULL,
+		title TEXT,
+		artist TEXT,
+		duration REAL,
+		PRIMARY KEY (playlist, position)
+	) WITHOUT ROWID
+	""",
+	# Tempo in BPM and first-beat time in seconds; NULL when no steady pulse was found.
+	"ALTER TABLE tracks ADD COLUMN bpm REAL",
+	"ALTER TABLE tracks ADD COLUMN beat_offset REAL",
+	# Measure again so analyzed tracks also get a beat grid.
+	"UPDATE tracks SET gain = NULL",
+	# Whether the file embeds lyrics; NULL for rows written before scans looked.
+	"ALTER TABLE tracks ADD COLUMN has_lyrics INTEGER",
+)
+
+_TRACK_COLUMNS = (
+	"path",
+	"size",
+	"mtime_ns",
+	"title",
+	"artist",
+	"duration",
+	"art_hash",
+	"added_at",
+	"album",
+	"gain",
+	"bpm",
+	"beat_offset",
+	"has_lyrics",
+)
+# Columns that describe the file's history rather than its contents survive re-tagging.
+_PRESERVED_COLUMNS = ("path", "added_at")
+_PLAYLIST_ENTRY_COLUMNS = ("path", "title", "artist", "duration")
+# Stay well below SQLite's bound-parameter limit.
+_QUERY_CHUNK = 500
+
+
+class LibraryIndex:
+	"""On-disk cache of track metadata, keyed by file path and validated by size/mtime."""
+
+	def __init__(self, db_path: Path):
+		self.db_path = db_path
+		self._lock = threading.Lock()
+		self._conn: Optional[sqlite3.Connection] = None
+		try:
+			db_path.parent.mkdir(parents=True, exist_ok=True)
+			self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+			self._migrate()
+		except (sqlite3.DatabaseError, OSError) as e:
+			# A corrupt or unwritable cache is never worth failing over; fall back to memory.
+			print(f"Error opening library index: {e}")
+			if self._conn is not None:
+				self._conn.close()
+			self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+			self._migrate()
+
+	def _migrate(self) -> None:
+		with self._lock, self._conn:
+			self._conn.execute("PRAGMA journal_mode=WAL")
+			self._conn.execute("PRAGMA synchronous=NORMAL")
+			version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+			for statement in _MIGRATIONS[version:]:
+				self._conn.execute(statement)
+			self._conn.execute(f"PRAGMA user_version={len(_MIGRATIONS)}")
+
+	def snapshot(self) -> Dict[str, LibraryRow]:
+		"""Return every indexed track keyed by path, in a single query."""
+		with self._lock:
+			cursor = self._conn.execute(f"SELECT {', '.join(_TRACK_COLUMNS)} FROM tracks")
+			return {row[0]: dict(zip(_TRACK_COLUMNS, row)) for row in cursor}
+
+	def upsert_many(self, rows: Iterable[LibraryRow]) -> None:
+		placeholders = ", ".join("?" for _ in _TRACK_COLUMNS)
+		updates = ", ".join(
+			f"{column} = excluded.{column}" for column in _TRACK_COLUMNS if column not in _PRESERVED_COLUMNS
+		)
+		values = [tuple(row.get(column) for column in _TRACK_COLUMNS) for row in rows]
+		if not values:
+			return
+		with self._lock, self._conn:
+			self._conn.executemany(
+				f"INSERT INTO tracks ({', '.join(_TRACK_COLUMNS)}) VALUES ({placeholders}) "
+				f"ON CONFLICT(path) DO UPDATE SET {updates}",
+				values,
+			)
+
+	def remove_many(self, paths: Iterable[str]) -> None:
+		values = [(path,) for path in paths]
+		if not values:
+			return
+		with self._lock, self._conn:
+			self._conn.executemany("DELETE FROM tracks WHERE path = ?", values)
+			self._conn.executemany("DELETE FROM envelopes WHERE path = ?", values)
+
+	def rows_under(self, directory: str) -> Dict[str, LibraryRow]:
+		"""Return rows for every track below ``directory``, using the primary key as a range index."""
+		prefix = directory.rstrip(os.sep) + os.sep
+		upper = prefix[:-1] + chr(ord(os.sep) + 1)
+		with self._lock:
+			cursor = self._conn.execute(
+				f"SELECT {', '.join(_TRACK_COLUMNS)} FROM tracks WHERE path >= ? AND path < ?",
+				(prefix, upper),
+			)
+			return {row[0]: dict(zip(_TRACK_COLUMNS, row)) for row in cursor}
+
+	def store_analysis(
+		self,
+		path: str,
+		size: int,
+		mtime_ns: int,
+		gain: float,
+		envelope: Optional[bytes],
+		bpm: Optional[float] = None,
+		beat_offset: Optional[float] = None,
+	) -> bool:
+		"""Store measured gain, envelope and beat grid, unless the file changed since it was measured."""
+		with self._lock, self._conn:
+			cursor = self._conn.execute(
+				"UPDATE tracks SET gain = ?, bpm = ?, beat_offset = ? WHERE path = ? AND size = ? AND mtime_ns = ?",
+				(gain, bpm, beat_offset, path, size, mtime_ns),
+			)
+			if cursor.rowcount == 0:
+				return False
+			if envelope:
+				self._conn.execute(
+					"INSERT OR REPLACE INTO envelopes (path, size, mtime_ns, data) VALUES (?, ?, ?, ?)",
+					(path, size, mtime_ns, envelope),
+				)
+			return True
+
+	def envelope(self, path: str, size: int, mtime_ns: int) -> Optional[bytes]:
+		with self._lock:
+			row = self._conn.execute(
+				"SELECT data FROM envelopes WHERE path = ? AND size = ? AND mtime_ns = ?",
+				(path, size, mtime_ns),
+			).fetchone()
+		return row[0] if row else None
+
+	def rows_for(self, paths: Iterable[str]) -> Dict[str, LibraryRow]:
+		"""Return indexed rows for ``paths``, skipping any that are not indexed."""
+		paths = list(paths)
+		rows: Dict[str, LibraryRow] = {}
+		with self._lock:
+			for start in range(0, len(paths), _QUERY_CHUNK):
+				chunk = paths[start : start + _QUERY_CHUNK]
+				cursor = self._conn.execute(
+					f"SELECT {', '.join(_TRACK_COLUMNS)} FROM tracks "
+					f"WHERE path IN ({', '.join('?' for _ in chunk)})",
+					chunk,
+				)
+				rows.update((row[0], dict(zip(_TRACK_COLUMNS, row))) for row in cursor)
+		return rows
+
+	def playlist_entries(self, name: str, size: int, mtime_ns: int) -> Optional[List[tuple]]:
+		"""Cached ``(path, title, artist, duration)`` entries, or ``None`` if the file changed."""
+		with self._lock:
+			cached = self._conn.execute(
+				"SELECT 1 FROM playlists WHERE name = ? AND size = ? AND mtime_ns = ?",
+				(name, size, mtime_ns),
+			).fetchone()
+			if cached is None:
+				return None
+			return self._conn.execute(
+				f"SELECT {', '.join(_PLAYLIST_ENTRY_COLUMNS)} FROM playlist_entries "
+				"WHERE playlist = ? ORDER BY position",
+				(name,),
+			).fetchall()
+
+	def store_playlist(self, name: str, size: int, mtime_ns: int, entries: Iterable[tuple]) -> None:
+		with self._lock, self._conn:
+			self._conn.execute("DELETE FROM playlist_entries WHERE playlist = ?", (name,))
+			self._conn.execute(
+				"INSERT OR REPLACE INTO playlists (name, size, mtime_ns) VALUES (?, ?, ?)",
+				(name, size, mtime_ns),
+			)
+			self._conn.executemany(
+				f"INSERT INTO playlist_entries (playlist, position, {', '.join(_PLAYLIST_ENTRY_COLUMNS)}) "
+				"VALUES (?, ?, ?, ?, ?, ?)",
+				((name, position, *entry) for position, entry in enumerate(entries)),
+			)
+
+	def remove_playlist(self, name: str) -> None:
+		with self._lock, self._conn:
+			self._conn.execute("DELETE FROM playlist_entries WHERE playlist = ?", (name,))
+			self._conn.execute("DELETE FROM playlists WHERE name = ?", (name,))
+
+	def close(self) -> None:
+		with self._lock:
+			self._conn.close()
+
+
+__all__ = ["LibraryIndex", "LibraryRow"]
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+import numpy as np
+
+from .constants import LOUDNESS_TARGET_LUFS
+
+# BS.1770 measures 400 ms blocks with 75% overlap, i.e. four 100 ms steps.
+_STEPS_PER_BLOCK = 4
+_ABSOLUTE_GATE = -70.0
+_RELATIVE_GATE = -10.0
+# Positive gains can only be applied by the volume ceiling; keep them modest.
+MAX_GAIN_DB = 12.0
+
+
+def _k_weighting_power(rate: int, size: int) -> np.ndarray:
+	"""Squared magnitude of the BS.1770 K-weighting filter at the rfft bins of ``size`` samples."""
+	z = np.exp(-1j * np.pi * np.fft.rfftfreq(size, 1.0 / rate) / (rate / 2.0))
+
+	def biquad(b, a):
+		return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+	# High shelf modelling the head, then the RLB high-pass; this bilinear form
+	# reproduces the published 48 kHz coefficients and extends to other rates.
+	gain_db, q, fc = 3.999843853973347, 0.7071752369554196, 1681.974450955533
+	k = math.tan(math.pi * fc / rate)
+	vh = 10.0 ** (gain_db / 20.0)
+	vb = vh ** 0.4996667741545416
+	shelf = biquad(
+		(vh + vb * k / q + k * k, 2.0 * (k * k - vh), vh - vb * k / q + k * k),
+		(1.0 + k / q + k * k, 2.0 * (k * k - 1.0), 1.0 - k / q + k * k),
+	)
+	q, fc = 0.5003270373238773, 38.13547087602444
+	k = math.tan(math.pi * fc / rate)
+	high_pass = biquad(
+		(1.0, -2.0, 1.0),
+		(1.0 + k / q + k * k, 2.0 * (k * k - 1.0), 1.0 - k / q + k * k),
+	)
+	return np.abs(shelf * high_pass) ** 2
+
+
+class LoudnessMeter:
+	"""Integrated loudness of interleaved float samples fed in arbitrary chunks.
+
+	Samples are cut into 100 ms steps and K-weighted in the frequency domain
+	(Parseval), so each chunk is one vectorized FFT over all complete steps.
+	"""
+
+	def __init__(self, rate: int, channels: int):
+		self.channels = channels
+		self._step = rate // 10
+		self._weights = _k_weighting_power(rate, self._step)
+		self._pending = np.empty((0, channels), dtype=np.float32)
+		self._powers: List[np.ndarray] = []
+
+	def feed(self, samples: np.ndarray) -> None:
+		frames = samples.reshape(-1, self.channels)
+		if len(self._pending):
+			frames = np.concatenate((self._pending, frames))
+		size = self._step
+		steps = len(frames) // size
+		self._pending = frames[steps * size :].copy()
+		if not steps:
+			return
+		spectrum = np.fft.rfft(frames[: steps * size].reshape(steps, size, self.channels), axis=1)
+		weighted = (np.abs(spectrum) ** 2) * self._weights[None, :, None]
+		# Parseval for a one-sided spectrum: double every bin except DC (and Nyquist).
+		weighted[:, 1 : (size + 1) // 2] *= 2.0
+		self._powers.append(weighted.sum(axis=(1, 2)) / (size * size))
+
+	def integrated(self) -> Optional[float]:
+		"""Gated integrated loudness in LUFS, or ``None`` for silence or very short input."""
+		if not self._powers:
+			return None
+		steps = np.concatenate(self._powers)
+		if len(steps) < _STEPS_PER_BLOCK:
+			return None
+		window = np.lib.stride_tricks.sliding_window_view(steps, _STEPS_PER_BLOCK)
+		blocks = window.mean(axis=1)
+		with np.errstate(divide="ignore"):
+			loudness = -0.691 + 10.0 * np.log10(blocks)
+		blocks = blocks[loudness > _ABSOLUTE_GATE]
+		if not len(blocks):
+			return None
+		relative = -0.691 + 10.0 * math.log10(blocks.mean()) + _RELATIVE_GATE
+		with np.errstate(divide="ignore"):
+			gated = blocks[-0.691 + 10.0 * np.log10(blocks) > relative]
+		return -0.691 + 10.0 * math.log10(gated.mean())
+
+
+def gain_for(loudness: Optional[float], target: float = LOUDNESS_TARGET_LUFS) -> float:
+	if loudness is None:
+		return 0.0
+	return max(-MAX_GAIN_DB, min(MAX_GAIN_DB, target - loudness))
+
+
+def gain_to_volume(gain_db: Optional[float]) -> float:
+	"""Linear volume factor for a gain in dB; unknown gains leave volume unchanged."""
+	return 10.0 ** (gain_db / 20.0) if gain_db else 1.0
+
+
+__all__ = [
+	"LoudnessMeter",
+	"gain_for",
+	"gain_to_volume",
+	"MAX_GAIN_DB",
+]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, Signal
+
+from .playlist_control import Track
+from .tags import read_lyrics
+
+_TIMESTAMP = re.compile(r"\[(\d+):(\d{1,2}(?:[.:]\d{1,3})?)\]")
+_OFFSET = re.compile(r"\[offset:\s*([+-]?\d+)\s*\]", re.IGNORECASE)
+# Enhanced LRC word timings, e.g. ``<00:12.34>``; only whole lines are shown.
+_WORD_TIMESTAMP = re.compile(r"<\d+:\d{1,2}(?:[.:]\d{1,3})?>")
+
+
+class Lyrics:
+	"""Time-synced lines as parallel arrays sorted by start time in milliseconds."""
+
+	__slots__ = ("times", "lines")
+
+	def __init__(self, pairs: Iterable[Tuple[int, str]] = ()):
+		ordered = sorted(pairs, key=lambda pair: pair[0])
+		self.times: List[int] = [time for time, _ in ordered]
+		self.lines: List[str] = [line for _, line in ordered]
+
+	def __bool__(self) -> bool:
+		return bool(self.times)
+
+	def __len__(self) -> int:
+		return len(self.times)
+
+	def index_at(self, position_ms: int) -> int:
+		"""Index of the line showing at ``position_ms``, or -1 before the first line."""
+		return bisect_right(self.times, position_ms) - 1
+
+	def line_at(self, position_ms: int) -> str:
+		index = self.index_at(position_ms)
+		return self.lines[index] if index >= 0 else ""
+
+
+NO_LYRICS = Lyrics()
+
+
+def _milliseconds(minutes: str, seconds: str) -> int:
+	# Some writers separate hundredths with a colon: ``[01:02:50]``.
+	return round((int(minutes) * 60 + float(seconds.replace(":", "."))) * 1000)
+
+
+def parse_lrc(text: str) -> Lyrics:
+	"""Parse LRC text; a line may carry several timestamps, and ``[offset:]`` shifts them all."""
+	pairs: List[Tuple[int, str]] = []
+	offset = 0
+	for raw in text.splitlines():
+		line = raw.strip()
+		match = _OFFSET.fullmatch(line)
+		if match:
+			offset = int(match.group(1))
+			continue
+		times: List[int] = []
+		position = 0
+		while True:
+			match = _TIMESTAMP.match(line, position)
+			if match is None:
+				break
+			times.append(_milliseconds(match.group(1), match.group(2)))
+			position = match.end()
+		if times:
+			lyric = _WORD_TIMESTAMP.sub("", line[position:]).strip()
+			pairs.extend((time, lyric) for time in times)
+	# A positive offset shows lyrics earlier.
+	return Lyrics((max(0, time - offset), lyric) for time, lyric in pairs)
+
+
+def _read_text(path: Path) -> str:
+	raw = path.read_bytes()
+	try:
+		return raw.decode("utf-8-sig")
+	except UnicodeDecodeError:
+		return raw.decode("latin-1")
+
+
+def _read_lyrics(song: Track) -> Lyrics:
+	if song.lyrics_path:
+		try:
+			lyrics = parse_lrc(_read_text(Path(song.lyrics_path)))
+		except OSError as e:
+			print(f"Error reading lyrics: {e}")
+		else:
+			if lyrics:
+				return lyrics
+	if song.has_lyrics is False:
+		# The scan found no lyrics in the tags; skip parsing the file again.
+		return NO_LYRICS
+	tag = read_lyrics(Path(song.path))
+	if tag.synced:
+		return Lyrics((time, line.strip()) for time, line in tag.synced)
+	if tag.text:
+		# Unsynced lyrics are only usable when they were pasted in LRC form.
+		return parse_lrc(tag.text)
+	return NO_LYRICS
+
+
+class LyricsService(QObject):
+	"""Reads lyrics off the GUI thread, like ``ArtService`` does for covers.
+
+	Only tracks with a sidecar or embedded lyrics touch the disk; results are
+	kept on the track, so each file is read at most once.
+	"""
+
+	lyrics_ready = Signal(str, object)
+
+	_loaded = Signal(str, object)
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self._waiting: Dict[str, List[Track]] = {}
+		self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+			max_workers=1, thread_name_prefix="music-lyrics"
+		)
+		self._loaded.connect(self._store)
+
+	def request(self, song: Track) -> Optional[Lyrics]:
+		"""Return the lyrics when known without reading; otherwise ``lyrics_ready`` follows."""
+		if song.lyrics is None and not song.lyrics_path and song.has_lyrics is False:
+			song.lyrics = NO_LYRICS
+		if song.lyrics is not None:
+			return song.lyrics
+		waiting = self._waiting.setdefault(song.path, [])
+		if song not in waiting:
+			waiting.append(song)
+		if len(waiting) == 1 and self._executor is not None:
+			self._executor.submit(self._produce, song)
+		return None
+
+	def shutdown(self) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			self._executor = None
+
+	def _produce(self, song: Track) -> None:
+		# Runs on the worker thread; the track itself is only updated on the GUI thread.
+		try:
+			lyrics = _read_lyrics(song)
+		except Exception as e:
+			print(f"Error reading lyrics: {e}")
+			lyrics = NO_LYRICS
+		self._loaded.emit(song.path, lyrics)
+
+	def _store(self, path: str, lyrics: Lyrics) -> None:
+		for song in self._waiting.pop(path, []):
+			song.lyrics = lyrics
+		self.lyrics_ready.emit(path, lyrics)
+
+
+__all__ = ["Lyrics", "LyricsService", "NO_LYRICS", "parse_lrc"]
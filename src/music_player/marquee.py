@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from PySide6.QtCore import QElapsedTimer, QEvent, QRect, QSize, Qt, QTimer
+from PySide6.QtGui import QPainter, QPixmap
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from .constants import MARQUEE_FPS, MARQUEE_SPEED
+
+# Space between the end of the text and its next repetition.
+_GAP_TEXT = "     •     "
+
+
+class MarqueeLabel(QWidget):
+	"""Single-line label that scrolls text too wide to fit.
+
+	The text is rendered into a pixmap once per text, font or palette change;
+	each frame only blits that pixmap at a new pixel offset. The frame timer
+	runs only while the text overflows and the widget is actually on screen.
+	"""
+
+	def __init__(self, text: str = "", parent=None, speed: float = MARQUEE_SPEED, fps: int = MARQUEE_FPS):
+		super().__init__(parent)
+		self._text = text
+		self._pixmap: Optional[QPixmap] = None
+		# Text width and scroll period in pixels, measured once per text or font.
+		self._metrics: Optional[tuple[int, int]] = None
+		self._offset = 0.0
+		self._speed = speed
+		self._timer = QTimer(self)
+		self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+		self._timer.setInterval(max(1, 1000 // max(1, fps)))
+		self._timer.timeout.connect(self._step)
+		self._clock = QElapsedTimer()
+		self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Fixed)
+
+	def text(self) -> str:
+		return self._text
+
+	def setText(self, text: str) -> None:
+		text = text or ""
+		if text == self._text:
+			return
+		self._text = text
+		self._invalidate()
+		self._offset = 0.0
+		self.updateGeometry()
+		self._update_running()
+		self.update()
+
+	def sizeHint(self) -> QSize:
+		return QSize(self._text_width(), self.fontMetrics().height())
+
+	def minimumSizeHint(self) -> QSize:
+		return QSize(0, self.fontMetrics().height())
+
+	def _invalidate(self) -> None:
+		self._pixmap = None
+		self._metrics = None
+
+	def _measure(self) -> tuple[int, int]:
+		if self._metrics is None:
+			metrics = self.fontMetrics()
+			width = metrics.horizontalAdvance(self._text)
+			self._metrics = (width, width + metrics.horizontalAdvance(_GAP_TEXT))
+		return self._metrics
+
+	def _text_width(self) -> int:
+		return self._measure()[0]
+
+	def _overflows(self) -> bool:
+		return self._text_width() > self.width()
+
+	def _update_running(self) -> None:
+		running = (
+			self._speed > 0
+			and self.isVisible()
+			and not self.window().isMinimized()
+			and self._overflows()
+		)
+		if running and not self._timer.isActive():
+			self._clock.start()
+			self._timer.start()
+		elif not running:
+			self._timer.stop()
+			if self._offset:
+				self._offset = 0.0
+				self.update()
+
+	def _step(self) -> None:
+		elapsed = self._clock.restart()
+		period = self._measure()[1]
+		self._offset = (self._offset + self._speed * elapsed / 1000.0) % max(1, period)
+		self.update()
+
+	def _render(self) -> QPixmap:
+		ratio = self.devicePixelRatioF()
+		size = QSize(max(1, self._text_width()), self.fontMetrics().height())
+		pixmap = QPixmap(size * ratio)
+		pixmap.setDevicePixelRatio(ratio)
+		pixmap.fill(Qt.GlobalColor.transparent)
+		painter = QPainter(pixmap)
+		painter.setFont(self.font())
+		painter.setPen(self.palette().color(self.foregroundRole()))
+		painter.drawText(
+			QRect(0, 0, size.width(), size.height()),
+			Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+			self._text,
+		)
+		painter.end()
+		return pixmap
+
+	def paintEvent(self, event):
+		if not self._text:
+			return
+		if self._pixmap is None:
+			self._pixmap = self._render()
+		painter = QPainter(self)
+		y = round(self.height() - self._pixmap.deviceIndependentSize().height()) // 2
+		x = -round(self._offset)
+		painter.drawPixmap(x, y, self._pixmap)
+		if self._timer.isActive():
+			painter.drawPixmap(x + self._measure()[1], y, self._pixmap)
+		painter.end()
+
+	def resizeEvent(self, event):
+		super().resizeEvent(event)
+		self._update_running()
+
+	def showEvent(self, event):
+		super().showEvent(event)
+		self._update_running()
+
+	def hideEvent(self, event):
+		super().hideEvent(event)
+		# Minimizing sends a spontaneous hide while isVisible() stays true.
+		self._timer.stop()
+
+	def changeEvent(self, event):
+		if event.type() in (QEvent.Type.FontChange, QEvent.Type.PaletteChange, QEvent.Type.StyleChange):
+			self._invalidate()
+			self.updateGeometry()
+			self._update_running()
+			self.update()
+		super().changeEvent(event)
+
+
+__all__ = ["MarqueeLabel"]
@@ -1,47 +1,94 @@
+import bisect
+import os
+from pathlib import Path
+
 from PySide6.QtWidgets import (QDialog, QFrame,
 							   QHBoxLayout, QLabel,
 							   QPushButton, QSlider,
-							   QStyle, QTableWidget,
-							   QTableWidgetItem, QTextBrowser,
+							   QStyle, QTableView,
+							   QTextBrowser,
 							   QVBoxLayout, QWidget,
-							   QHeaderView, QAbstractItemView)
-from PySide6.QtCore import QPoint, Qt, QUrl, QSize
-from PySide6.QtGui import QIcon, QPixmap
+							   QHeaderView, QAbstractItemView,
+							   QComboBox, QLineEdit, QMenu,
+							   QFileDialog, QInputDialog, QMessageBox,
+							   QSizePolicy)
+from PySide6.QtCore import QEvent, QPoint, Qt, QUrl, QSize, Signal
+from PySide6.QtGui import QIcon
 from PySide6.QtMultimedia import QMediaPlayer
 
-from .constants import IMAGE_DIR, MUSIC_DIR, MUSIC_PLAYER_ICON_DIR, NO_ART_IMAGE_PATH
+from .constants import (
+	GAPLESS_PLAYBACK,
+	IMAGE_DIR,
+	LIBRARY_DB_FILE,
+	LOUDNESS_NORMALIZATION,
+	MUSIC_DIR,
+	MUSIC_PLAYER_ICON_DIR,
+	PLAYLIST_DIR,
+)
+from .analysis import TrackAnalyzer
+from .art import ArtService
+from .library import LibraryIndex
+from .lyrics import NO_LYRICS, LyricsService
+from .marquee import MarqueeLabel
 from .styles import HELP_HTML, MUSIC_PLAYER_STYLESHEET
 from .utils import (
 	format_artist_display,
-	format_song_label,
 	format_time,
-	format_title_display,
-)
-from .playlist_control import (
-	build_shuffle_queue,
-	ensure_shuffle_queue,
-	remove_from_shuffle_queue,
-	scan_music_directory,
+	format_track_count,
 )
+from .play_queue import PlayQueue
+from .playlist_control import build_song
+from .playlists import PlaylistStore, clean_playlist_name, resolve_entries
+from .scanner import ScanEngine
+from .search import DEFAULT_SORT_MODE, SORT_MODES, TrackSearchIndex
+from .spectrum import SpectrumAnalyzer, SpectrumBars
+from .track_model import TrackTableModel
+from .watcher import LibraryWatcher
+from .waveform import WaveformSlider
 
 
 class MusicPlayerWindow(QWidget):
+	scan_finished = Signal()
+
 	def __init__(self, media_player, tray_actions, parent=None):
 		super().__init__(parent)
 		self.media_player = media_player
 		self.tray_actions = tray_actions
-		self.playlist = []
 		self.current_index = -1
 		self.playback_mode = "normal"
+		self.gapless = GAPLESS_PLAYBACK
+		self.normalize_loudness = LOUDNESS_NORMALIZATION
 		self.is_muted = False
 		self.volume = 1.0
 		self.drag_pos = QPoint()
 		self._control_icon_size = QSize(22, 22)
 		self._play_icon_size = QSize(32, 32)
-		self._shuffle_queue = []
-		self._marquee_timer = None
-		self._marquee_text = ""
-		self._marquee_index = 0
+		self.play_queue = PlayQueue()
+		self.library = LibraryIndex(LIBRARY_DB_FILE)
+		self.scan_engine = ScanEngine(self.library, parent=self)
+		self.search_index = TrackSearchIndex()
+		self.sort_mode = DEFAULT_SORT_MODE
+		self.library_watcher = LibraryWatcher(self.library, parent=self)
+		self.track_analyzer = TrackAnalyzer(self.library, parent=self)
+		self.art_service = ArtService(parent=self)
+		self.lyrics_service = LyricsService(parent=self)
+		self.spectrum = SpectrumAnalyzer(parent=self)
+		self.spectrum.attach(self.media_player)
+		# Key of the thumbnail the info panel is waiting for.
+		self._art_key = None
+		# Lyrics of the shown track and the index of the line on screen.
+		self._lyrics = NO_LYRICS
+		self._lyric_index = -1
+		# Tracks waiting for a loudness measurement, by path.
+		self._awaiting_gain = {}
+		self.playlist_store = PlaylistStore(PLAYLIST_DIR, self.library)
+		# Name of the playlist shown instead of the library, if any.
+		self.active_playlist = None
+		# Playlist entries outside the library, indexed for search while shown.
+		self._playlist_extras = []
+		# False while hidden or minimized: playback-driven widget updates are
+		# skipped and the widgets resync from the player when shown again.
+		self._ui_active = False
 
 		self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint)
 		self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, True)
@@ -60,6 +107,38 @@ class MusicPlayerWindow(QWidget):
 		self.hide()
 		event.ignore()
 
+	def showEvent(self, event):
+		super().showEvent(event)
+		self._set_ui_active(not self.isMinimized())
+
+	def hideEvent(self, event):
+		super().hideEvent(event)
+		self._set_ui_active(False)
+
+	def changeEvent(self, event):
+		if event.type() == QEvent.Type.WindowStateChange:
+			self._set_ui_active(self.isVisible() and not self.isMinimized())
+		super().changeEvent(event)
+
+	def _set_ui_active(self, active):
+		if active == self._ui_active:
+			return
+		self._ui_active = active
+		if active:
+			self._resync_ui()
+
+	def _resync_ui(self):
+		"""Bring playback widgets up to date in one step after being hidden."""
+		duration = self.media_player.duration()
+		if duration <= 0:
+			song = self.track_model.track(self.current_index)
+			duration = int(song.duration * 1000) if song is not None and song.duration else 0
+		self.set_slider_range(duration)
+		self.update_slider_position(self.media_player.position())
+		self.update_lyrics(self.media_player.position())
+		self.update_play_pause_icon(self.media_player.playbackState())
+		self.update_volume_icon()
+
 	def _setup_ui(self):
 		"""Construct the music player window layout."""
 		self.central_frame = QFrame(self)
@@ -84,13 +163,21 @@ class MusicPlayerWindow(QWidget):
 
 		title_artist_layout = QVBoxLayout()
 		title_artist_layout.setContentsMargins(0, 5, 0, 5)
-		self.title_label = QLabel("Welcome to Your Pet Music Player")
+		self.title_label = MarqueeLabel("Welcome to Your Pet Music Player")
 		self.title_label.setObjectName("TitleLabel")
 		self.artist_label = QLabel("Select a song to start")
 		self.artist_label.setObjectName("ArtistLabel")
+		self.lyrics_label = QLabel()
+		self.lyrics_label.setObjectName("LyricsLabel")
+		# Long lines are clipped rather than widening the window.
+		self.lyrics_label.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Preferred)
+		self.spectrum_bars = SpectrumBars()
+		self.spectrum_bars.setFixedHeight(28)
 		title_artist_layout.addWidget(self.title_label)
 		title_artist_layout.addWidget(self.artist_label)
+		title_artist_layout.addWidget(self.lyrics_label)
 		title_artist_layout.addStretch()
+		title_artist_layout.addWidget(self.spectrum_bars)
 
 		info_layout.addWidget(self.thumbnail_label)
 		info_layout.addLayout(title_artist_layout)
@@ -98,8 +185,9 @@ class MusicPlayerWindow(QWidget):
 		progress_layout = QHBoxLayout()
 		self.current_time_label = QLabel("0:00")
 		self.current_time_label.setObjectName("TimeLabel")
-		self.progress_slider = QSlider(Qt.Orientation.Horizontal)
+		self.progress_slider = WaveformSlider(Qt.Orientation.Horizontal)
 		self.progress_slider.setToolTip("Seek")
+		self.progress_slider.setMinimumHeight(28)
 		self.total_time_label = QLabel("0:00")
 		self.total_time_label.setObjectName("TimeLabel")
 		progress_layout.addWidget(self.current_time_label)
@@ -168,30 +256,65 @@ class MusicPlayerWindow(QWidget):
 		options_layout.addStretch()
 		options_layout.addWidget(self.help_button)
 
-		self.song_list_widget = QTableWidget()
-		self.song_list_widget.setColumnCount(2)
-		self.song_list_widget.setHorizontalHeaderLabels(["No.", "Available Tracks"])
-		self.song_list_widget.verticalHeader().setVisible(False)
-		self.song_list_widget.horizontalHeader().setStretchLastSection(True)
-		self.song_list_widget.horizontalHeader().setSectionResizeMode(
-			0, QHeaderView.ResizeMode.ResizeToContents
-		)
-		self.song_list_widget.setSelectionBehavior(
+		search_layout = QHBoxLayout()
+		search_layout.setSpacing(10)
+		self.playlist_box = QComboBox()
+		self.playlist_box.setObjectName("PlaylistBox")
+		self.playlist_box.setToolTip("Library or playlist")
+		self.playlist_button = QPushButton("☰")
+		self.playlist_button.setObjectName("PlaylistMenuButton")
+		self.playlist_button.setToolTip("Playlists")
+		self.playlist_menu = QMenu(self)
+		self.playlist_button.setMenu(self.playlist_menu)
+		self.search_box = QLineEdit()
+		self.search_box.setObjectName("SearchBox")
+		self.search_box.setPlaceholderText("Search title, artist or file")
+		self.search_box.setClearButtonEnabled(True)
+		self.search_box.setToolTip("Search (/ or Ctrl+F)")
+		self.sort_box = QComboBox()
+		self.sort_box.setObjectName("SortBox")
+		self.sort_box.setToolTip("Sort by")
+		for mode, label in SORT_MODES.items():
+			self.sort_box.addItem(label, mode)
+		search_layout.addWidget(self.playlist_box)
+		search_layout.addWidget(self.search_box, 1)
+		search_layout.addWidget(self.sort_box)
+		search_layout.addWidget(self.playlist_button)
+
+		self.summary_label = QLabel()
+		self.summary_label.setObjectName("SummaryLabel")
+		self.summary_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+		self.summary_label.setContentsMargins(0, 0, 10, 4)
+
+		# The library stays loaded while a playlist is shown; ``track_model`` is
+		# whichever of the two the view and playback currently follow.
+		self.library_model = TrackTableModel(self)
+		self.playlist_model = TrackTableModel(self)
+		self.track_model = self.library_model
+		self.song_list_view = QTableView()
+		self.song_list_view.setModel(self.track_model)
+		self.song_list_view.verticalHeader().setVisible(False)
+		# Fixed row heights and column widths let the view map rows to pixels
+		# without measuring every track.
+		self.song_list_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+		self.song_list_view.verticalHeader().setDefaultSectionSize(36)
+		self.song_list_view.setSelectionBehavior(
 			QAbstractItemView.SelectionBehavior.SelectRows
 		)
-		self.song_list_widget.setSelectionMode(
+		self.song_list_view.setSelectionMode(
 			QAbstractItemView.SelectionMode.SingleSelection
 		)
-		self.song_list_widget.setEditTriggers(
+		self.song_list_view.setEditTriggers(
 			QAbstractItemView.EditTrigger.NoEditTriggers
 		)
-		self.song_list_widget.setShowGrid(False)
-		self.song_list_widget.setFrameShape(QFrame.Shape.NoFrame)
-		self.song_list_widget.setMinimumHeight(180)
-		self.song_list_widget.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
-		self.song_list_widget.setStyleSheet(
+		self.song_list_view.setShowGrid(False)
+		self.song_list_view.setFrameShape(QFrame.Shape.NoFrame)
+		self.song_list_view.setMinimumHeight(180)
+		self.song_list_view.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+		self.song_list_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+		self.song_list_view.setStyleSheet(
 			"""
-			QTableWidget {
+			QTableView {
 				background: #101318;
 				color: #e8ecf2;
 				selection-background-color: #273043;
@@ -207,13 +330,13 @@ class MusicPlayerWindow(QWidget):
 				border: none;
 				font-weight: 600;
 			}
-			QTableWidget::item {
+			QTableView::item {
 				padding: 8px 10px;
 			}
-			QTableWidget::item:hover {
+			QTableView::item:hover {
 				background: #1f2634;
 			}
-			QTableWidget::item:selected {
+			QTableView::item:selected {
 				background: #30405b;
 				color: #f7f9fb;
 			}
@@ -224,9 +347,24 @@ class MusicPlayerWindow(QWidget):
 		content_layout.addLayout(progress_layout)
 		content_layout.addLayout(controls_layout)
 		content_layout.addLayout(options_layout)
+		content_layout.addLayout(search_layout)
 
 		self.main_layout.addLayout(content_layout)
-		self.main_layout.addWidget(self.song_list_widget)
+		self.main_layout.addWidget(self.song_list_view)
+		self.main_layout.addWidget(self.summary_label)
+		self._configure_columns()
+		self._refresh_playlist_box()
+		self._update_summary()
+
+	def _configure_columns(self):
+		"""Column sizing lives on the header sections, which a model switch resets."""
+		header = self.song_list_view.horizontalHeader()
+		header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
+		header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+		header.setSectionResizeMode(TrackTableModel.TIME_COLUMN, QHeaderView.ResizeMode.Fixed)
+		self._update_number_column_width()
+		metrics = self.song_list_view.fontMetrics()
+		self.song_list_view.setColumnWidth(TrackTableModel.TIME_COLUMN, metrics.horizontalAdvance("0:00:00") + 28)
 
 	def _setup_title_bar(self):
 		title_bar = QFrame()
@@ -269,16 +407,43 @@ class MusicPlayerWindow(QWidget):
 		self.next_button.clicked.connect(self.next_song)
 		self.prev_button.clicked.connect(self.prev_song)
 		self.loop_button.clicked.connect(self.change_playback_mode)
-		self.song_list_widget.cellDoubleClicked.connect(self.play_from_list)
+		self.song_list_view.doubleClicked.connect(
+			lambda index: self.play_from_list(self.track_model.source_row(index.row()))
+		)
+		self.search_box.textChanged.connect(self._apply_search)
+		self.search_box.returnPressed.connect(self._play_first_match)
+		self.search_box.installEventFilter(self)
+		self.sort_box.currentIndexChanged.connect(
+			lambda _index: self.apply_sort_mode(self.sort_box.currentData())
+		)
+		self.playlist_box.activated.connect(
+			lambda _index: self.open_playlist(self.playlist_box.currentData())
+		)
+		self.playlist_menu.aboutToShow.connect(self._build_playlist_menu)
+		for model in (self.library_model, self.playlist_model):
+			model.rowsInserted.connect(self._update_number_column_width)
+			model.rowsRemoved.connect(self._update_number_column_width)
+			model.modelReset.connect(self._update_number_column_width)
+			model.totals_changed.connect(self._update_summary)
 		self.media_player.playbackStateChanged.connect(self.update_play_pause_icon)
 		self.media_player.positionChanged.connect(self.update_slider_position)
+		self.media_player.positionChanged.connect(self.update_lyrics)
 		self.media_player.durationChanged.connect(self.set_slider_range)
 		self.media_player.mediaStatusChanged.connect(self.handle_media_status)
+		self.media_player.about_to_finish.connect(self._crossfade_to_next)
 		self.progress_slider.sliderMoved.connect(self.media_player.setPosition)
 		self.volume_slider.valueChanged.connect(self.set_volume)
 		self.volume_button.clicked.connect(self.toggle_mute)
 		self.help_button.clicked.connect(self.show_help)
-		self.song_list_widget.installEventFilter(self)
+		self.scan_engine.songs_found.connect(self._append_songs)
+		self.scan_engine.finished.connect(self._finish_scan)
+		self.library_watcher.changes_ready.connect(self._apply_library_changes)
+		self.track_analyzer.analyzed.connect(self._apply_analysis)
+		self.art_service.art_ready.connect(self._apply_art)
+		self.lyrics_service.lyrics_ready.connect(self._apply_lyrics)
+		self.spectrum.frame_ready.connect(self._show_spectrum)
+		self.song_list_view.customContextMenuRequested.connect(self._show_list_menu)
+		self.song_list_view.installEventFilter(self)
 		self.update_volume_icon()
 
 	def _get_icon(self, filename):
@@ -297,112 +462,291 @@ class MusicPlayerWindow(QWidget):
 		if event.buttons() == Qt.MouseButton.LeftButton:
 			self.move(event.globalPosition().toPoint() - self.drag_pos)
 
-	def scan_music_directory(self):
-		self.song_list_widget.clearContents()
-		self.song_list_widget.setRowCount(0)
-		self._shuffle_queue = []
-		self.playlist = scan_music_directory(MUSIC_DIR)
-
-		self.song_list_widget.setRowCount(len(self.playlist))
-		for idx, song_data in enumerate(self.playlist):
-			number_item = QTableWidgetItem(str(idx + 1))
-			number_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-			number_item.setFlags(number_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-
-			label_text = format_song_label(song_data["title"], song_data["artist"])
-			label_item = QTableWidgetItem(label_text)
-			label_item.setToolTip(f"{song_data['title']} - {song_data['artist']}")
-			label_item.setFlags(label_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+	@property
+	def playlist(self):
+		return self.track_model.tracks
 
-			self.song_list_widget.setItem(idx, 0, number_item)
-			self.song_list_widget.setItem(idx, 1, label_item)
+	def _library_active(self):
+		return self.track_model is self.library_model
 
+	def scan_music_directory(self):
+		"""Start a background rescan; the table fills in as batches arrive."""
+		if not self._library_active():
+			self.open_playlist(None)
+		self.play_queue.reset([])
+		self.current_index = -1
+		self.search_index.clear()
+		self.library_model.reset([])
+		self.scan_engine.start(MUSIC_DIR)
+
+	def _append_songs(self, songs):
+		self.search_index.add(songs)
+		# Only the new batch is matched against an active search; shown rows stay as they are.
+		text = self.search_box.text()
+		self.library_model.append(songs, self.search_index.matching(text, songs) if text else ())
+		if self._library_active():
+			self.play_queue.add(songs)
+
+	def _update_number_column_width(self, *_args):
+		digits = len(str(max(1, len(self.playlist))))
+		metrics = self.song_list_view.fontMetrics()
+		self.song_list_view.setColumnWidth(0, metrics.horizontalAdvance("9" * max(3, digits)) + 24)
+
+	def _update_summary(self):
+		model = self.track_model
 		if not self.playlist:
+			self.summary_label.clear()
+			return
+		seconds = max(0.0, model.visible_seconds())
+		count = format_track_count(model.rowCount(), len(self.playlist))
+		summary = f"{count} · {format_time(seconds * 1000)}"
+		if self.active_playlist is not None:
+			summary = f"{self.active_playlist} · {summary}"
+		self.summary_label.setText(summary)
+
+	def select_row(self, index):
+		"""Select playlist ``index`` in the view, clearing the selection if it is filtered out."""
+		row = self.track_model.view_row(index)
+		if row == -1:
+			self.song_list_view.clearSelection()
+			return
+		self._select_view_row(row)
+
+	def _select_view_row(self, row):
+		index = self.track_model.index(row, 1)
+		self.song_list_view.setCurrentIndex(index)
+		self.song_list_view.scrollTo(index)
+
+	def _current_row(self):
+		return self.track_model.source_row(self.song_list_view.currentIndex().row())
+
+	def _sort_key(self):
+		return self.search_index.sort_key(self.sort_mode)
+
+	def apply_sort_mode(self, mode):
+		if mode not in SORT_MODES:
+			mode = DEFAULT_SORT_MODE
+		self.sort_mode = mode
+		self.sort_box.blockSignals(True)
+		self.sort_box.setCurrentIndex(self.sort_box.findData(mode))
+		self.sort_box.blockSignals(False)
+		self._resort()
+
+	def _resort(self):
+		"""Reorder the library with the precomputed keys, keeping the current track."""
+		current = self.library_model.track(self.current_index) if self._library_active() else None
+		self.library_model.sort_by(self._sort_key())
+		if current is not None:
+			self.current_index = self.library_model.positions()[current]
+			self.select_row(self.current_index)
+			self._prepare_next()
+
+	def _apply_search(self, text):
+		self.track_model.set_filter(self.search_index.search(text))
+		if self.current_index != -1:
+			self.select_row(self.current_index)
+
+	def _play_first_match(self):
+		row = self.song_list_view.currentIndex().row()
+		if row == -1 and self.track_model.rowCount() > 0:
+			row = 0
+		index = self.track_model.source_row(row)
+		if index != -1:
+			self.play_from_list(index)
+			self.song_list_view.setFocus()
+
+	def _finish_scan(self, _count):
+		self._resort()
+		self.library_watcher.watch(self.scan_engine.directories)
+		self._analyze_loudness(self.library_model.tracks)
+
+		if not self.library_model.tracks:
 			self.title_label.setText("No music found")
 			self.artist_label.setText("Check ./music folder structure")
-
-	def set_initial_position(self, position):
-		self.media_player.setPosition(position)
+		self.scan_finished.emit()
+
+	def _apply_library_changes(self, added, removed, updated):
+		"""Apply watcher results in batches, keeping the current track and play queue intact."""
+		library_active = self._library_active()
+		current = self.track_model.track(self.current_index)
+		replacements = {old_path: track for old_path, track in updated}
+		dropped = set(removed) | set(replacements)
+		sort_key = self._sort_key()
+		current_key = sort_key(current) if current is not None and library_active else None
+		if current is not None and current.path in replacements:
+			current = replacements[current.path]
+		elif current is not None and current.path in dropped:
+			current = None
+
+		library = self.library_model.tracks
+		dropped_rows = [idx for idx, track in enumerate(library) if track.path in dropped]
+		dropped_tracks = [library[idx] for idx in dropped_rows]
+		self.search_index.remove(dropped_tracks)
+		self.library_model.remove_rows(dropped_rows)
+		inserted = list(added) + list(replacements.values())
+		self.search_index.add(inserted)
+		self._analyze_loudness(inserted)
+		self.library_model.insert_sorted(inserted, sort_key)
+		if library_active:
+			self.play_queue.discard(dropped_tracks)
+			self.play_queue.add(inserted)
+		else:
+			self._update_playlist_tracks(dropped, replacements)
+
+		if current is not None:
+			self.current_index = self.track_model.positions().get(current, -1)
+			self.play_queue.current = current
+		elif current_key is not None:
+			# The playing file vanished; step back so "next" continues where it left off.
+			self.current_index = bisect.bisect_left(self.playlist, current_key, key=sort_key) - 1
+
+		self._prepare_next()
+		if self.search_box.text():
+			self._apply_search(self.search_box.text())
+		if self.library_model.tracks and self.title_label.text() == "No music found":
+			self.title_label.setText("Welcome to Your Pet Music Player")
+			self.artist_label.setText("Select a song to start")
+
+	def _analyze_loudness(self, tracks):
+		pending = [track for track in tracks if track.gain is None]
+		self._awaiting_gain.update((track.path, track) for track in pending)
+		self.track_analyzer.analyze(track.path for track in pending)
+
+	def _load_waveform(self, song):
+		"""Show the cached envelope, or ask the analyzer for it ahead of the background queue."""
+		envelope = None
 		try:
-			self.media_player.durationChanged.disconnect()
-		except RuntimeError:
-			pass
-		self.media_player.durationChanged.connect(self.set_slider_range)
-
-	def _start_title_marquee(self, full_text: str):
-		if self._marquee_timer:
-			self._marquee_timer.stop()
-		self._marquee_text = full_text or ""
-		self._marquee_index = 0
-		visible_chars = max(10, len(format_title_display(full_text)))
-		if len(self._marquee_text) <= visible_chars:
-			self.title_label.setText(self._marquee_text)
-			self._marquee_timer = None
-			return
-
-		from PySide6.QtCore import QTimer  # lazy import to avoid global timer creation
-		self._marquee_timer = QTimer(self)
-		self._marquee_timer.timeout.connect(self._tick_marquee)
-		self._marquee_timer.start(250)
-		self._tick_marquee()
-
-	def _tick_marquee(self):
-		if not self._marquee_text:
-			return
-		window = format_title_display(self._marquee_text)
-		span = len(window)
-		full = self._marquee_text + "  •  "
-		pos = self._marquee_index % len(full)
-		segment = (full + full)[pos : pos + span]
-		self.title_label.setText(segment)
-		self._marquee_index += 1
+			stat = os.stat(song.path)
+		except OSError:
+			stat = None
+		if stat is not None:
+			envelope = self.library.envelope(song.path, stat.st_size, stat.st_mtime_ns)
+		self.progress_slider.set_envelope(envelope)
+		if envelope is None and stat is not None:
+			self._awaiting_gain[song.path] = song
+			self.track_analyzer.analyze([song.path], urgent=True)
+
+	def _apply_analysis(self, path, result):
+		track = self._awaiting_gain.pop(path, None)
+		if track is None:
+			return
+		track.gain = result.gain
+		track.bpm = result.bpm
+		track.beat_offset = result.beat_offset
+		if self.track_model.track(self.current_index) is track:
+			if self.normalize_loudness:
+				self.media_player.setTrackGain(result.gain)
+			self.progress_slider.set_envelope(result.envelope)
+
+	def beat_grid(self):
+		"""Beat period and first-beat time in ms of the playing track, or ``None`` without one."""
+		if self.media_player.playbackState() != QMediaPlayer.PlaybackState.PlayingState:
+			return None
+		song = self.track_model.track(self.current_index)
+		if song is None or not song.bpm:
+			return None
+		return 60000.0 / song.bpm, (song.beat_offset or 0.0) * 1000.0
 
 	def play_song(self, index):
 		if 0 <= index < len(self.playlist):
 			self.current_index = index
 			song = self.playlist[index]
-			self.media_player.setSource(QUrl.fromLocalFile(str(song["path"].absolute())))
+			self.play_queue.visit(song)
+			self.media_player.setSource(QUrl.fromLocalFile(os.path.abspath(song.path)))
+			if song.duration:
+				# Known from the scan; the backend's durationChanged refines it later.
+				self.set_slider_range(int(song.duration * 1000))
+			self.media_player.setTrackGain(song.gain if self.normalize_loudness else None)
+			self._load_waveform(song)
 			self.media_player.play()
-			self._start_title_marquee(song["title"])
-			self.artist_label.setText(format_artist_display(song["artist"]))
-			thumbnail_pixmap = QPixmap()
-			thumbnail_data = song.get("thumbnail_data")
-			if thumbnail_data:
-				thumbnail_pixmap.loadFromData(thumbnail_data)
-			elif song.get("thumbnail_path"):
-				thumbnail_pixmap = QPixmap(str(song["thumbnail_path"]))
-
-			if thumbnail_pixmap and not thumbnail_pixmap.isNull():
-				scaled = thumbnail_pixmap.scaled(
-					100,
-					100,
-					Qt.AspectRatioMode.KeepAspectRatio,
-					Qt.TransformationMode.SmoothTransformation,
-				)
-				self.thumbnail_label.setPixmap(scaled)
-				self.thumbnail_label.setText("")
-			else:
-				fallback = QPixmap(str(NO_ART_IMAGE_PATH))
-				scaled = fallback.scaled(
-					100,
-					100,
-					Qt.AspectRatioMode.KeepAspectRatio,
-					Qt.TransformationMode.SmoothTransformation,
-				)
-				self.thumbnail_label.setPixmap(scaled)
-				self.thumbnail_label.setText("")
-			self.song_list_widget.setCurrentCell(index, 1)
+			self.show_track_info(song)
+			self.select_row(index)
+			self._prepare_next()
+
+	def show_track_info(self, song, preview=False):
+		"""Show title, artist and cover; the cover may arrive later from the art service.
+
+		A ``preview`` shows a track that is not open in the player: no lyrics,
+		and only a cover that is already cached, so the audio file is not read.
+		"""
+		self.title_label.setText(song.title or "Unknown Title")
+		self.artist_label.setText(format_artist_display(song.artist))
+		lyrics = None if preview else self.lyrics_service.request(song)
+		self._show_lyrics(lyrics or NO_LYRICS)
+		ratio = self.thumbnail_label.devicePixelRatioF()
+		if preview:
+			key, pixmap = self.art_service.key_for(song, ratio), self.art_service.cached(song, ratio)
+		else:
+			key, pixmap = self.art_service.request(song, ratio)
+		self._art_key = key
+		if pixmap is not None:
+			self._apply_art(key, pixmap)
+
+	def _show_lyrics(self, lyrics):
+		self._lyrics = lyrics
+		self._lyric_index = -1
+		self.lyrics_label.setText("")
+		self.update_lyrics(self.media_player.position())
+
+	def _apply_lyrics(self, path, lyrics):
+		song = self.track_model.track(self.current_index)
+		if song is not None and song.path == path:
+			self._show_lyrics(lyrics)
+
+	def _apply_art(self, key, pixmap):
+		if key != self._art_key or pixmap.isNull():
+			return
+		self.thumbnail_label.setPixmap(pixmap)
+		self.thumbnail_label.setText("")
+
+	def _peek_next_index(self):
+		"""Index ``next_song`` would play, without consuming the queue or the shuffle."""
+		if not self.playlist:
+			return -1
+		queued = self.play_queue.peek_queued()
+		if queued is not None:
+			return self.track_model.positions().get(queued, -1)
+		if self.playback_mode == "shuffle":
+			track = self.play_queue.next_shuffled()
+			return self.track_model.positions().get(track, -1) if track is not None else -1
+		if self.playback_mode == "normal":
+			return self.current_index + 1 if self.current_index < len(self.playlist) - 1 else -1
+		return (self.current_index + 1) % len(self.playlist)
+
+	def _prepare_next(self):
+		"""Open the predicted next track in the standby player."""
+		if not self.gapless or self.current_index == -1 or not self.media_player.is_loaded():
+			# Nothing plays yet; preparing would start the media backend for nothing.
+			return
+		index = self._peek_next_index()
+		if index == -1 or index == self.current_index:
+			self.media_player.prepare(None)
+			return
+		song = self.playlist[index]
+		self.media_player.prepare(QUrl.fromLocalFile(os.path.abspath(song.path)))
+		# Warm the cover too, so the switch finds it in memory.
+		self.art_service.request(song, self.thumbnail_label.devicePixelRatioF())
+
+	def _crossfade_to_next(self):
+		if self.media_player.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
+			self.next_song()
+
+	def _play_track(self, track):
+		index = self.track_model.positions().get(track, -1)
+		if index != -1:
+			self.play_song(index)
 
 	def next_song(self):
 		if not self.playlist:
 			return
 
-		if self.playback_mode == "shuffle":
-			self._ensure_shuffle_queue()
-			if not self._shuffle_queue:
-				return
-			next_index = self._shuffle_queue.pop(0)
-			self.play_song(next_index)
+		queued = self.play_queue.next_queued()
+		if queued is not None:
+			self._play_track(queued)
+		elif self.playback_mode == "shuffle":
+			track = self.play_queue.next_shuffled()
+			if track is not None:
+				self._play_track(track)
 		elif self.playback_mode == "normal":
 			if self.current_index == -1:
 				self.play_song(0)
@@ -414,7 +758,11 @@ class MusicPlayerWindow(QWidget):
 	def prev_song(self):
 		if not self.playlist:
 			return
-		if self.playback_mode == "normal":
+		if self.playback_mode == "shuffle":
+			track = self.play_queue.previous()
+			if track is not None:
+				self._play_track(track)
+		elif self.playback_mode == "normal":
 			if self.current_index > 0:
 				self.play_song(self.current_index - 1)
 		else:
@@ -425,20 +773,16 @@ class MusicPlayerWindow(QWidget):
 			self.media_player.pause()
 		else:
 			if self.current_index == -1 and self.playlist:
-				if self.playback_mode == "shuffle":
-					self._ensure_shuffle_queue()
-					if self._shuffle_queue:
-						self.play_song(self._shuffle_queue.pop(0))
-					else:
-						self.play_song(0)
+				if self.play_queue.has_queued() or self.playback_mode == "shuffle":
+					self.next_song()
 				else:
 					self.play_song(0)
+			elif self.media_player.source().isEmpty():
+				# A restored track is only opened once playback is asked for.
+				self.play_song(self.current_index)
 			else:
 				self.media_player.play()
 
-		if self.playback_mode == "shuffle" and self.current_index != -1:
-			self._remove_from_shuffle_queue(self.current_index)
-
 	def change_playback_mode(self):
 		if self.playback_mode == "normal":
 			self.apply_playback_mode("loop_all")
@@ -453,34 +797,35 @@ class MusicPlayerWindow(QWidget):
 			self.loop_button.setIcon(self._get_icon("shuffle.png"))
 			self.loop_button.setToolTip("Shuffle")
 			self.tray_actions["loop"].setText("Mode: Shuffle")
-			self._build_shuffle_queue()
+			self.play_queue.reshuffle()
 		elif mode == "loop_all":
 			self.playback_mode = "loop_all"
 			self.loop_button.setIcon(self._get_icon("loop.png"))
 			self.loop_button.setToolTip("Loop All")
 			self.tray_actions["loop"].setText("Mode: Loop All")
-			self._shuffle_queue = []
 		else:
 			self.playback_mode = "normal"
 			self.loop_button.setIcon(self._get_icon("normal.png"))
 			self.loop_button.setToolTip("Normal Order")
 			self.tray_actions["loop"].setText("Mode: Normal")
-			self._shuffle_queue = []
+		self._prepare_next()
 
 	def set_volume(self, value):
 		self.volume = value / 100.0
-		self.media_player.audioOutput().setVolume(self.volume)
+		self.media_player.setVolume(self.volume)
 		if self.is_muted and value > 0:
 			self.is_muted = False
 		self.update_volume_icon()
 
 	def toggle_mute(self):
 		self.is_muted = not self.is_muted
-		self.media_player.audioOutput().setMuted(self.is_muted)
+		self.media_player.setMuted(self.is_muted)
 		self.update_volume_icon()
 		self.tray_actions["mute"].setText("Unmute" if self.is_muted else "Mute")
 
 	def update_volume_icon(self):
+		if not self._ui_active:
+			return
 		icon = self._get_icon("volume-muted.png" if (self.is_muted or self.volume == 0) else "volume.png")
 		self.volume_button.setIcon(icon)
 		self.volume_button.setIconSize(self._control_icon_size)
@@ -490,16 +835,14 @@ class MusicPlayerWindow(QWidget):
 		self.play_song(row)
 
 	def update_play_pause_icon(self, state):
-		if state == QMediaPlayer.PlaybackState.PlayingState:
-			self.play_pause_button.setIcon(self._get_icon("pause.png"))
-			self.play_pause_button.setIconSize(self._play_icon_size)
-			self.play_pause_button.setToolTip("Pause")
-			self.tray_actions["play_pause"].setText("Pause")
-		else:
-			self.play_pause_button.setIcon(self._get_icon("play.png"))
-			self.play_pause_button.setIconSize(self._play_icon_size)
-			self.play_pause_button.setToolTip("Play")
-			self.tray_actions["play_pause"].setText("Play")
+		playing = state == QMediaPlayer.PlaybackState.PlayingState
+		# The tray menu stays usable while the window is hidden.
+		self.tray_actions["play_pause"].setText("Pause" if playing else "Play")
+		if not self._ui_active:
+			return
+		self.play_pause_button.setIcon(self._get_icon("pause.png" if playing else "play.png"))
+		self.play_pause_button.setIconSize(self._play_icon_size)
+		self.play_pause_button.setToolTip("Pause" if playing else "Play")
 
 	def keyPressEvent(self, event):
 		key = event.key()
@@ -510,8 +853,8 @@ class MusicPlayerWindow(QWidget):
 			self._move_selection(1)
 			return
 		if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
-			row = self.song_list_widget.currentRow()
-			if 0 <= row < self.song_list_widget.rowCount():
+			row = self._current_row()
+			if 0 <= row < len(self.playlist):
 				self.apply_playback_mode("normal")
 				self.play_song(row)
 			return
@@ -521,24 +864,30 @@ class MusicPlayerWindow(QWidget):
 		if key == Qt.Key.Key_M:
 			self.change_playback_mode()
 			return
+		if key in (Qt.Key.Key_N, Qt.Key.Key_Q):
+			self.queue_selected(play_next=key == Qt.Key.Key_N)
+			return
+		if key == Qt.Key.Key_Slash or (
+			key == Qt.Key.Key_F and event.modifiers() & Qt.KeyboardModifier.ControlModifier
+		):
+			self.search_box.setFocus()
+			self.search_box.selectAll()
+			return
 		super().keyPressEvent(event)
 
 	def _move_selection(self, delta):
-		count = self.song_list_widget.rowCount()
+		count = self.track_model.rowCount()
 		if count == 0:
 			return
-		current = self.song_list_widget.currentRow()
+		current = self.song_list_view.currentIndex().row()
 		if current == -1:
 			new_row = 0 if delta > 0 else count - 1
 		else:
 			new_row = max(0, min(count - 1, current + delta))
-		self.song_list_widget.setCurrentCell(new_row, 1)
-		item = self.song_list_widget.item(new_row, 1)
-		if item:
-			self.song_list_widget.scrollToItem(item)
+		self._select_view_row(new_row)
 
 	def eventFilter(self, obj, event):
-		if obj == self.song_list_widget and event.type() == event.Type.KeyPress:
+		if obj == self.song_list_view and event.type() == event.Type.KeyPress:
 			key = event.key()
 			if key in (
 				Qt.Key.Key_Up,
@@ -549,33 +898,273 @@ class MusicPlayerWindow(QWidget):
 				Qt.Key.Key_Enter,
 				Qt.Key.Key_P,
 				Qt.Key.Key_M,
+				Qt.Key.Key_N,
+				Qt.Key.Key_Q,
+				Qt.Key.Key_Slash,
+				Qt.Key.Key_F,
 			):
 				self.keyPressEvent(event)
 				return True
+		if obj == self.search_box and event.type() == event.Type.KeyPress:
+			if event.key() == Qt.Key.Key_Escape:
+				self.search_box.clear()
+				self.song_list_view.setFocus()
+				return True
+			if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+				self.song_list_view.setFocus()
+				self._move_selection(1 if event.key() == Qt.Key.Key_Down else -1)
+				return True
 		return super().eventFilter(obj, event)
 
+	def _show_spectrum(self, frame):
+		if self._ui_active:
+			self.spectrum_bars.set_frame(frame)
+
 	def update_slider_position(self, position):
+		if not self._ui_active:
+			return
 		self.progress_slider.setValue(position)
 		self.current_time_label.setText(format_time(position))
 
+	def update_lyrics(self, position):
+		"""Show the lyric line at ``position``; the label is only touched when the line changes."""
+		if not self._ui_active or not self._lyrics:
+			return
+		index = self._lyrics.index_at(position)
+		if index != self._lyric_index:
+			self._lyric_index = index
+			self.lyrics_label.setText(self._lyrics.lines[index] if index >= 0 else "")
+
 	def set_slider_range(self, duration):
+		if not self._ui_active:
+			return
 		self.progress_slider.setRange(0, duration)
 		self.total_time_label.setText(format_time(duration))
 
 	def handle_media_status(self, status):
 		if status == QMediaPlayer.MediaStatus.EndOfMedia:
-			if self.playback_mode == "normal" and self.current_index >= len(self.playlist) - 1:
+			if (
+				self.playback_mode == "normal"
+				and self.current_index >= len(self.playlist) - 1
+				and not self.play_queue.has_queued()
+			):
 				return
 			self.next_song()
 
-	def _build_shuffle_queue(self):
-		self._shuffle_queue = build_shuffle_queue(len(self.playlist), self.current_index)
+	def queue_selected(self, play_next=False):
+		"""Queue the selected track after the current one, or at the end of the user queue."""
+		track = self.track_model.track(self._current_row())
+		if track is None:
+			return
+		if play_next:
+			self.play_queue.play_next(track)
+		else:
+			self.play_queue.enqueue(track)
+		self._prepare_next()
 
-	def _ensure_shuffle_queue(self):
-		ensure_shuffle_queue(self._shuffle_queue, len(self.playlist), self.current_index)
+	def _show_list_menu(self, pos):
+		index = self.song_list_view.indexAt(pos)
+		if not index.isValid():
+			return
+		self._select_view_row(index.row())
+		menu = QMenu(self)
+		menu.addAction("Play Next", lambda: self.queue_selected(play_next=True))
+		menu.addAction("Add to Queue", self.queue_selected)
+		names = self.playlist_store.names()
+		if names:
+			playlists_menu = menu.addMenu("Add to Playlist")
+			for name in names:
+				playlists_menu.addAction(name, lambda _checked=False, name=name: self.add_selected_to_playlist(name))
+		if not self._library_active():
+			menu.addAction("Remove from Playlist", self.remove_selected_from_playlist)
+		menu.exec(self.song_list_view.viewport().mapToGlobal(pos))
+
+	def queued_paths(self):
+		return [track.path for track in self.play_queue.upcoming()]
+
+	def restore_queue(self, paths):
+		by_path = {track.path: track for track in self.playlist}
+		for path in paths:
+			track = by_path.get(path)
+			if track is not None:
+				self.play_queue.enqueue(track)
+		self._prepare_next()
+
+	def preview_track(self, path):
+		"""Show a remembered track from the library index before the scan has finished."""
+		if not path or self.current_index != -1:
+			return
+		row = self.library.rows_for([path]).get(path)
+		if row is not None:
+			self.show_track_info(build_song(Path(path), row), preview=True)
+
+	def restore_track(self, index):
+		"""Select ``index`` as the current track without opening it in the player."""
+		self.current_index = index
+		song = self.playlist[index]
+		if song.duration:
+			self.set_slider_range(int(song.duration * 1000))
+		self.show_track_info(song, preview=True)
+		self.select_row(index)
+
+	def index_of_path(self, path):
+		return next((idx for idx, track in enumerate(self.playlist) if track.path == path), -1)
+
+	def open_playlist(self, name):
+		"""Show the saved playlist ``name``, or the library for ``None``; playback carries on."""
+		current = self.track_model.track(self.current_index)
+		self.search_index.remove(self._playlist_extras)
+		self._playlist_extras = []
+		if name is None:
+			model = self.library_model
+		else:
+			try:
+				entries = self.playlist_store.load(name)
+			except OSError as e:
+				print(f"Error loading playlist {name}: {e}")
+				self._refresh_playlist_box()
+				return False
+			known = {track.path: track for track in self.library_model.tracks}
+			tracks = resolve_entries(entries, self.library, known)
+			self._playlist_extras = [track for track in dict.fromkeys(tracks) if track.path not in known]
+			self.search_index.add(self._playlist_extras)
+			self.playlist_model.reset(tracks)
+			model = self.playlist_model
+
+		self.active_playlist = name
+		self.track_model = model
+		self.song_list_view.setModel(model)
+		self._configure_columns()
+		self.sort_box.setEnabled(name is None)
+		self.play_queue.replace_pool(model.tracks)
+		self.current_index = model.positions().get(current, -1) if current is not None else -1
+		self._apply_search(self.search_box.text())
+		self._refresh_playlist_box()
+		self._update_summary()
+		self._prepare_next()
+		return True
+
+	def _update_playlist_tracks(self, dropped, replacements):
+		"""Carry library changes into the shown playlist; the M3U file itself is left alone."""
+		tracks = self.playlist_model.tracks
+		gone = [track for track in tracks if track.path in dropped and track.path not in replacements]
+		if not gone and not any(track.path in replacements for track in tracks):
+			return
+		current = self.playlist_model.track(self.current_index)
+		if current is not None and current in gone:
+			# Step back so "next" continues after the removed row.
+			self.current_index = sum(1 for track in tracks[: self.current_index] if track not in gone) - 1
+		kept = [replacements.get(track.path, track) for track in tracks if track not in gone]
+		self.play_queue.discard(track for track in tracks if track.path in dropped)
+		self.play_queue.add(track for track in kept if track.path in replacements)
+		self.playlist_model.reset(kept)
+
+	def _refresh_playlist_box(self):
+		self.playlist_box.blockSignals(True)
+		self.playlist_box.clear()
+		self.playlist_box.addItem("Library", None)
+		for name in self.playlist_store.names():
+			self.playlist_box.addItem(name, name)
+		index = 0 if self.active_playlist is None else self.playlist_box.findText(self.active_playlist)
+		self.playlist_box.setCurrentIndex(max(0, index))
+		self.playlist_box.blockSignals(False)
+
+	def _build_playlist_menu(self):
+		menu = self.playlist_menu
+		menu.clear()
+		menu.addAction("Save View as Playlist…", self.save_view_as_playlist)
+		menu.addAction("Import M3U…", self.import_playlist)
+		shown = self.active_playlist is not None
+		menu.addAction("Export Playlist…", self.export_playlist).setEnabled(shown)
+		menu.addAction("Delete Playlist", self.delete_playlist).setEnabled(shown)
+
+	def save_view_as_playlist(self):
+		"""Save the visible rows, in order, as a named playlist and switch to it."""
+		name, ok = QInputDialog.getText(self, "Save Playlist", "Playlist name:")
+		name = clean_playlist_name(name) if ok else ""
+		if not name:
+			return
+		if self.playlist_store.path_for(name) is not None:
+			answer = QMessageBox.question(self, "Save Playlist", f"Replace playlist \"{name}\"?")
+			if answer != QMessageBox.StandardButton.Yes:
+				return
+		try:
+			self.playlist_store.save(name, list(self.track_model.visible_tracks()))
+		except OSError as e:
+			print(f"Error saving playlist {name}: {e}")
+			return
+		self.open_playlist(name)
+
+	def import_playlist(self):
+		path, _ = QFileDialog.getOpenFileName(
+			self, "Import Playlist", str(Path.home()), "Playlists (*.m3u *.m3u8)"
+		)
+		if not path:
+			return
+		try:
+			name = self.playlist_store.import_file(Path(path))
+		except OSError as e:
+			print(f"Error importing playlist {path}: {e}")
+			return
+		self.open_playlist(name)
+
+	def export_playlist(self):
+		name = self.active_playlist
+		if name is None:
+			return
+		path, _ = QFileDialog.getSaveFileName(
+			self, "Export Playlist", str(Path.home() / f"{name}.m3u8"), "Playlists (*.m3u8 *.m3u)"
+		)
+		if not path:
+			return
+		try:
+			self.playlist_store.export(name, Path(path))
+		except OSError as e:
+			print(f"Error exporting playlist {name}: {e}")
 
-	def _remove_from_shuffle_queue(self, index):
-		remove_from_shuffle_queue(self._shuffle_queue, index)
+	def delete_playlist(self):
+		name = self.active_playlist
+		if name is None:
+			return
+		answer = QMessageBox.question(self, "Delete Playlist", f"Delete playlist \"{name}\"?")
+		if answer != QMessageBox.StandardButton.Yes:
+			return
+		try:
+			self.playlist_store.delete(name)
+		except OSError as e:
+			print(f"Error deleting playlist {name}: {e}")
+			return
+		self.open_playlist(None)
+
+	def add_selected_to_playlist(self, name):
+		track = self.track_model.track(self._current_row())
+		if track is None:
+			return
+		try:
+			self.playlist_store.append(name, [track])
+		except OSError as e:
+			print(f"Error updating playlist {name}: {e}")
+
+	def remove_selected_from_playlist(self):
+		if self._library_active():
+			return
+		row = self._current_row()
+		track = self.playlist_model.track(row)
+		if track is None:
+			return
+		current = self.playlist_model.track(self.current_index)
+		self.playlist_model.remove_rows([row])
+		if current is track and self.current_index == row:
+			self.current_index = row - 1
+		elif current is not None:
+			self.current_index = self.playlist_model.positions().get(current, -1)
+		if track not in self.playlist_model.positions():
+			self.play_queue.discard([track])
+		try:
+			self.playlist_store.save(self.active_playlist, self.playlist_model.tracks)
+		except OSError as e:
+			print(f"Error updating playlist {self.active_playlist}: {e}")
+		self._prepare_next()
 
 	def show_help(self):
 		dialog = QDialog(self)
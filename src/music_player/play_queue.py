@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from collections import deque
+from random import randrange
+from typing import Deque, Dict, Iterable, List, Optional
+
+from .playlist_control import Track
+
+# Tracks remembered for stepping back through shuffle.
+HISTORY_LIMIT = 200
+
+
+class PlayQueue:
+	"""Playback order bookkeeping with constant-time next and previous.
+
+	Shuffle draws from an incremental Fisher-Yates permutation: ``_pool[:_drawn]``
+	has played this cycle, the rest is drawn one random swap at a time. Starting
+	a new cycle only resets the boundary. A bounded history allows stepping back
+	to what actually played, and a user queue of "play next" tracks takes
+	priority over every playback mode. Entries point at tracks rather than rows,
+	so re-sorting or filtering the playlist needs no remapping.
+	"""
+
+	def __init__(self, history_limit: int = HISTORY_LIMIT):
+		self.current: Optional[Track] = None
+		self._pool: List[Track] = []
+		self._slots: Dict[Track, int] = {}
+		self._drawn = 0
+		self._history: Deque[Track] = deque(maxlen=history_limit)
+		self._forward: List[Track] = []
+		self._up_next: Deque[Track] = deque()
+		# The shuffle draw waiting at ``_pool[_drawn]``; repeated peeks return it.
+		self._peeked = False
+
+	def __contains__(self, track: object) -> bool:
+		return track in self._slots
+
+	def __len__(self) -> int:
+		return len(self._pool)
+
+	def reset(self, tracks: Iterable[Track]) -> None:
+		self._pool = list(tracks)
+		self._slots = {track: slot for slot, track in enumerate(self._pool)}
+		self._drawn = 0
+		self._peeked = False
+		self._history.clear()
+		self._forward.clear()
+		self._up_next.clear()
+		self.current = None
+
+	def replace_pool(self, tracks: Iterable[Track]) -> None:
+		"""Shuffle over a different track list, e.g. a playlist, keeping history and the user queue.
+
+		Queue and history entries outside the new pool are skipped like removed tracks.
+		"""
+		self._pool = list(dict.fromkeys(tracks))
+		self._slots = {track: slot for slot, track in enumerate(self._pool)}
+		self._drawn = 0
+		self._peeked = False
+		self._forward.clear()
+		if self.current is not None:
+			self._mark_drawn(self.current)
+
+	def add(self, tracks: Iterable[Track]) -> None:
+		"""Add tracks to the undrawn part of the shuffle."""
+		for track in tracks:
+			if track not in self._slots:
+				self._slots[track] = len(self._pool)
+				self._pool.append(track)
+
+	def discard(self, tracks: Iterable[Track]) -> None:
+		"""Drop tracks from the shuffle; history and queue entries are skipped lazily.
+
+		A pending peek survives when its track is kept, so the next draw is still
+		the track the standby player preloaded.
+		"""
+		peeked = self._pool[self._drawn] if self._peeked else None
+		for track in tracks:
+			slot = self._slots.get(track)
+			if slot is None:
+				continue
+			if slot < self._drawn:
+				self._drawn -= 1
+				self._swap(slot, self._drawn)
+				slot = self._drawn
+			self._swap(slot, len(self._pool) - 1)
+			self._pool.pop()
+			del self._slots[track]
+			if track is self.current:
+				self.current = None
+		# The swaps above may have moved another track into ``_pool[_drawn]``.
+		self._peeked = peeked is not None and peeked in self._slots
+		if self._peeked:
+			self._swap(self._slots[peeked], self._drawn)
+
+	def reshuffle(self) -> None:
+		"""Start a fresh shuffle cycle that excludes the current track."""
+		self._drawn = 0
+		self._peeked = False
+		self._forward.clear()
+		if self.current is not None:
+			self._mark_drawn(self.current)
+
+	def play_next(self, track: Track) -> None:
+		self._up_next.appendleft(track)
+
+	def enqueue(self, track: Track) -> None:
+		self._up_next.append(track)
+
+	def upcoming(self) -> List[Track]:
+		return [track for track in self._up_next if track in self._slots]
+
+	def has_queued(self) -> bool:
+		return any(track in self._slots for track in self._up_next)
+
+	def peek_queued(self) -> Optional[Track]:
+		while self._up_next:
+			if self._up_next[0] in self._slots:
+				return self._up_next[0]
+			self._up_next.popleft()
+		return None
+
+	def next_queued(self) -> Optional[Track]:
+		while self._up_next:
+			track = self._up_next.popleft()
+			if track in self._slots:
+				return track
+		return None
+
+	def next_shuffled(self) -> Optional[Track]:
+		"""Retrace steps undone by ``previous`` first, otherwise draw an unplayed track."""
+		while self._forward:
+			track = self._forward[-1]
+			if track in self._slots:
+				return track
+			self._forward.pop()
+		if self._drawn >= len(self._pool):
+			self.reshuffle()
+		if self._drawn >= len(self._pool):
+			return None
+		if not self._peeked:
+			self._swap(self._drawn, randrange(self._drawn, len(self._pool)))
+			self._peeked = True
+		return self._pool[self._drawn]
+
+	def previous(self) -> Optional[Track]:
+		"""Step back to the track that played before the current one."""
+		while self._history:
+			track = self._history.pop()
+			if track in self._slots and track is not self.current:
+				if self.current is not None:
+					self._forward.append(self.current)
+				self.current = track
+				return track
+		return None
+
+	def visit(self, track: Track) -> None:
+		"""Record that ``track`` started playing."""
+		if track is self.current:
+			return
+		if self.current is not None:
+			self._history.append(self.current)
+		if self._forward and self._forward[-1] is track:
+			self._forward.pop()
+		else:
+			self._forward.clear()
+		self.current = track
+		self._mark_drawn(track)
+
+	def _mark_drawn(self, track: Track) -> None:
+		slot = self._slots.get(track)
+		if slot is not None and slot >= self._drawn:
+			self._peeked = False
+			self._swap(slot, self._drawn)
+			self._drawn += 1
+
+	def _swap(self, a: int, b: int) -> None:
+		if a == b:
+			return
+		pool = self._pool
+		pool[a], pool[b] = pool[b], pool[a]
+		self._slots[pool[a]] = a
+		self._slots[pool[b]] = b
+
+
+__all__ = ["PlayQueue", "HISTORY_LIMIT"]
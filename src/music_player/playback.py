@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import os
+from typing import List, Optional
+
+from PySide6.QtCore import QObject, QTimer, QUrl, Signal
+from PySide6.QtMultimedia import QAudioBufferOutput, QAudioFormat, QAudioOutput, QMediaPlayer
+
+from .constants import CROSSFADE_MS, GAPLESS_PREFETCH_BYTES
+from .loudness import gain_to_volume
+
+_FADE_STEP_MS = 40
+_READY_STATUSES = (
+	QMediaPlayer.MediaStatus.LoadedMedia,
+	QMediaPlayer.MediaStatus.BufferingMedia,
+	QMediaPlayer.MediaStatus.BufferedMedia,
+)
+
+
+def prefetch_file(path: str, length: int = GAPLESS_PREFETCH_BYTES) -> None:
+	"""Ask the OS to start reading the head of ``path`` into the page cache."""
+	if not hasattr(os, "posix_fadvise"):
+		return
+	try:
+		fd = os.open(path, os.O_RDONLY)
+	except OSError:
+		return
+	try:
+		os.posix_fadvise(fd, 0, length, os.POSIX_FADV_WILLNEED)
+	except OSError:
+		pass
+	finally:
+		os.close(fd)
+
+
+class PlaybackDeck(QObject):
+	"""Two media players behind the ``QMediaPlayer`` calls the window uses.
+
+	The active player plays while the standby player opens and demuxes the
+	predicted next track. ``setSource`` with the prepared URL swaps the players
+	instead of reloading, so the track change skips file open and decoder
+	start-up. With ``crossfade_ms`` set, ``about_to_finish`` fires that long
+	before the end and the swap overlaps the two tracks.
+
+	The players, and with them the multimedia backend and audio device, are
+	only created when a source is first set or prepared. Until then queries
+	answer as a stopped player with no media, and volume, mute and the audio
+	tap are remembered and applied once the players exist.
+	"""
+
+	playbackStateChanged = Signal(object)
+	positionChanged = Signal(int)
+	durationChanged = Signal(int)
+	mediaStatusChanged = Signal(object)
+	audioBufferReceived = Signal(object)
+	about_to_finish = Signal()
+
+	def __init__(self, crossfade_ms: int = CROSSFADE_MS, parent=None):
+		super().__init__(parent)
+		self.crossfade_ms = crossfade_ms
+		self._volume = 1.0
+		self._muted = False
+		# Per-player loudness correction, so a fading track keeps its own gain.
+		self._gains = [1.0, 1.0]
+		self._players: List[QMediaPlayer] = []
+		self._tap_format: Optional[QAudioFormat] = None
+		self._active = 0
+		self._prepared: Optional[QUrl] = None
+		self._finishing = False
+		self._fading: Optional[QMediaPlayer] = None
+		self._fade_level = 0.0
+		self._fade_timer = QTimer(self)
+		self._fade_timer.setInterval(_FADE_STEP_MS)
+		self._fade_timer.timeout.connect(self._fade_step)
+
+	def is_loaded(self) -> bool:
+		"""Whether the media players have been created."""
+		return bool(self._players)
+
+	def _ensure_players(self) -> None:
+		if self._players:
+			return
+		for _ in range(2):
+			player = QMediaPlayer(self)
+			player.setAudioOutput(QAudioOutput(player))
+			player.audioOutput().setMuted(self._muted)
+			player.playbackStateChanged.connect(self._forward(player, self.playbackStateChanged))
+			player.positionChanged.connect(self._forward(player, self.positionChanged))
+			player.positionChanged.connect(self._forward(player, self._check_crossfade))
+			player.durationChanged.connect(self._forward(player, self.durationChanged))
+			player.mediaStatusChanged.connect(self._forward(player, self.mediaStatusChanged))
+			self._players.append(player)
+		if self._tap_format is not None:
+			self._attach_tap()
+		self._apply_volume()
+
+	@property
+	def player(self) -> QMediaPlayer:
+		self._ensure_players()
+		return self._players[self._active]
+
+	@property
+	def standby(self) -> QMediaPlayer:
+		self._ensure_players()
+		return self._players[1 - self._active]
+
+	def _forward(self, player: QMediaPlayer, target):
+		emit = getattr(target, "emit", target)
+
+		def forward(*args):
+			if player is self.player:
+				emit(*args)
+
+		return forward
+
+	def enable_audio_tap(self, fmt: QAudioFormat) -> None:
+		"""Deliver decoded PCM of the active player through ``audioBufferReceived``."""
+		self._tap_format = fmt
+		self._attach_tap()
+
+	def _attach_tap(self) -> None:
+		for player in self._players:
+			if player.audioBufferOutput() is not None:
+				continue
+			output = QAudioBufferOutput(self._tap_format, player)
+			output.audioBufferReceived.connect(self._forward(player, self.audioBufferReceived))
+			player.setAudioBufferOutput(output)
+
+	def prepare(self, url: Optional[QUrl]) -> None:
+		"""Load ``url`` into the standby player so the next ``setSource`` can swap to it."""
+		if url is None or url.isEmpty():
+			self._prepared = None
+			return
+		if self._prepared == url:
+			return
+		prefetch_file(url.toLocalFile())
+		standby = self.standby
+		if standby is self._fading:
+			self._stop_fade()
+		standby.setSource(url)
+		self._prepared = url
+
+	def setSource(self, url: QUrl) -> None:
+		self._finishing = False
+		standby = self.standby
+		ready = self._prepared == url and standby.mediaStatus() in _READY_STATUSES
+		self._prepared = None
+		if not ready:
+			self.player.setSource(url)
+			return
+
+		previous = self.player
+		self._active = 1 - self._active
+		if self.crossfade_ms > 0 and previous.playbackState() == QMediaPlayer.PlaybackState.PlayingState:
+			self._start_fade(previous)
+		else:
+			previous.stop()
+		self._apply_volume()
+		current = self.player
+		self.durationChanged.emit(current.duration())
+		self.positionChanged.emit(current.position())
+		self.mediaStatusChanged.emit(current.mediaStatus())
+
+	def source(self) -> QUrl:
+		return self.player.source() if self._players else QUrl()
+
+	def play(self) -> None:
+		if self._players:
+			self.player.play()
+
+	def pause(self) -> None:
+		if self._players:
+			self._stop_fade()
+			self.player.pause()
+
+	def stop(self) -> None:
+		if self._players:
+			self._stop_fade()
+			self.player.stop()
+
+	def playbackState(self):
+		if not self._players:
+			return QMediaPlayer.PlaybackState.StoppedState
+		return self.player.playbackState()
+
+	def mediaStatus(self):
+		if not self._players:
+			return QMediaPlayer.MediaStatus.NoMedia
+		return self.player.mediaStatus()
+
+	def position(self) -> int:
+		return self.player.position() if self._players else 0
+
+	def duration(self) -> int:
+		return self.player.duration() if self._players else 0
+
+	def setPosition(self, position: int) -> None:
+		self._finishing = False
+		if self._players:
+			self.player.setPosition(position)
+
+	def volume(self) -> float:
+		return self._volume
+
+	def setVolume(self, volume: float) -> None:
+		self._volume = volume
+		self._apply_volume()
+
+	def setTrackGain(self, gain_db: Optional[float]) -> None:
+		"""Apply a loudness correction in dB to the active player."""
+		self._gains[self._active] = gain_to_volume(gain_db)
+		self._apply_volume()
+
+	def isMuted(self) -> bool:
+		return self._muted
+
+	def setMuted(self, muted: bool) -> None:
+		self._muted = muted
+		for player in self._players:
+			player.audioOutput().setMuted(muted)
+
+	def _output_volume(self, index: int, level: float = 1.0) -> float:
+		# QAudioOutput cannot amplify, so positive gains are capped at full volume.
+		return min(1.0, self._volume * self._gains[index] * level)
+
+	def _apply_volume(self) -> None:
+		if not self._players:
+			return
+		active, standby = self._active, 1 - self._active
+		if self._fading is None:
+			self.player.audioOutput().setVolume(self._output_volume(active))
+			self.standby.audioOutput().setVolume(self._output_volume(standby))
+			return
+		self.player.audioOutput().setVolume(self._output_volume(active, 1.0 - self._fade_level))
+		self._fading.audioOutput().setVolume(self._output_volume(standby, self._fade_level))
+
+	def _check_crossfade(self, position: int) -> None:
+		if self.crossfade_ms <= 0 or self._finishing or self._prepared is None:
+			return
+		duration = self.player.duration()
+		if duration > self.crossfade_ms and position >= duration - self.crossfade_ms:
+			self._finishing = True
+			self.about_to_finish.emit()
+
+	def _start_fade(self, outgoing: QMediaPlayer) -> None:
+		self._fading = outgoing
+		self._fade_level = 1.0
+		self._apply_volume()
+		self._fade_timer.start()
+
+	def _fade_step(self) -> None:
+		self._fade_level -= _FADE_STEP_MS / max(self.crossfade_ms, _FADE_STEP_MS)
+		if self._fade_level <= 0.0:
+			self._stop_fade()
+			return
+		self._apply_volume()
+
+	def _stop_fade(self) -> None:
+		self._fade_timer.stop()
+		if self._fading is not None:
+			self._fading.stop()
+			self._fading = None
+			self._fade_level = 0.0
+		self._apply_volume()
+
+
+__all__ = ["PlaybackDeck", "prefetch_file"]
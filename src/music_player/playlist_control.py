@@ -1,115 +1,230 @@
+import os
+import sys
 from pathlib import Path
-from random import shuffle
-from typing import Any, Dict, List, Optional
-
-from mutagen._file import File as MutagenFile
-from mutagen._util import MutagenError
-from mutagen.id3 import ID3
-from mutagen.id3._util import ID3NoHeaderError
-
-from .constants import NO_ART_IMAGE_PATH
-
-SongData = Dict[str, Any]
-
-SUPPORTED_AUDIO_EXTS = (".mp3", ".wav", ".m4a")
-
-
-def _find_thumbnail(audio_path: Path) -> Path | None:
-	parent = audio_path.parent
-	stem = audio_path.stem
-	for ext in (".jpg", ".png", ".jfif", ".jpeg"):
+from typing import AbstractSet, Iterator, List, Optional
+
+from .library import LibraryIndex, LibraryRow
+from .scan_worker import ScannedFile, read_index_row
+from .tags import read_tags
+
+SUPPORTED_AUDIO_EXTS = (".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus")
+THUMBNAIL_EXTS = (".jpg", ".png", ".jfif", ".jpeg")
+LYRICS_EXTS = (".lrc",)
+
+
+class Track:
+	"""Compact per-song record.
+
+	Embedded art is only referenced by ``art_hash`` and read back from the file
+	when the track is shown, so memory stays flat as the library grows.
+	"""
+
+	__slots__ = (
+		"path",
+		"title",
+		"artist",
+		"album",
+		"duration",
+		"thumbnail_path",
+		"art_hash",
+		"added_at",
+		"gain",
+		"bpm",
+		"beat_offset",
+		"lyrics_path",
+		"has_lyrics",
+		"lyrics",
+	)
+
+	def __init__(
+		self,
+		path: str,
+		title: str,
+		artist: str,
+		duration: Optional[float] = None,
+		thumbnail_path: Optional[str] = None,
+		art_hash: Optional[str] = None,
+		added_at: Optional[float] = None,
+		album: Optional[str] = None,
+		gain: Optional[float] = None,
+		bpm: Optional[float] = None,
+		beat_offset: Optional[float] = None,
+		lyrics_path: Optional[str] = None,
+		has_lyrics: Optional[bool] = None,
+	):
+		self.path = path
+		self.title = title
+		# Artists repeat across whole albums; share one string per name.
+		self.artist = sys.intern(artist)
+		self.album = sys.intern(album) if album else None
+		self.duration = duration
+		self.thumbnail_path = thumbnail_path
+		self.art_hash = art_hash
+		self.added_at = added_at
+		# Loudness correction in dB, filled in by the background analyzer.
+		self.gain = gain
+		# Beat grid: tempo and the time of the first beat in seconds.
+		self.bpm = bpm
+		self.beat_offset = beat_offset
+		self.lyrics_path = lyrics_path
+		# Whether the tags embed lyrics; None when the file was indexed before scans looked.
+		self.has_lyrics = has_lyrics
+		# Parsed lyrics, read the first time the track is shown.
+		self.lyrics = None
+
+	def __repr__(self) -> str:
+		return f"Track({self.title!r}, {self.artist!r}, {self.path!r})"
+
+
+def _resolve_thumbnail(parent: Path, stem: str, names: AbstractSet[str]) -> Optional[Path]:
+	"""Pick a sidecar cover from an existing directory listing instead of stat-ing candidates."""
+	for ext in THUMBNAIL_EXTS:
 		for name in (f"{stem}{ext}", f"cover{ext}", f"thumbnail{ext}"):
-			candidate = parent / name
-			if candidate.exists():
-				return candidate
+			if name in names:
+				return parent / name
 	return None
 
 
-def _first_tag_value(tags: Any, key: str) -> Optional[str]:
-	if not tags:
-		return None
-	values = tags.get(key)
-	if not values:
-		return None
-	if isinstance(values, (list, tuple)):
-		return str(values[0]) if values else None
-	return str(values)
-
-
-def _read_metadata(audio_path: Path) -> tuple[Optional[str], Optional[str], Optional[bytes]]:
-	title: Optional[str] = None
-	artist: Optional[str] = None
-	art_bytes: Optional[bytes] = None
-
-	try:
-		audio = MutagenFile(audio_path, easy=True)
-		if audio and audio.tags:
-			title = _first_tag_value(audio.tags, "title")
-			artist = _first_tag_value(audio.tags, "artist")
-	except MutagenError:
-		pass
-
-	try:
-		id3 = ID3(audio_path)
-		apic_frames = id3.getall("APIC")
-		if apic_frames:
-			art_bytes = apic_frames[0].data
-	except (ID3NoHeaderError, MutagenError, FileNotFoundError):
-		pass
-
-	return title, artist, art_bytes
+def _resolve_lyrics(parent: Path, stem: str, names: AbstractSet[str]) -> Optional[Path]:
+	for ext in LYRICS_EXTS:
+		if f"{stem}{ext}" in names:
+			return parent / f"{stem}{ext}"
+	return None
 
 
-def scan_music_directory(music_dir: Path) -> List[SongData]:
-	songs: List[SongData] = []
+def read_embedded_art(audio_path: Path) -> Optional[bytes]:
+	return read_tags(audio_path).art
+
+
+def carry_over_row(row: LibraryRow, previous: Optional[LibraryRow]) -> LibraryRow:
+	"""Keep history fields such as ``added_at`` when a known file is re-read."""
+	if previous and previous.get("added_at"):
+		row["added_at"] = previous["added_at"]
+	return row
+
+
+def is_row_current(row: Optional[LibraryRow], stat: os.stat_result) -> bool:
+	return bool(row) and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns
+
+
+def iter_audio_files(
+	music_dir: Path,
+	recursive: bool = True,
+	directories: Optional[List[Path]] = None,
+) -> Iterator[ScannedFile]:
+	"""Walk ``music_dir``, listing each directory exactly once.
+
+	Tracks are yielded as soon as their directory is read, so callers can start
+	filling the playlist before the walk finishes. Every directory that was
+	listed is appended to ``directories`` when it is given.
+	"""
+	pending = [music_dir]
+	while pending:
+		directory = pending.pop()
+		try:
+			with os.scandir(directory) as it:
+				entries = sorted(it, key=lambda entry: entry.name)
+		except OSError:
+			continue
+		if directories is not None:
+			directories.append(directory)
+
+		names = {entry.name for entry in entries}
+		subdirs: List[Path] = []
+		for entry in entries:
+			try:
+				if entry.is_dir(follow_symlinks=False):
+					if recursive:
+						subdirs.append(Path(entry.path))
+					continue
+				if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in SUPPORTED_AUDIO_EXTS:
+					continue
+				stat = entry.stat()
+			except OSError:
+				continue
+			audio_path = Path(entry.path)
+			parent, stem = audio_path.parent, audio_path.stem
+			yield ScannedFile(
+				audio_path,
+				stat,
+				_resolve_thumbnail(parent, stem, names),
+				_resolve_lyrics(parent, stem, names),
+			)
+		pending.extend(reversed(subdirs))
+
+
+def build_song(
+	audio_path: Path,
+	row: LibraryRow,
+	thumbnail_path: Optional[Path] = None,
+	lyrics_path: Optional[Path] = None,
+) -> Track:
+	return Track(
+		str(audio_path),
+		row["title"] or "Unknown Title",
+		row["artist"] or "Unknown Author",
+		row["duration"],
+		str(thumbnail_path) if thumbnail_path else None,
+		row["art_hash"],
+		row.get("added_at"),
+		row.get("album"),
+		row.get("gain"),
+		row.get("bpm"),
+		row.get("beat_offset"),
+		str(lyrics_path) if lyrics_path else None,
+		None if row.get("has_lyrics") is None else bool(row["has_lyrics"]),
+	)
+
+
+def song_sort_key(song: Track) -> tuple[str, str]:
+	return (song.title.casefold(), song.artist.casefold())
+
+
+def scan_music_directory(music_dir: Path, library: Optional[LibraryIndex] = None) -> List[Track]:
+	"""Scan ``music_dir``, reusing ``library`` rows for files whose size and mtime are unchanged."""
+	songs: List[Track] = []
 	if not music_dir.exists():
 		return songs
 
-	for audio_path in sorted(
-		p for p in music_dir.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_AUDIO_EXTS
-	):
-		title, artist, art_bytes = _read_metadata(audio_path)
-		thumbnail_path = _find_thumbnail(audio_path) or NO_ART_IMAGE_PATH
-		songs.append(
-			{
-				"title": title or "Unknown Title",
-				"artist": artist or "Unknown Author",
-				"path": audio_path,
-				"thumbnail_path": thumbnail_path,
-				"thumbnail_data": art_bytes,
-			}
-		)
-
-	songs.sort(key=lambda song: (song["title"].casefold(), song["artist"].casefold()))
+	known = library.snapshot() if library else {}
+	changed: List[LibraryRow] = []
+	seen: set[str] = set()
+
+	for audio_path, stat, thumbnail_path, lyrics_path in iter_audio_files(music_dir):
+		key = str(audio_path)
+		seen.add(key)
+		row = known.get(key)
+		if not is_row_current(row, stat):
+			try:
+				fresh = read_index_row(audio_path, stat)
+			except Exception as e:
+				# Skip the file like the pooled scan does; it is retried on the next scan.
+				print(f"Error reading tags for {audio_path}: {e}")
+				continue
+			row = carry_over_row(fresh, row)
+			changed.append(row)
+		songs.append(build_song(audio_path, row, thumbnail_path, lyrics_path))
+
+	if library:
+		library.upsert_many(changed)
+		library.remove_many(key for key in known if key not in seen)
+
+	songs.sort(key=song_sort_key)
 	return songs
 
 
-def build_shuffle_queue(length: int, current_index: int) -> List[int]:
-	queue = list(range(length))
-	if current_index in queue:
-		queue.remove(current_index)
-	shuffle(queue)
-	return queue
-
-
-def ensure_shuffle_queue(queue: List[int], length: int, current_index: int) -> None:
-	if length == 0:
-		queue.clear()
-		return
-	if not queue:
-		queue.extend(build_shuffle_queue(length, current_index))
-
-
-def remove_from_shuffle_queue(queue: List[int], index: int) -> None:
-	if index in queue:
-		queue.remove(index)
-
-
 __all__ = [
-	"SongData",
+	"Track",
 	"scan_music_directory",
-	"build_shuffle_queue",
-	"ensure_shuffle_queue",
-	"remove_from_shuffle_queue",
+	"iter_audio_files",
+	"ScannedFile",
+	"read_index_row",
+	"is_row_current",
+	"carry_over_row",
+	"build_song",
+	"song_sort_key",
+	"read_embedded_art",
 	"SUPPORTED_AUDIO_EXTS",
+	"THUMBNAIL_EXTS",
+	"LYRICS_EXTS",
 ]
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import unquote, urlsplit
+
+from .library import LibraryIndex
+from .playlist_control import Track, build_song
+
+PLAYLIST_EXTS = (".m3u8", ".m3u")
+
+
+class PlaylistEntry(NamedTuple):
+	path: str
+	title: Optional[str]
+	artist: Optional[str]
+	duration: Optional[float]
+
+
+def _decode(raw: bytes) -> str:
+	# Plain .m3u files are often written in a legacy code page; decode line by line.
+	try:
+		return raw.decode("utf-8")
+	except UnicodeDecodeError:
+		return raw.decode("latin-1")
+
+
+def _parse_extinf(info: str) -> tuple[Optional[str], Optional[str], Optional[float]]:
+	"""Split ``#EXTINF:<seconds> [attributes],<artist> - <title>``."""
+	length, _, display = info.partition(",")
+	try:
+		duration: Optional[float] = float(length.split()[0])
+	except (IndexError, ValueError):
+		duration = None
+	if duration is not None and duration < 0:
+		duration = None
+	artist, separator, title = display.strip().partition(" - ")
+	if not separator:
+		return display.strip() or None, None, duration
+	return title.strip() or None, artist.strip() or None, duration
+
+
+def _resolve_location(location: str, base: Path) -> Optional[str]:
+	if "://" in location:
+		parts = urlsplit(location)
+		if parts.scheme.lower() != "file":
+			# Streams are not part of the local library.
+			return None
+		location = unquote(parts.path)
+	path = Path(location)
+	if not path.is_absolute():
+		path = base / path
+	return os.path.normpath(path)
+
+
+def iter_m3u(path: Path) -> Iterator[PlaylistEntry]:
+	"""Stream entries from an M3U/M3U8 file without reading the referenced audio."""
+	base = path.parent
+	info: tuple[Optional[str], Optional[str], Optional[float]] = (None, None, None)
+	with open(path, "rb") as handle:
+		for raw in handle:
+			line = _decode(raw).lstrip("\ufeff").strip()
+			if not line:
+				continue
+			if line.startswith("#"):
+				if line[:8].upper() == "#EXTINF:":
+					info = _parse_extinf(line[8:])
+				continue
+			resolved = _resolve_location(line, base)
+			if resolved is not None:
+				yield PlaylistEntry(resolved, *info)
+			info = (None, None, None)
+
+
+def write_m3u(path: Path, tracks: Iterable) -> None:
+	"""Write an extended M3U with paths relative to the playlist where possible."""
+	base = path.parent
+	tmp = path.with_name(f"{path.name}.tmp")
+	with open(tmp, "w", encoding="utf-8", newline="\n") as handle:
+		handle.write("#EXTM3U\n")
+		for track in tracks:
+			duration = round(track.duration) if track.duration else -1
+			display = " - ".join(part for part in (track.artist, track.title) if part)
+			handle.write(f"#EXTINF:{duration},{display}\n")
+			try:
+				location = os.path.relpath(track.path, base)
+			except ValueError:
+				# Different drive on Windows.
+				location = track.path
+			handle.write(f"{location}\n")
+	os.replace(tmp, path)
+
+
+def resolve_entries(
+	entries: Iterable[PlaylistEntry],
+	library: LibraryIndex,
+	known: Dict[str, Track],
+) -> List[Track]:
+	"""Map entries to tracks by path: loaded tracks first, then index rows, then the entry itself.
+
+	Nothing here reads tags, so a playlist loads at the cost of one indexed
+	lookup for entries outside the loaded library. Files that no longer exist
+	are dropped.
+	"""
+	entries = list(entries)
+	resolved = dict(known)
+	rows = library.rows_for(entry.path for entry in entries if entry.path not in resolved)
+	tracks: List[Track] = []
+	for entry in entries:
+		track = resolved.get(entry.path)
+		if track is None:
+			row = rows.get(entry.path)
+			if row is not None:
+				track = build_song(Path(entry.path), row)
+			elif os.path.isfile(entry.path):
+				track = Track(
+					entry.path,
+					entry.title or Path(entry.path).stem,
+					entry.artist or "Unknown Author",
+					entry.duration,
+				)
+			else:
+				continue
+			resolved[entry.path] = track
+		tracks.append(track)
+	return tracks
+
+
+def clean_playlist_name(name: str) -> str:
+	return "".join(ch for ch in name.strip() if ch not in '<>:"/\\|?*' and ch >= " ").strip(". ")
+
+
+class PlaylistStore:
+	"""Named playlists kept as M3U8 files, with parsed entries cached in the library index."""
+
+	def __init__(self, directory: Path, library: LibraryIndex):
+		self.directory = directory
+		self.library = library
+
+	def names(self) -> List[str]:
+		try:
+			files = [entry for entry in os.scandir(self.directory) if entry.is_file()]
+		except OSError:
+			return []
+		names = {
+			Path(entry.name).stem for entry in files if os.path.splitext(entry.name)[1].lower() in PLAYLIST_EXTS
+		}
+		return sorted(names, key=str.casefold)
+
+	def path_for(self, name: str) -> Optional[Path]:
+		for ext in PLAYLIST_EXTS:
+			path = self.directory / f"{name}{ext}"
+			if path.is_file():
+				return path
+		return None
+
+	def load(self, name: str) -> List[PlaylistEntry]:
+		path = self.path_for(name)
+		if path is None:
+			raise FileNotFoundError(f"No playlist named {name!r}")
+		stat = path.stat()
+		cached = self.library.playlist_entries(name, stat.st_size, stat.st_mtime_ns)
+		if cached is not None:
+			return [PlaylistEntry(*row) for row in cached]
+		entries = list(iter_m3u(path))
+		self.library.store_playlist(name, stat.st_size, stat.st_mtime_ns, entries)
+		return entries
+
+	def save(self, name: str, tracks: Iterable) -> None:
+		path = self.path_for(name) or self.directory / f"{name}.m3u8"
+		self.directory.mkdir(parents=True, exist_ok=True)
+		entries = [PlaylistEntry(track.path, track.title, track.artist, track.duration) for track in tracks]
+		write_m3u(path, entries)
+		stat = path.stat()
+		self.library.store_playlist(name, stat.st_size, stat.st_mtime_ns, entries)
+
+	def append(self, name: str, tracks: Iterable) -> None:
+		self.save(name, [*self.load(name), *tracks])
+
+	def delete(self, name: str) -> None:
+		path = self.path_for(name)
+		if path is not None:
+			path.unlink()
+		self.library.remove_playlist(name)
+
+	def import_file(self, source: Path) -> str:
+		"""Copy an external playlist in, resolving its relative entries against its own folder."""
+		base = clean_playlist_name(source.stem) or "Imported"
+		name, suffix = base, 2
+		while self.path_for(name) is not None:
+			name = f"{base} ({suffix})"
+			suffix += 1
+		self.save(name, iter_m3u(source))
+		return name
+
+	def export(self, name: str, destination: Path) -> None:
+		write_m3u(destination, self.load(name))
+
+
+__all__ = [
+	"PlaylistEntry",
+	"PlaylistStore",
+	"PLAYLIST_EXTS",
+	"clean_playlist_name",
+	"iter_m3u",
+	"resolve_entries",
+	"write_m3u",
+]
@@ -0,0 +1,49 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+from .library import LibraryRow
+from .tags import read_tags
+
+# Entry points for scan pool workers. Spawned workers import this module, so it
+# must not import Qt directly or through the package ``__init__``.
+
+
+class ScannedFile(NamedTuple):
+	path: Path
+	stat: os.stat_result
+	thumbnail_path: Optional[Path]
+	lyrics_path: Optional[Path]
+
+
+def read_index_row(audio_path: Path, stat: os.stat_result) -> LibraryRow:
+	"""Parse ``audio_path`` into a library row; safe to run in a worker process."""
+	tags = read_tags(audio_path)
+	return {
+		"path": str(audio_path),
+		"size": stat.st_size,
+		"mtime_ns": stat.st_mtime_ns,
+		"title": tags.title,
+		"artist": tags.artist,
+		"album": tags.album,
+		"duration": tags.duration,
+		"art_hash": hashlib.sha1(tags.art).hexdigest() if tags.art else None,
+		"added_at": time.time(),
+		"has_lyrics": tags.has_lyrics,
+	}
+
+
+def read_index_rows(files: List[ScannedFile]) -> List[Tuple[Optional[LibraryRow], Optional[str]]]:
+	"""Parse a chunk of files in one task; a file that fails yields its error instead of a row."""
+	results: List[Tuple[Optional[LibraryRow], Optional[str]]] = []
+	for scanned in files:
+		try:
+			results.append((read_index_row(scanned.path, scanned.stat), None))
+		except Exception as e:
+			results.append((None, str(e)))
+	return results
+
+
+__all__ = ["ScannedFile", "read_index_row", "read_index_rows"]
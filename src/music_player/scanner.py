@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from .constants import (
+	SCAN_BATCH_SIZE,
+	SCAN_CHUNK_SIZE,
+	SCAN_EXECUTOR,
+	SCAN_MAX_WORKERS,
+	SCAN_PROCESS_THRESHOLD,
+)
+from .library import LibraryIndex, LibraryRow
+from .playlist_control import Track, build_song, carry_over_row, is_row_current, iter_audio_files
+from .scan_worker import ScannedFile, read_index_rows
+
+
+class ScanEngine(QObject):
+	"""Scans the music directory on a background thread and streams songs back in batches.
+
+	Unchanged files are served straight from the library index; everything else is
+	parsed in chunks on a ``concurrent.futures`` pool.
+	"""
+
+	songs_found = Signal(list)
+	finished = Signal(int)
+
+	_batch_ready = Signal(int, list)
+	_scan_done = Signal(int, int)
+
+	def __init__(
+		self,
+		library: Optional[LibraryIndex] = None,
+		executor: str = SCAN_EXECUTOR,
+		max_workers: Optional[int] = SCAN_MAX_WORKERS,
+		batch_size: int = SCAN_BATCH_SIZE,
+		parent=None,
+	):
+		super().__init__(parent)
+		self.library = library
+		self.executor = executor
+		self.max_workers = max_workers
+		self.batch_size = max(1, batch_size)
+		self._generation = 0
+		self._cancel_event: Optional[threading.Event] = None
+		self._thread: Optional[threading.Thread] = None
+		# Directories listed by the last completed scan, for the library watcher.
+		self.directories: List[Path] = []
+		# Worker-thread emissions are queued onto the GUI thread, where stale
+		# generations from a cancelled scan are dropped.
+		self._batch_ready.connect(self._deliver_batch)
+		self._scan_done.connect(self._deliver_finished)
+
+	def is_running(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self, music_dir: Path) -> None:
+		self.cancel()
+		self._generation += 1
+		self._cancel_event = threading.Event()
+		self._thread = threading.Thread(
+			target=self._run,
+			args=(music_dir, self._generation, self._cancel_event),
+			name="music-scan",
+			daemon=True,
+		)
+		self._thread.start()
+
+	def cancel(self) -> None:
+		if self._cancel_event:
+			self._cancel_event.set()
+
+	def _deliver_batch(self, generation: int, songs: List[Track]) -> None:
+		if generation == self._generation:
+			self.songs_found.emit(songs)
+
+	def _deliver_finished(self, generation: int, count: int) -> None:
+		if generation == self._generation:
+			self.finished.emit(count)
+
+	def _make_executor(self, pending: int) -> Executor:
+		if self.executor == "process" and pending >= SCAN_PROCESS_THRESHOLD:
+			# Forking a process that has Qt threads running is unsafe; spawn clean workers.
+			return ProcessPoolExecutor(
+				max_workers=self.max_workers,
+				mp_context=multiprocessing.get_context("spawn"),
+			)
+		return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="music-tags")
+
+	def _run(self, music_dir: Path, generation: int, cancelled: threading.Event) -> None:
+		count = 0
+		try:
+			count = self._scan(music_dir, generation, cancelled)
+		except Exception as e:
+			print(f"Error scanning music directory: {e}")
+		finally:
+			# Always report completion so the window never waits on a failed scan.
+			self._scan_done.emit(generation, count)
+
+	def _scan(self, music_dir: Path, generation: int, cancelled: threading.Event) -> int:
+		known = self.library.snapshot() if self.library else {}
+		seen: set[str] = set()
+		changed: List[LibraryRow] = []
+		batch: List[Track] = []
+		directories: List[Path] = []
+		count = 0
+
+		pool: Optional[Executor] = None
+		# Changed files wait here until they fill a chunk, and before the pool
+		# exists until there are enough to justify a process pool.
+		pending: List[ScannedFile] = []
+		futures: Dict[Future, List[ScannedFile]] = {}
+		completed: "queue.SimpleQueue[Future]" = queue.SimpleQueue()
+
+		def flush(force: bool = False) -> None:
+			nonlocal batch, count
+			if batch and (force or len(batch) >= self.batch_size):
+				count += len(batch)
+				self._batch_ready.emit(generation, batch)
+				batch = []
+
+		def submit(files: List[ScannedFile]) -> None:
+			# One task per chunk keeps the per-file round trip to the workers off the critical path.
+			for start in range(0, len(files), SCAN_CHUNK_SIZE):
+				chunk = files[start : start + SCAN_CHUNK_SIZE]
+				future = pool.submit(read_index_rows, chunk)
+				futures[future] = chunk
+				future.add_done_callback(completed.put)
+
+		def drain(timeout: Optional[float] = None) -> None:
+			while futures:
+				try:
+					future = completed.get(timeout=timeout) if timeout else completed.get_nowait()
+				except queue.Empty:
+					return
+				chunk = futures.pop(future)
+				try:
+					results = future.result()
+				except Exception as e:
+					print(f"Error reading tags in {chunk[0].path.parent}: {e}")
+					continue
+				for scanned, (row, error) in zip(chunk, results):
+					if row is None:
+						print(f"Error reading tags for {scanned.path}: {error}")
+						continue
+					carry_over_row(row, known.get(row["path"]))
+					changed.append(row)
+					batch.append(build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path))
+					flush()
+
+		try:
+			for scanned in iter_audio_files(music_dir, directories=directories):
+				if cancelled.is_set():
+					return count
+				key = str(scanned.path)
+				seen.add(key)
+				row = known.get(key)
+				if is_row_current(row, scanned.stat):
+					batch.append(build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path))
+					flush()
+				else:
+					pending.append(scanned)
+					if pool is None and len(pending) >= SCAN_PROCESS_THRESHOLD:
+						pool = self._make_executor(len(pending))
+					if pool is not None and len(pending) >= SCAN_CHUNK_SIZE:
+						submit(pending)
+						pending = []
+				drain()
+
+			if pending:
+				if pool is None:
+					pool = self._make_executor(len(pending))
+				submit(pending)
+			flush(force=True)
+
+			while futures:
+				if cancelled.is_set():
+					return count
+				drain(timeout=0.2)
+			flush(force=True)
+		finally:
+			if pool is not None:
+				pool.shutdown(wait=not cancelled.is_set(), cancel_futures=True)
+
+		if self.library and not cancelled.is_set():
+			self.library.upsert_many(changed)
+			self.library.remove_many(key for key in known if key not in seen)
+		if not cancelled.is_set():
+			self.directories = directories
+		return count
+
+
+__all__ = ["ScanEngine"]
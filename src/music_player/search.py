@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .playlist_control import Track
+
+SORT_MODES = {
+	"title": "Title",
+	"artist": "Artist",
+	"added": "Date Added",
+}
+DEFAULT_SORT_MODE = "title"
+
+
+def normalize_text(text: str) -> str:
+	"""Casefold and strip accents so "nang tho" finds "Nàng Thơ"."""
+	decomposed = unicodedata.normalize("NFKD", text.casefold())
+	return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _trigrams(text: str) -> Set[str]:
+	return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class TrackSearchIndex:
+	"""Trigram index over title, artist and filename with precomputed sort keys.
+
+	Keys are computed once when a track is added, so filtering and re-sorting
+	never casefold or normalize strings on the hot path.
+	"""
+
+	def __init__(self):
+		self._haystacks: Dict[Track, str] = {}
+		self._postings: Dict[str, Set[Track]] = {}
+		self._sort_keys: Dict[str, Dict[Track, tuple]] = {mode: {} for mode in SORT_MODES}
+		# Terms shorter than a trigram are matched by a flat scan over parallel
+		# lists, built lazily; results are cached until the index changes.
+		self._flat: Optional[tuple[List[Track], List[str]]] = None
+		self._short_cache: Dict[str, Set[Track]] = {}
+
+	def __len__(self) -> int:
+		return len(self._haystacks)
+
+	def clear(self) -> None:
+		self._invalidate()
+		self._haystacks.clear()
+		self._postings.clear()
+		for keys in self._sort_keys.values():
+			keys.clear()
+
+	def _invalidate(self) -> None:
+		self._flat = None
+		self._short_cache.clear()
+
+	def add(self, tracks: Iterable[Track]) -> None:
+		self._invalidate()
+		for track in tracks:
+			title = normalize_text(track.title)
+			artist = normalize_text(track.artist)
+			filename = normalize_text(os.path.basename(track.path))
+			haystack = f"{title}\n{artist}\n{filename}"
+			self._haystacks[track] = haystack
+			for gram in _trigrams(haystack):
+				self._postings.setdefault(gram, set()).add(track)
+			self._sort_keys["title"][track] = (title, artist)
+			self._sort_keys["artist"][track] = (artist, title)
+			self._sort_keys["added"][track] = (-(track.added_at or 0.0), title, artist)
+
+	def remove(self, tracks: Iterable[Track]) -> None:
+		self._invalidate()
+		for track in tracks:
+			haystack = self._haystacks.pop(track, None)
+			if haystack is None:
+				continue
+			for gram in _trigrams(haystack):
+				bucket = self._postings.get(gram)
+				if bucket is not None:
+					bucket.discard(track)
+					if not bucket:
+						del self._postings[gram]
+			for keys in self._sort_keys.values():
+				keys.pop(track, None)
+
+	def sort_key(self, mode: str) -> Callable[[Track], tuple]:
+		keys = self._sort_keys.get(mode, self._sort_keys[DEFAULT_SORT_MODE])
+		return keys.__getitem__
+
+	def _scan_short(self, term: str) -> Set[Track]:
+		cached = self._short_cache.get(term)
+		if cached is not None:
+			return cached
+		if self._flat is None:
+			self._flat = (list(self._haystacks), list(self._haystacks.values()))
+		tracks, haystacks = self._flat
+		matched = {track for track, haystack in zip(tracks, haystacks) if term in haystack}
+		self._short_cache[term] = matched
+		return matched
+
+	def matching(self, query: str, tracks: Iterable[Track]) -> List[Track]:
+		"""The indexed ``tracks`` that match every word of ``query``, checked directly.
+
+		Cheaper than ``search`` for a small batch, such as newly scanned tracks.
+		"""
+		terms = normalize_text(query).split()
+		haystacks = self._haystacks
+		return [
+			track
+			for track in tracks
+			if track in haystacks and all(term in haystacks[track] for term in terms)
+		]
+
+	def search(self, query: str) -> Optional[Set[Track]]:
+		"""Return tracks matching every word of ``query``, or ``None`` for an empty query."""
+		terms = normalize_text(query).split()
+		if not terms:
+			return None
+
+		candidates: Optional[Set[Track]] = None
+		# Short terms are matched exactly; longer ones only narrowed by trigrams.
+		unverified = []
+		for term in terms:
+			grams = _trigrams(term)
+			if not grams:
+				matched = self._scan_short(term)
+			else:
+				buckets = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+				matched = set(buckets[0])
+				for bucket in buckets[1:]:
+					matched &= bucket
+				if len(term) > 3:
+					unverified.append(term)
+			candidates = matched if candidates is None else candidates & matched
+			if not candidates:
+				return set()
+
+		if not unverified:
+			return candidates
+		haystacks = self._haystacks
+		return {track for track in candidates if all(term in haystacks[track] for term in unverified)}
+
+
+__all__ = ["TrackSearchIndex", "SORT_MODES", "DEFAULT_SORT_MODE", "normalize_text"]
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+from PySide6.QtCore import QObject, QRectF, QThread, Signal, Slot
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtMultimedia import QAudioFormat, QMediaPlayer
+from PySide6.QtWidgets import QWidget
+
+from .constants import SPECTRUM_BANDS, SPECTRUM_FFT_SIZE, SPECTRUM_FPS, SPECTRUM_RATE
+from .playback import PlaybackDeck
+from .styles import SPECTRUM_COLORS
+
+_MIN_HZ = 40.0
+_MAX_HZ = 10000.0
+_BASS_HZ = 160.0
+# Band levels span this many dB below the recent peak.
+_DYNAMIC_RANGE_DB = 45.0
+# Per-frame decay of the running peak, about -1.5 dB per second at 30 fps.
+_PEAK_DECAY = 0.988
+_BEAT_RATIO = 1.4
+_BEAT_GAP_S = 0.25
+
+
+class SpectrumFrame(NamedTuple):
+	"""One visual frame: normalized band levels (low to high), overall level, bass and a beat flag."""
+
+	bands: tuple[float, ...]
+	level: float
+	bass: float
+	beat: bool
+
+
+SILENT_FRAME = SpectrumFrame((0.0,) * SPECTRUM_BANDS, 0.0, 0.0, False)
+
+
+def _mono_samples(buffer) -> Optional[np.ndarray]:
+	fmt = buffer.format()
+	channels = max(1, fmt.channelCount())
+	sample_format = fmt.sampleFormat()
+	if sample_format == QAudioFormat.SampleFormat.Float:
+		samples = np.frombuffer(buffer.constData(), dtype=np.float32, count=buffer.sampleCount())
+	elif sample_format == QAudioFormat.SampleFormat.Int16:
+		raw = np.frombuffer(buffer.constData(), dtype=np.int16, count=buffer.sampleCount())
+		samples = raw.astype(np.float32) / 32768.0
+	else:
+		return None
+	if channels > 1:
+		samples = samples[: len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+	return samples
+
+
+class _SpectrumWorker(QObject):
+	"""Keeps the latest FFT window of samples and turns it into at most ``fps`` frames a second.
+
+	Incoming buffers only shift the ring; the FFT runs when a frame is due, so
+	the cost per second is bounded by the frame rate, not by the buffer rate.
+	"""
+
+	frame_ready = Signal(object)
+
+	def __init__(self, rate: int, size: int, bands: int, fps: int):
+		super().__init__()
+		self._ring = np.zeros(size, dtype=np.float32)
+		self._window = np.hanning(size).astype(np.float32)
+		freqs = np.fft.rfftfreq(size, 1.0 / rate)
+		edges = np.geomspace(_MIN_HZ, min(_MAX_HZ, rate / 2.0), bands + 1)
+		starts = np.searchsorted(freqs, edges[:-1])
+		# At least one bin per band, even where log spacing is finer than the FFT.
+		starts = np.maximum(starts, starts[0] + np.arange(bands))
+		self._stop = max(int(np.searchsorted(freqs, edges[-1])), int(starts[-1]) + 1)
+		self._starts = starts
+		self._widths = np.diff(np.append(starts, self._stop)).astype(np.float32)
+		self._bass_bands = max(1, int(np.searchsorted(edges[1:], _BASS_HZ)))
+		self._interval = 1.0 / fps
+		self._last_frame = 0.0
+		self._peak = 1e-9
+		self._bass_average = 0.0
+		self._last_beat = 0.0
+		self.frames = 0
+		self.buffers = 0
+		self.total_cost = 0.0
+		self.max_cost = 0.0
+
+	@Slot(object)
+	def feed(self, buffer) -> None:
+		started = time.perf_counter()
+		samples = _mono_samples(buffer)
+		if samples is None or not len(samples):
+			return
+		self.buffers += 1
+		ring = self._ring
+		count = len(samples)
+		if count >= len(ring):
+			ring[:] = samples[-len(ring) :]
+		else:
+			ring[:-count] = ring[count:]
+			ring[-count:] = samples
+		if started - self._last_frame < self._interval:
+			return
+		self._last_frame = started
+		self.frame_ready.emit(self._analyze(started))
+		cost = time.perf_counter() - started
+		self.frames += 1
+		self.total_cost += cost
+		self.max_cost = max(self.max_cost, cost)
+
+	@Slot()
+	def reset(self) -> None:
+		self._ring[:] = 0.0
+		self._bass_average = 0.0
+		self.frame_ready.emit(SILENT_FRAME)
+
+	def _analyze(self, now: float) -> SpectrumFrame:
+		power = np.square(np.abs(np.fft.rfft(self._ring * self._window)))
+		energies = np.add.reduceat(power[: self._stop], self._starts) / self._widths
+		self._peak = max(float(energies.max()), self._peak * _PEAK_DECAY, 1e-9)
+		with np.errstate(divide="ignore"):
+			relative = 10.0 * np.log10(energies / self._peak)
+		bands = np.clip(1.0 + relative / _DYNAMIC_RANGE_DB, 0.0, 1.0)
+
+		rms = float(np.sqrt(np.mean(np.square(self._ring))))
+		level = min(1.0, max(0.0, (20.0 * np.log10(rms + 1e-9) + 60.0) / 60.0))
+		bass_energy = float(energies[: self._bass_bands].mean())
+		beat = (
+			level > 0.1
+			and bass_energy > self._bass_average * _BEAT_RATIO
+			and now - self._last_beat > _BEAT_GAP_S
+		)
+		if beat:
+			self._last_beat = now
+		self._bass_average = 0.9 * self._bass_average + 0.1 * bass_energy
+		bass = float(bands[: self._bass_bands].mean())
+		return SpectrumFrame(tuple(bands.tolist()), level, bass, beat)
+
+
+class SpectrumAnalyzer(QObject):
+	"""Band energies of what is playing, computed on a worker thread.
+
+	Decoded PCM is tapped from the playback deck. ``frame_ready`` carries a
+	``SpectrumFrame`` at most ``SPECTRUM_FPS`` times a second while music plays,
+	and a silent frame when playback stops.
+	"""
+
+	frame_ready = Signal(object)
+
+	_reset = Signal()
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self._thread = QThread(self)
+		self._thread.setObjectName("music-spectrum")
+		self._worker = _SpectrumWorker(SPECTRUM_RATE, SPECTRUM_FFT_SIZE, SPECTRUM_BANDS, SPECTRUM_FPS)
+		self._worker.moveToThread(self._thread)
+		self._worker.frame_ready.connect(self.frame_ready)
+		self._reset.connect(self._worker.reset)
+		self._thread.start(QThread.Priority.LowPriority)
+
+	def attach(self, deck: PlaybackDeck) -> None:
+		fmt = QAudioFormat()
+		fmt.setSampleRate(SPECTRUM_RATE)
+		fmt.setChannelCount(1)
+		fmt.setSampleFormat(QAudioFormat.SampleFormat.Float)
+		deck.enable_audio_tap(fmt)
+		deck.audioBufferReceived.connect(self._worker.feed)
+		deck.playbackStateChanged.connect(self._playback_state_changed)
+
+	def _playback_state_changed(self, state) -> None:
+		if state != QMediaPlayer.PlaybackState.PlayingState:
+			self._reset.emit()
+
+	def stats(self) -> dict:
+		"""Frame count and per-frame analysis cost in milliseconds, for profiling."""
+		worker = self._worker
+		return {
+			"buffers": worker.buffers,
+			"frames": worker.frames,
+			"avg_ms": worker.total_cost / worker.frames * 1000.0 if worker.frames else 0.0,
+			"max_ms": worker.max_cost * 1000.0,
+		}
+
+	def stop(self) -> None:
+		if not self._thread.isRunning():
+			return
+		self._thread.quit()
+		self._thread.wait(2000)
+
+
+class SpectrumBars(QWidget):
+	"""Bar visualizer for ``SpectrumFrame`` values; repaints only while visible."""
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self._bands: tuple[float, ...] = SILENT_FRAME.bands
+
+	def set_frame(self, frame: SpectrumFrame) -> None:
+		if frame.bands == self._bands:
+			return
+		self._bands = frame.bands
+		if self.isVisible():
+			self.update()
+
+	def paintEvent(self, event):
+		if not any(self._bands):
+			return
+		painter = QPainter(self)
+		count = len(self._bands)
+		gap = 2.0
+		width = (self.width() - gap * (count - 1)) / count
+		height = self.height()
+		color = QColor(SPECTRUM_COLORS["bar"])
+		for idx, level in enumerate(self._bands):
+			bar = max(1.0, level * height)
+			painter.fillRect(QRectF(idx * (width + gap), height - bar, width, bar), color)
+		painter.end()
+
+
+__all__ = ["SpectrumAnalyzer", "SpectrumBars", "SpectrumFrame", "SILENT_FRAME"]
@@ -43,6 +43,11 @@ MUSIC_PLAYER_STYLESHEET = r"""
 		font-size: 14px;
 		color: #294368;
 	}
+	#LyricsLabel {
+		font-size: 13px;
+		font-style: italic;
+		color: #1F3D66;
+	}
 	#Thumbnail {
 		border: 3px solid #1F3D66;
 		border-radius: 6px;
@@ -109,11 +114,30 @@ MUSIC_PLAYER_STYLESHEET = r"""
 		border: 2px solid #1F3D66;
 	}
 
+	#SearchBox, #SortBox, #PlaylistBox, #PlaylistMenuButton {
+		background: #E5F3FF;
+		border: 3px solid #1F3D66;
+		border-radius: 6px;
+		color: #0F1B2D;
+		padding: 4px 8px;
+		font-size: 12px;
+	}
+	#SearchBox:focus { background: #FFFFFF; }
+	#SortBox QAbstractItemView, #PlaylistBox QAbstractItemView {
+		background: #E5F3FF;
+		color: #0F1B2D;
+		selection-background-color: #7CB8F0;
+	}
+
 	#TimeLabel {
 		color: #000000;
 		font-weight: bold;
 		font-size: 13px;
 	}
+	#SummaryLabel {
+		color: #1F3D66;
+		font-size: 11px;
+	}
 
 	QToolTip {
 		background: #0F1B2D;
@@ -124,6 +148,21 @@ MUSIC_PLAYER_STYLESHEET = r"""
 	}
 """
 
+# Waveform seek bar, matching the slider groove above.
+WAVEFORM_COLORS = {
+	"background": "#E5F3FF",
+	"border": "#1F3D66",
+	"peak": "#CFE8FF",
+	"rms": "#7CB8F0",
+	"played_peak": "#7CB8F0",
+	"played_rms": "#1F3D66",
+	"playhead": "#0F1B2D",
+}
+
+SPECTRUM_COLORS = {
+	"bar": "#7CB8F0",
+}
+
 HELP_HTML = """
 <h2>Keybinds</h2>
 <ul>
@@ -133,6 +172,10 @@ HELP_HTML = """
   	<li><b>Enter</b>: Play selected (switches to Normal)</li>
   	<li><b>P</b>: Play/Pause</li>
   	<li><b>M</b>: Change Mode</li>
+  	<li><b>N</b>: Play selected next</li>
+  	<li><b>Q</b>: Add selected to queue</li>
+  	<li><b>/ or Ctrl+F</b>: Search title, artist or file</li>
+  	<li><b>Esc</b> (in search): Clear search</li>
 </ul>
 
 <h2>Modes</h2>
@@ -143,4 +186,4 @@ HELP_HTML = """
 </ul>
 """
 
-__all__ = ["MUSIC_PLAYER_STYLESHEET", "HELP_HTML"]
+__all__ = ["MUSIC_PLAYER_STYLESHEET", "HELP_HTML", "WAVEFORM_COLORS", "SPECTRUM_COLORS"]
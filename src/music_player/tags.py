@@ -0,0 +1,157 @@
+import base64
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from mutagen._file import File as MutagenFile
+from mutagen._util import MutagenError
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3
+from mutagen.mp4 import MP4Tags
+
+# Text frames per tag family; Vorbis comments (FLAC, Ogg Vorbis, Opus) use plain keys.
+_ID3_KEYS = {"title": "TIT2", "artist": "TPE1", "album": "TALB"}
+_MP4_KEYS = {"title": "\xa9nam", "artist": "\xa9ART", "album": "\xa9alb"}
+_VORBIS_KEYS = {"title": "title", "artist": "artist", "album": "album"}
+
+# Prefer the front cover when a file embeds several pictures.
+_FRONT_COVER = 3
+# SYLT timestamps in milliseconds; MPEG frame counts cannot be mapped without decoding.
+_SYLT_MILLISECONDS = 2
+# Unsynced lyrics text, which is often LRC formatted.
+_MP4_LYRICS = "\xa9lyr"
+_VORBIS_LYRICS = ("lyrics", "unsyncedlyrics")
+
+
+class TagInfo(NamedTuple):
+	title: Optional[str] = None
+	artist: Optional[str] = None
+	album: Optional[str] = None
+	duration: Optional[float] = None
+	art: Optional[bytes] = None
+	# Whether the tags embed lyrics, so players only read them for files that do.
+	has_lyrics: bool = False
+
+
+def _first_text(tags: Any, key: str) -> Optional[str]:
+	try:
+		values = tags.get(key)
+	except (KeyError, ValueError):
+		return None
+	if values is None:
+		return None
+	# ID3 frames keep their strings in ``.text``; MP4 and Vorbis return lists.
+	values = getattr(values, "text", values)
+	if isinstance(values, (list, tuple)):
+		values = values[0] if values else None
+	text = str(values).strip() if values is not None else ""
+	return text or None
+
+
+def _id3_art(tags: ID3) -> Optional[bytes]:
+	frames = tags.getall("APIC")
+	if not frames:
+		return None
+	front = next((frame for frame in frames if frame.type == _FRONT_COVER), frames[0])
+	return front.data
+
+
+def _mp4_art(tags: MP4Tags) -> Optional[bytes]:
+	covers = tags.get("covr")
+	return bytes(covers[0]) if covers else None
+
+
+def _picture_art(audio: Any) -> Optional[bytes]:
+	pictures = list(getattr(audio, "pictures", None) or [])
+	if not pictures and audio.tags is not None:
+		# Ogg containers carry pictures as base64 FLAC blocks inside a comment.
+		for encoded in audio.tags.get("metadata_block_picture", []):
+			try:
+				pictures.append(Picture(base64.b64decode(encoded)))
+			except (ValueError, MutagenError):
+				continue
+	if not pictures:
+		return None
+	front = next((picture for picture in pictures if picture.type == _FRONT_COVER), pictures[0])
+	return front.data
+
+
+class LyricsTag(NamedTuple):
+	# (milliseconds, line) pairs from an ID3 SYLT frame.
+	synced: Optional[List[Tuple[int, str]]] = None
+	text: Optional[str] = None
+
+
+def _id3_lyrics(tags: ID3) -> LyricsTag:
+	synced = None
+	for frame in tags.getall("SYLT"):
+		if frame.format == _SYLT_MILLISECONDS and frame.text:
+			synced = [(int(time), text) for text, time in frame.text]
+			break
+	unsynced = tags.getall("USLT")
+	return LyricsTag(synced, unsynced[0].text if unsynced else None)
+
+
+def read_lyrics(audio_path: Path) -> LyricsTag:
+	"""Read embedded lyrics: ID3 SYLT/USLT frames, the MP4 lyrics atom or a Vorbis comment."""
+	try:
+		audio = MutagenFile(audio_path)
+	except (MutagenError, OSError):
+		return LyricsTag()
+	if audio is None:
+		return LyricsTag()
+	return _tag_lyrics(audio.tags)
+
+
+def _tag_lyrics(tags: Any) -> LyricsTag:
+	if tags is None:
+		return LyricsTag()
+	if isinstance(tags, ID3):
+		return _id3_lyrics(tags)
+	if isinstance(tags, MP4Tags):
+		return LyricsTag(None, _first_text(tags, _MP4_LYRICS))
+	for key in _VORBIS_LYRICS:
+		text = _first_text(tags, key)
+		if text:
+			return LyricsTag(None, text)
+	return LyricsTag()
+
+
+def read_tags(audio_path: Path, with_art: bool = True) -> TagInfo:
+	"""Read text tags, duration and embedded art from a single parse of ``audio_path``.
+
+	Handles ID3 (MP3, WAV), MP4 atoms (M4A) and Vorbis comments (FLAC, Ogg
+	Vorbis, Opus). Unreadable files yield an empty ``TagInfo``.
+	"""
+	try:
+		audio = MutagenFile(audio_path)
+	except (MutagenError, OSError):
+		return TagInfo()
+	if audio is None:
+		return TagInfo()
+
+	duration = getattr(audio.info, "length", None) if audio.info else None
+	tags = audio.tags
+	if isinstance(tags, ID3):
+		keys, art_reader = _ID3_KEYS, _id3_art
+	elif isinstance(tags, MP4Tags):
+		keys, art_reader = _MP4_KEYS, _mp4_art
+	else:
+		keys, art_reader = _VORBIS_KEYS, None
+
+	title = artist = album = None
+	if tags is not None:
+		title = _first_text(tags, keys["title"])
+		artist = _first_text(tags, keys["artist"])
+		album = _first_text(tags, keys["album"])
+
+	art = None
+	if with_art:
+		if art_reader is not None:
+			art = art_reader(tags)
+		elif isinstance(audio, FLAC) or tags is not None:
+			art = _picture_art(audio)
+	lyrics = _tag_lyrics(tags)
+	return TagInfo(title, artist, album, duration, art, bool(lyrics.synced or lyrics.text))
+
+
+__all__ = ["LyricsTag", "TagInfo", "read_lyrics", "read_tags"]
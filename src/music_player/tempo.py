@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+# Onsets are detected on a 12 kHz mono signal; beats carry little energy above that.
+_DECIMATION = 4
+_FRAME = 512
+_HOP = 128
+_MIN_BPM = 60.0
+_MAX_BPM = 200.0
+# Autocorrelation peaks are weighted towards this tempo to settle octave ambiguity.
+_PREFERRED_BPM = 120.0
+# A pulse at half the chosen lag this strong means the prior folded a fast track to half tempo.
+_DOUBLE_TEMPO_RATIO = 0.85
+_MIN_SECONDS = 10.0
+
+
+class BeatGrid(NamedTuple):
+	bpm: float
+	# Time of the first beat in seconds; later beats follow every 60 / bpm seconds.
+	offset: float
+
+
+class TempoTracker:
+	"""Tempo and beat phase of interleaved float samples fed in arbitrary chunks.
+
+	Builds a spectral-flux onset envelope while the track decodes, then picks
+	the beat period from its autocorrelation and the phase from a comb over
+	the envelope.
+	"""
+
+	def __init__(self, rate: int, channels: int):
+		self.channels = channels
+		self._rate = rate / _DECIMATION
+		self._raw = np.empty(0, dtype=np.float32)
+		self._pending = np.empty(0, dtype=np.float32)
+		self._window = np.hanning(_FRAME).astype(np.float32)
+		self._previous: Optional[np.ndarray] = None
+		self._flux: List[np.ndarray] = []
+
+	@property
+	def frame_rate(self) -> float:
+		return self._rate / _HOP
+
+	def feed(self, samples: np.ndarray) -> None:
+		mono = samples.reshape(-1, self.channels).mean(axis=1)
+		if len(self._raw):
+			mono = np.concatenate((self._raw, mono))
+		usable = len(mono) - len(mono) % _DECIMATION
+		self._raw = mono[usable:].copy()
+		decimated = mono[:usable].reshape(-1, _DECIMATION).mean(axis=1)
+		pending = np.concatenate((self._pending, decimated)) if len(self._pending) else decimated
+		if len(pending) < _FRAME:
+			self._pending = pending.copy()
+			return
+		count = (len(pending) - _FRAME) // _HOP + 1
+		frames = np.lib.stride_tricks.sliding_window_view(pending, _FRAME)[::_HOP][:count]
+		magnitude = np.log1p(100.0 * np.abs(np.fft.rfft(frames * self._window, axis=1)))
+		previous = magnitude[0] if self._previous is None else self._previous
+		steps = np.diff(magnitude, axis=0, prepend=previous[None, :])
+		self._flux.append(np.maximum(steps, 0.0).sum(axis=1))
+		self._previous = magnitude[-1]
+		self._pending = pending[count * _HOP :].copy()
+
+	def result(self) -> Optional[BeatGrid]:
+		"""Estimated grid, or ``None`` when the track is too short or has no pulse."""
+		if not self._flux:
+			return None
+		onset = np.concatenate(self._flux).astype(np.float64)
+		fps = self.frame_rate
+		if len(onset) < fps * _MIN_SECONDS:
+			return None
+		# Subtract a half-second moving average so only sudden rises remain.
+		width = max(1, int(fps / 2))
+		local = np.convolve(onset, np.ones(width) / width, mode="same")
+		onset = np.maximum(onset - local, 0.0)
+		if not onset.any():
+			return None
+
+		size = len(onset)
+		spectrum = np.fft.rfft(onset, 2 * size)
+		autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum))[:size]
+		low = int(fps * 60.0 / _MAX_BPM)
+		high = min(size - 2, int(fps * 60.0 / _MIN_BPM) + 1)
+		if high <= low:
+			return None
+		# Periods rarely land on a whole frame, so a peak splits across two lags;
+		# score each lag with its neighbours so split peaks count in full.
+		strength = np.convolve(autocorrelation, np.ones(3), mode="same")
+		lags = np.arange(low, high + 1)
+		bpms = fps * 60.0 / lags
+		weights = np.exp(-0.5 * np.square(np.log2(bpms / _PREFERRED_BPM)))
+		best = int(lags[np.argmax(strength[low : high + 1] * weights)])
+		half = int(round(best / 2.0))
+		if half - 1 >= low and strength[half] >= _DOUBLE_TEMPO_RATIO * strength[best]:
+			best = half - 1 + int(np.argmax(autocorrelation[half - 1 : half + 2]))
+		else:
+			best = best - 1 + int(np.argmax(autocorrelation[best - 1 : best + 2]))
+		if autocorrelation[best] <= 0:
+			return None
+		# Parabolic interpolation for a sub-frame period.
+		left, centre, right = autocorrelation[best - 1 : best + 2]
+		denominator = left - 2.0 * centre + right
+		shift = 0.5 * (left - right) / denominator if denominator < 0 else 0.0
+		period = best + float(np.clip(shift, -0.5, 0.5))
+
+		beats = int((size - 1) / period)
+		phases = np.arange(int(np.ceil(period)))
+		positions = np.rint(phases[:, None] + np.arange(beats)[None, :] * period).astype(np.intp)
+		positions = np.minimum(positions, size - 1)
+		phase = int(phases[np.argmax(onset[positions].sum(axis=1))])
+		# Flux peaks once an onset enters a frame, i.e. one frame length before it.
+		offset = (phase / fps + _FRAME / self._rate) % (period / fps)
+		return BeatGrid(round(fps * 60.0 / period, 2), round(offset, 3))
+
+
+__all__ = ["BeatGrid", "TempoTracker"]
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import AbstractSet, Callable, Dict, Iterable, List, Optional, Sequence
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt, Signal
+
+from .playlist_control import Track
+from .utils import format_song_label, format_time
+
+# Past this many insertions one merge + reset is cheaper than row-by-row inserts.
+BULK_INSERT_THRESHOLD = 64
+
+_ROOT = QModelIndex()
+
+
+def _duration(tracks: Iterable[Track]) -> float:
+	return sum(track.duration or 0.0 for track in tracks)
+
+
+class TrackTableModel(QAbstractTableModel):
+	"""Table model that reads straight from the playlist list; rows are only formatted when painted.
+
+	An optional filter narrows the visible rows to a subset of the playlist
+	without copying tracks; view rows are mapped back to playlist indices.
+	Total duration is kept up to date by each insert and removal.
+	"""
+
+	HEADERS = ("No.", "Available Tracks", "Time")
+	TIME_COLUMN = 2
+
+	totals_changed = Signal()
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+		self.tracks: List[Track] = []
+		self._filter: Optional[AbstractSet[Track]] = None
+		# Whether ``_filter`` is a private copy that appends may extend.
+		self._filter_owned = False
+		self._visible: Optional[List[int]] = None
+		self._positions: Optional[Dict[Track, int]] = None
+		self._total_seconds = 0.0
+		self._visible_seconds = 0.0
+
+	def rowCount(self, parent=_ROOT):
+		if parent.isValid():
+			return 0
+		return len(self.tracks) if self._visible is None else len(self._visible)
+
+	def columnCount(self, parent=_ROOT):
+		return 0 if parent.isValid() else len(self.HEADERS)
+
+	def data(self, index: QModelIndex | QPersistentModelIndex, role=Qt.ItemDataRole.DisplayRole):
+		if not index.isValid():
+			return None
+		row = self.source_row(index.row())
+		if role == Qt.ItemDataRole.DisplayRole:
+			if index.column() == 0:
+				return str(row + 1)
+			track = self.tracks[row]
+			if index.column() == self.TIME_COLUMN:
+				return format_time(track.duration * 1000) if track.duration else ""
+			return format_song_label(track.title, track.artist)
+		if role == Qt.ItemDataRole.ToolTipRole and index.column() == 1:
+			track = self.tracks[row]
+			tooltip = f"{track.title} - {track.artist}"
+			return f"{tooltip}\n{track.album}" if track.album else tooltip
+		if role == Qt.ItemDataRole.TextAlignmentRole and index.column() != 1:
+			return Qt.AlignmentFlag.AlignCenter
+		return None
+
+	def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+		if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+			return self.HEADERS[section]
+		return None
+
+	def flags(self, index):
+		if not index.isValid():
+			return Qt.ItemFlag.NoItemFlags
+		return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+	def track(self, row: int) -> Optional[Track]:
+		return self.tracks[row] if 0 <= row < len(self.tracks) else None
+
+	def visible_seconds(self) -> float:
+		"""Duration of the rows currently shown."""
+		return self._total_seconds if self._visible is None else self._visible_seconds
+
+	def visible_tracks(self) -> Iterable[Track]:
+		if self._visible is None:
+			return self.tracks
+		return (self.tracks[row] for row in self._visible)
+
+	def source_row(self, view_row: int) -> int:
+		"""Map a view row to its playlist index."""
+		if self._visible is None:
+			return view_row
+		return self._visible[view_row] if 0 <= view_row < len(self._visible) else -1
+
+	def view_row(self, source_row: int) -> int:
+		"""Map a playlist index to its view row, or -1 when it is filtered out."""
+		if self._visible is None:
+			return source_row
+		pos = bisect.bisect_left(self._visible, source_row)
+		if pos < len(self._visible) and self._visible[pos] == source_row:
+			return pos
+		return -1
+
+	def positions(self) -> Dict[Track, int]:
+		"""Playlist index of every track, rebuilt lazily after the list changes."""
+		if self._positions is None:
+			self._positions = {track: idx for idx, track in enumerate(self.tracks)}
+		return self._positions
+
+	def set_filter(self, matches: Optional[AbstractSet[Track]]) -> None:
+		self.beginResetModel()
+		self._filter = matches
+		self._filter_owned = False
+		self._refresh_visible()
+		self.endResetModel()
+		self.totals_changed.emit()
+
+	def _refresh_visible(self, visible_seconds: Optional[float] = None) -> None:
+		"""Rebuild the visible rows; pass ``visible_seconds`` when the filtered set is unchanged."""
+		if self._filter is None:
+			self._visible = None
+			return
+		matches = self._filter
+		if len(matches) * 8 > len(self.tracks):
+			# Broad matches: one ordered pass beats sorting most of the playlist.
+			self._visible = [idx for idx, track in enumerate(self.tracks) if track in matches]
+		else:
+			positions = self.positions()
+			self._visible = sorted(positions[track] for track in matches if track in positions)
+		if visible_seconds is None:
+			tracks = self.tracks
+			visible_seconds = sum(tracks[idx].duration or 0.0 for idx in self._visible)
+		self._visible_seconds = visible_seconds
+
+	def reset(
+		self,
+		tracks: Iterable[Track],
+		total_seconds: Optional[float] = None,
+		visible_seconds: Optional[float] = None,
+	) -> None:
+		"""Replace every row; pass the totals when they are already known, e.g. after a reorder."""
+		self.beginResetModel()
+		self.tracks[:] = tracks
+		self._positions = None
+		if total_seconds is None:
+			total_seconds = _duration(self.tracks)
+		self._total_seconds = total_seconds
+		self._refresh_visible(visible_seconds)
+		self.endResetModel()
+		self.totals_changed.emit()
+
+	def append(self, tracks: Sequence[Track], matches: Iterable[Track] = ()) -> None:
+		"""Add rows at the end; while filtered, only ``matches`` among them become visible."""
+		if not tracks:
+			return
+		start = len(self.tracks)
+		self._total_seconds += _duration(tracks)
+		if self._visible is None:
+			self.beginInsertRows(_ROOT, start, start + len(tracks) - 1)
+			self.tracks.extend(tracks)
+			self._positions = None
+			self.endInsertRows()
+			self.totals_changed.emit()
+			return
+
+		matched = set(matches)
+		if not self._filter_owned:
+			# Search results may be shared caches; extend a copy.
+			self._filter = set(self._filter)
+			self._filter_owned = True
+		self._filter |= matched
+		shown = [start + offset for offset, track in enumerate(tracks) if track in matched]
+		self.tracks.extend(tracks)
+		self._positions = None
+		if shown:
+			first = len(self._visible)
+			self.beginInsertRows(_ROOT, first, first + len(shown) - 1)
+			self._visible.extend(shown)
+			self._visible_seconds += _duration(self.tracks[idx] for idx in shown)
+			self.endInsertRows()
+		self.totals_changed.emit()
+
+	def sort_by(self, key: Callable[[Track], object]) -> None:
+		self.reset(sorted(self.tracks, key=key), self._total_seconds, self._visible_seconds)
+
+	def remove_rows(self, rows: Iterable[int]) -> None:
+		"""Remove rows, notifying views once per contiguous run rather than once per row."""
+		ordered = sorted(set(rows), reverse=True)
+		if not ordered:
+			return
+		removed = _duration(self.tracks[idx] for idx in ordered)
+		if self._visible is not None:
+			dropped = set(ordered)
+			hidden = _duration(self.tracks[idx] for idx in self._visible if idx in dropped)
+			self.reset(
+				(track for idx, track in enumerate(self.tracks) if idx not in dropped),
+				self._total_seconds - removed,
+				self._visible_seconds - hidden,
+			)
+			return
+		self._total_seconds -= removed
+		pos = 0
+		while pos < len(ordered):
+			last = first = ordered[pos]
+			pos += 1
+			while pos < len(ordered) and ordered[pos] == first - 1:
+				first = ordered[pos]
+				pos += 1
+			self.beginRemoveRows(_ROOT, first, last)
+			del self.tracks[first : last + 1]
+			self._positions = None
+			self.endRemoveRows()
+		self.totals_changed.emit()
+
+	def insert_sorted(self, tracks: Sequence[Track], key: Callable[[Track], object]) -> None:
+		"""Insert ``tracks`` into the already-sorted list, keeping it ordered by ``key``."""
+		if not tracks:
+			return
+		total = self._total_seconds + _duration(tracks)
+		if len(tracks) > BULK_INSERT_THRESHOLD or self._visible is not None:
+			self.reset(list(heapq.merge(self.tracks, sorted(tracks, key=key), key=key)), total)
+			return
+		for track in tracks:
+			pos = bisect.bisect_right(self.tracks, key(track), key=key)
+			self.beginInsertRows(_ROOT, pos, pos)
+			self.tracks.insert(pos, track)
+			self._positions = None
+			self.endInsertRows()
+		self._total_seconds = total
+		self.totals_changed.emit()
+
+
+__all__ = ["TrackTableModel", "BULK_INSERT_THRESHOLD"]
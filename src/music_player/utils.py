@@ -12,9 +12,19 @@ def _truncate(text: str, limit: int) -> str:
 def format_time(ms: int) -> str:
 	seconds = int((ms / 1000) % 60)
 	minutes = int((ms / (1000 * 60)) % 60)
+	hours = int(ms / (1000 * 60 * 60))
+	if hours:
+		return f"{hours}:{minutes:02d}:{seconds:02d}"
 	return f"{minutes:02d}:{seconds:02d}"
 
 
+def format_track_count(count: int, total: int) -> str:
+	noun = "track" if total == 1 else "tracks"
+	if count == total:
+		return f"{total:,} {noun}"
+	return f"{count:,} of {total:,} {noun}"
+
+
 def format_title_display(title: str) -> str:
 	return _truncate(title or "Unknown Title", TITLE_DISPLAY_LIMIT)
 
@@ -36,6 +46,7 @@ __all__ = [
 	"TITLE_DISPLAY_LIMIT",
 	"ARTIST_DISPLAY_LIMIT",
 	"format_time",
+	"format_track_count",
 	"format_title_display",
 	"format_artist_display",
 	"format_song_label",
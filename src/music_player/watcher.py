@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from .library import LibraryIndex, LibraryRow
+from .playlist_control import (
+	LYRICS_EXTS,
+	THUMBNAIL_EXTS,
+	ScannedFile,
+	Track,
+	build_song,
+	carry_over_row,
+	iter_audio_files,
+	read_index_row,
+)
+
+# File copies raise a burst of change events; wait for them to settle.
+WATCH_DEBOUNCE_MS = 400
+# A directory whose files could not be read is synced again this many times.
+WATCH_RETRY_LIMIT = 3
+_SIDECAR_EXTS = THUMBNAIL_EXTS + LYRICS_EXTS
+# Sidecars with these stems apply to every track in their directory.
+_SHARED_SIDECAR_STEMS = ("cover", "thumbnail")
+
+
+def _sidecar_names(names: Iterable[str]) -> Set[str]:
+	return {name for name in names if os.path.splitext(name)[1].lower() in _SIDECAR_EXTS}
+
+
+class LibraryWatcher(QObject):
+	"""Turns filesystem notifications into incremental library changes.
+
+	Only the directories that changed are re-listed, and only files that are new
+	or modified have their tags read. A file that disappears while another with
+	the same size and mtime appears is treated as a rename and keeps its row.
+	Adding or removing a cover or ``.lrc`` sidecar refreshes the tracks it
+	belongs to.
+	"""
+
+	# (added tracks, removed paths, [(old path, replacement track)])
+	changes_ready = Signal(list, list, list)
+
+	_synced = Signal(list, list, list, list, list, list, list)
+
+	def __init__(self, library: LibraryIndex, parent=None):
+		super().__init__(parent)
+		self.library = library
+		self._watcher = QFileSystemWatcher(self)
+		self._watcher.directoryChanged.connect(self._mark_dirty)
+		self._dirty: Set[str] = set()
+		self._debounce = QTimer(self)
+		self._debounce.setSingleShot(True)
+		self._debounce.setInterval(WATCH_DEBOUNCE_MS)
+		self._debounce.timeout.connect(self._dispatch)
+		self._retries: Dict[str, int] = {}
+		self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="music-watch")
+		# Sidecar names per watched directory; only touched on the worker thread.
+		self._sidecars: Dict[str, Set[str]] = {}
+		self._synced.connect(self._apply_synced)
+
+	def watch(self, directories: Iterable[Path]) -> None:
+		paths = [str(directory) for directory in directories]
+		watched = set(self._watcher.directories())
+		fresh = [path for path in paths if path not in watched]
+		if fresh:
+			self._watcher.addPaths(fresh)
+			try:
+				self._executor.submit(self._remember_sidecars, fresh)
+			except RuntimeError:
+				pass
+
+	def stop(self) -> None:
+		self._debounce.stop()
+		directories = self._watcher.directories()
+		if directories:
+			self._watcher.removePaths(directories)
+		self._executor.shutdown(wait=False, cancel_futures=True)
+
+	def _mark_dirty(self, path: str) -> None:
+		self._dirty.add(path)
+		self._debounce.start()
+
+	def _dispatch(self) -> None:
+		dirty, self._dirty = sorted(self._dirty), set()
+		watched = set(self._watcher.directories())
+		try:
+			self._executor.submit(self._sync, dirty, watched)
+		except RuntimeError:
+			pass
+
+	def _apply_synced(self, dirty, added, removed, updated, new_dirs, gone_dirs, failed) -> None:
+		if gone_dirs:
+			self._watcher.removePaths(gone_dirs)
+		if new_dirs:
+			self.watch(new_dirs)
+		for directory in dirty:
+			if directory not in failed:
+				self._retries.pop(directory, None)
+		for directory in failed:
+			attempts = self._retries.get(directory, 0) + 1
+			if attempts > WATCH_RETRY_LIMIT:
+				print(f"Error syncing {directory}: giving up after {WATCH_RETRY_LIMIT} retries")
+				self._retries.pop(directory, None)
+				continue
+			self._retries[directory] = attempts
+			self._mark_dirty(directory)
+		if added or removed or updated:
+			self.changes_ready.emit(added, removed, updated)
+
+	def _remember_sidecars(self, directories: List[str]) -> None:
+		for directory in directories:
+			try:
+				self._sidecars[directory] = _sidecar_names(os.listdir(directory))
+			except OSError:
+				pass
+
+	def _sync(self, dirty: List[str], watched: Set[str]) -> None:
+		try:
+			self._synced.emit(dirty, *self._diff(dirty, watched))
+		except Exception as e:
+			print(f"Error applying library changes: {e}")
+			# Nothing was applied; sync the same directories again.
+			self._synced.emit(dirty, [], [], [], [], [], dirty)
+
+	def _diff(self, dirty: List[str], watched: Set[str]):
+		missing: Dict[str, LibraryRow] = {}
+		appeared: List[ScannedFile] = []
+		modified: List[Tuple[ScannedFile, LibraryRow]] = []
+		# Unchanged files whose cover or lyrics sidecar came or went.
+		restyled: List[Tuple[ScannedFile, LibraryRow]] = []
+		new_dirs: List[Path] = []
+		gone_dirs: List[str] = []
+
+		for directory in dirty:
+			indexed = self.library.rows_under(directory)
+			if not os.path.isdir(directory):
+				missing.update(indexed)
+				gone = [path for path in watched if path == directory or path.startswith(directory + os.sep)]
+				gone_dirs.extend(gone)
+				for path in gone:
+					self._sidecars.pop(path, None)
+				continue
+
+			direct = {path: row for path, row in indexed.items() if os.path.dirname(path) == directory}
+			found: List[ScannedFile] = list(iter_audio_files(Path(directory), recursive=False))
+			try:
+				with os.scandir(directory) as it:
+					entries = list(it)
+			except OSError:
+				entries = []
+			subdirs = [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+			sidecars = _sidecar_names(entry.name for entry in entries)
+			previous = self._sidecars.get(directory)
+			self._sidecars[directory] = sidecars
+			changed_stems = (
+				{os.path.splitext(name)[0] for name in sidecars ^ previous} if previous is not None else set()
+			)
+			refresh_all = any(stem.casefold() in _SHARED_SIDECAR_STEMS for stem in changed_stems)
+			local = len(found)
+			for subdir in subdirs:
+				if subdir not in watched:
+					found.extend(iter_audio_files(Path(subdir), directories=new_dirs))
+
+			seen = set()
+			for position, scanned in enumerate(found):
+				key = str(scanned.path)
+				seen.add(key)
+				row = indexed.get(key)
+				if row is None:
+					appeared.append(scanned)
+				elif row["size"] != scanned.stat.st_size or row["mtime_ns"] != scanned.stat.st_mtime_ns:
+					modified.append((scanned, row))
+				elif position < local and (refresh_all or scanned.path.stem in changed_stems):
+					restyled.append((scanned, row))
+			missing.update((path, row) for path, row in direct.items() if path not in seen)
+
+		# Pair vanished files with identical newcomers so renames skip the tag read.
+		by_identity = {(row["size"], row["mtime_ns"]): path for path, row in missing.items()}
+		added: List[Track] = []
+		updated: List[Tuple[str, Track]] = []
+		rows: List[LibraryRow] = []
+		failed: Set[str] = set()
+
+		def read_row(scanned: ScannedFile) -> Optional[LibraryRow]:
+			# One unreadable file must not cost the rest of the batch; its directory is synced again.
+			try:
+				return read_index_row(scanned.path, scanned.stat)
+			except Exception as e:
+				print(f"Error reading tags for {scanned.path}: {e}")
+				failed.add(str(scanned.path.parent))
+				return None
+
+		for scanned in appeared:
+			old_path = by_identity.pop((scanned.stat.st_size, scanned.stat.st_mtime_ns), None)
+			if old_path is not None:
+				row = dict(missing.pop(old_path), path=str(scanned.path))
+				track = build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path)
+				updated.append((old_path, track))
+			else:
+				row = read_row(scanned)
+				if row is None:
+					continue
+				added.append(build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path))
+			rows.append(row)
+		for scanned, previous in modified:
+			row = read_row(scanned)
+			if row is None:
+				continue
+			row = carry_over_row(row, previous)
+			track = build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path)
+			updated.append((str(scanned.path), track))
+			rows.append(row)
+		for scanned, row in restyled:
+			# Sidecars are not indexed, so the stored row is rebuilt without a tag read.
+			updated.append((str(scanned.path), build_song(scanned.path, row, scanned.thumbnail_path, scanned.lyrics_path)))
+
+		removed = list(missing)
+		self.library.remove_many(removed + [old for old, track in updated if old != track.path])
+		self.library.upsert_many(rows)
+		return added, removed, updated, new_dirs, gone_dirs, sorted(failed)
+
+
+__all__ = ["LibraryWatcher", "WATCH_DEBOUNCE_MS", "WATCH_RETRY_LIMIT"]
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+from PySide6.QtCore import QRect, QRectF, Qt
+from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QAbstractSlider, QSlider
+
+from .styles import WAVEFORM_COLORS
+
+WAVEFORM_BUCKETS = 400
+# Frames reduced at a time while decoding; the bucket count is fixed at the end.
+_CHUNK_FRAMES = 1024
+
+
+class EnvelopeBuilder:
+	"""Peak/RMS envelope of interleaved float samples fed in arbitrary chunks."""
+
+	def __init__(self, channels: int, buckets: int = WAVEFORM_BUCKETS):
+		self.channels = channels
+		self.buckets = buckets
+		self._pending = np.empty(0, dtype=np.float32)
+		self._peaks: List[np.ndarray] = []
+		self._squares: List[np.ndarray] = []
+
+	def feed(self, samples: np.ndarray) -> None:
+		# Fold channels together; the waveform only shows overall level.
+		mono = np.abs(samples.reshape(-1, self.channels)).max(axis=1)
+		if len(self._pending):
+			mono = np.concatenate((self._pending, mono))
+		chunks = len(mono) // _CHUNK_FRAMES
+		self._pending = mono[chunks * _CHUNK_FRAMES :].copy()
+		if chunks:
+			blocks = mono[: chunks * _CHUNK_FRAMES].reshape(chunks, _CHUNK_FRAMES)
+			self._peaks.append(blocks.max(axis=1))
+			self._squares.append(np.square(blocks, dtype=np.float64).mean(axis=1))
+
+	def result(self) -> Optional[bytes]:
+		"""Quantized envelope: ``buckets`` peak bytes followed by ``buckets`` RMS bytes."""
+		if len(self._pending):
+			self._peaks.append(self._pending.max(keepdims=True))
+			self._squares.append(np.square(self._pending, dtype=np.float64).mean(keepdims=True))
+			self._pending = self._pending[:0]
+		if not self._peaks:
+			return None
+		peaks = np.concatenate(self._peaks)
+		squares = np.concatenate(self._squares)
+		edges = np.linspace(0, len(peaks), self.buckets + 1).astype(np.intp)
+		starts = np.minimum(edges[:-1], len(peaks) - 1)
+		counts = np.maximum(edges[1:] - edges[:-1], 1)
+		bucket_peaks = np.maximum.reduceat(peaks, starts)
+		bucket_rms = np.sqrt(np.add.reduceat(squares, starts) / counts)
+		levels = np.concatenate((bucket_peaks, bucket_rms))
+		return (np.clip(levels, 0.0, 1.0) * 255).astype(np.uint8).tobytes()
+
+
+def decode_envelope(data: Optional[bytes]) -> Optional[tuple[np.ndarray, np.ndarray]]:
+	if not data or len(data) % 2:
+		return None
+	levels = np.frombuffer(data, dtype=np.uint8).astype(np.float32) / 255.0
+	half = len(levels) // 2
+	return levels[:half], levels[half:]
+
+
+class WaveformSlider(QSlider):
+	"""Seek slider that draws the track's envelope instead of a plain groove.
+
+	The waveform is rendered into two pixmaps (unplayed and played) whenever
+	the envelope or size changes; moving the playhead only blits the strip
+	between the old and new positions.
+	"""
+
+	def __init__(self, orientation=Qt.Orientation.Horizontal, parent=None):
+		super().__init__(orientation, parent)
+		self._envelope: Optional[tuple[np.ndarray, np.ndarray]] = None
+		self._pixmaps: Optional[tuple[QPixmap, QPixmap]] = None
+		self._playhead_x = 0
+
+	def set_envelope(self, data: Optional[bytes]) -> None:
+		self._envelope = decode_envelope(data)
+		self._pixmaps = None
+		self.update()
+
+	def resizeEvent(self, event):
+		self._pixmaps = None
+		super().resizeEvent(event)
+
+	def sliderChange(self, change):
+		if change != QAbstractSlider.SliderChange.SliderValueChange or self._envelope is None:
+			self._playhead_x = self._value_to_x(self.value())
+			super().sliderChange(change)
+			return
+		x = self._value_to_x(self.value())
+		if x != self._playhead_x:
+			left, right = sorted((x, self._playhead_x))
+			self._playhead_x = x
+			# Repaint just the strip the playhead crossed, plus the line itself.
+			self.update(QRect(left - 2, 0, right - left + 4, self.height()))
+
+	def mousePressEvent(self, event):
+		if self._envelope is None or event.button() != Qt.MouseButton.LeftButton:
+			super().mousePressEvent(event)
+			return
+		self._seek_to(event.position().x())
+		self.setSliderDown(True)
+
+	def mouseMoveEvent(self, event):
+		if self._envelope is None or not self.isSliderDown():
+			super().mouseMoveEvent(event)
+			return
+		self._seek_to(event.position().x())
+
+	def mouseReleaseEvent(self, event):
+		if self._envelope is None or not self.isSliderDown():
+			super().mouseReleaseEvent(event)
+			return
+		self.setSliderDown(False)
+
+	def _seek_to(self, x: float) -> None:
+		area = self._wave_rect()
+		if area.width() <= 0:
+			return
+		ratio = min(1.0, max(0.0, (x - area.left()) / area.width()))
+		value = self.minimum() + round(ratio * (self.maximum() - self.minimum()))
+		self.setSliderPosition(value)
+		self.sliderMoved.emit(value)
+
+	def _wave_rect(self) -> QRect:
+		return self.rect().adjusted(3, 3, -3, -3)
+
+	def _value_to_x(self, value: int) -> int:
+		area = self._wave_rect()
+		span = self.maximum() - self.minimum()
+		if span <= 0:
+			return area.left()
+		return area.left() + round((value - self.minimum()) / span * area.width())
+
+	def _render(self) -> tuple[QPixmap, QPixmap]:
+		ratio = self.devicePixelRatioF()
+		pixmaps = []
+		for peak_key, rms_key in (("peak", "rms"), ("played_peak", "played_rms")):
+			pixmap = QPixmap(self.size() * ratio)
+			pixmap.setDevicePixelRatio(ratio)
+			pixmap.fill(QColor(WAVEFORM_COLORS["background"]))
+			painter = QPainter(pixmap)
+			area = QRectF(self._wave_rect())
+			peaks, rms = self._envelope
+			width = area.width() / len(peaks)
+			mid = area.center().y()
+			half = area.height() / 2
+			for levels, key in ((peaks, peak_key), (rms, rms_key)):
+				color = QColor(WAVEFORM_COLORS[key])
+				for idx, level in enumerate(levels):
+					height = max(1.0, float(level) * half)
+					painter.fillRect(QRectF(area.left() + idx * width, mid - height, width, height * 2), color)
+			painter.setPen(QPen(QColor(WAVEFORM_COLORS["border"]), 3))
+			painter.drawRect(QRectF(self.rect()).adjusted(1.5, 1.5, -1.5, -1.5))
+			painter.end()
+			pixmaps.append(pixmap)
+		return pixmaps[0], pixmaps[1]
+
+	def paintEvent(self, event):
+		if self._envelope is None:
+			super().paintEvent(event)
+			return
+		if self._pixmaps is None:
+			self._pixmaps = self._render()
+			self._playhead_x = self._value_to_x(self.value())
+		base, played = self._pixmaps
+		painter = QPainter(self)
+		dirty = event.rect()
+		painter.drawPixmap(QRectF(dirty), base, self._source_rect(base, dirty))
+		played_part = dirty.intersected(QRect(0, 0, self._playhead_x, self.height()))
+		if not played_part.isEmpty():
+			painter.drawPixmap(QRectF(played_part), played, self._source_rect(played, played_part))
+		painter.fillRect(QRect(self._playhead_x - 1, 0, 2, self.height()), QColor(WAVEFORM_COLORS["playhead"]))
+		painter.end()
+
+	@staticmethod
+	def _source_rect(pixmap: QPixmap, rect: QRect) -> QRectF:
+		ratio = pixmap.devicePixelRatio()
+		return QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+
+
+__all__ = ["EnvelopeBuilder", "WaveformSlider", "WAVEFORM_BUCKETS", "decode_envelope"]
@@ -1,65 +1,46 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, List, Mapping, Union
 
 from PySide6.QtGui import QPixmap
 
-SpriteMap = Dict[str, QPixmap | List[QPixmap]]
+from ..sprites import shared_sprites
 
+SpriteMap = Mapping[str, QPixmap | List[QPixmap]]
+# A fixed device pixel ratio, or a callable such as ``widget.devicePixelRatioF``.
+PixelRatio = Union[float, Callable[[], float]]
 
-def _safe_pixmap(path: Path) -> Optional[QPixmap]:
-	if not path.exists():
-		return None
-	return QPixmap(str(path))
+TOMATO_SPRITES = {
+	"neutral": "tomato-neutral.png",
+	"ticking": ["tomato-ticking-1.png", "tomato-ticking-2.png"],
+	"vibrate": "tomato-vibrate.png",
+}
+FOX_ICONS = {
+	"empty": "fox-hourglass-empty.png",
+	"half_top": "fox-hourglass-half-top.png",
+	"half_bottom": "fox-hourglass-half-bottom.png",
+}
+_LEGACY_TICK = "tomato-ticking.png"
 
 
-def load_tomato_sprites(image_dir: Path) -> SpriteMap:
-	"""Load tomato sprites if they exist on disk."""
+def load_tomato_sprites(image_dir: Path, size: int | None = None, dpr: PixelRatio = 1.0) -> SpriteMap:
+	"""Tomato sprites that exist on disk, decoded on first use and fitted into ``size``."""
 
-	sprite_map = {
-		"neutral": "tomato-neutral.png",
-		"ticking": ["tomato-ticking-1.png", "tomato-ticking-2.png"],
-		"vibrate": "tomato-vibrate.png",
-	}
+	directory = image_dir / "pomodoro"
+	sprite_map = dict(TOMATO_SPRITES)
+	ticking = sprite_map["ticking"]
+	if not any((directory / fname).exists() for fname in ticking) and (directory / _LEGACY_TICK).exists():
+		sprite_map["ticking"] = [_LEGACY_TICK, _LEGACY_TICK]
 
-	sprites: SpriteMap = {}
-	for key, filename in sprite_map.items():
-		if isinstance(filename, list):
-			frames: List[QPixmap] = []
-			for fname in filename:
-				pix = _safe_pixmap(image_dir / "pomodoro" / fname)
-				if pix:
-					frames.append(pix)
-			if frames:
-				sprites[key] = frames
-		else:
-			pix = _safe_pixmap(image_dir / "pomodoro" / filename)
-			if pix:
-				sprites[key] = pix
+	sprites = shared_sprites()
+	sprites.define("tomato", directory, sprite_map)
+	return sprites.view("tomato", dpr, size)
 
-	legacy_tick = image_dir / "pomodoro" / "tomato-ticking.png"
-	if legacy_tick.exists() and "ticking" not in sprites:
-		pix = _safe_pixmap(legacy_tick)
-		if pix:
-			sprites["ticking"] = [pix, pix]
 
-	return sprites
+def load_fox_icons(image_dir: Path, size: int | None = None, dpr: PixelRatio = 1.0) -> SpriteMap:
+	"""Fox hourglass icons if available, decoded on first use and fitted into ``size``."""
 
-
-def load_fox_icons(image_dir: Path) -> SpriteMap:
-	"""Load fox hourglass icons if available."""
-
-	icon_map = {
-		"empty": "fox-hourglass-empty.png",
-		"half_top": "fox-hourglass-half-top.png",
-		"half_bottom": "fox-hourglass-half-bottom.png",
-	}
-
-	icons: SpriteMap = {}
-	for key, filename in icon_map.items():
-		pix = _safe_pixmap(image_dir / "pomodoro" / filename)
-		if pix:
-			icons[key] = pix
-
-	return icons
+	sprites = shared_sprites()
+	sprites.define("hourglass", image_dir / "pomodoro", FOX_ICONS)
+	return sprites.view("hourglass", dpr, size)
@@ -4,7 +4,6 @@ from typing import Dict, List
 
 from PySide6.QtCore import QPoint, QTimer, Qt, QUrl
 from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
 from PySide6.QtWidgets import (QComboBox, QDialog,
 							   QFrame, QHBoxLayout,
 							   QLabel, QPushButton,
@@ -12,7 +11,7 @@ from PySide6.QtWidgets import (QComboBox, QDialog,
 							   QWidget, QSystemTrayIcon)
 
 from ..constants import IMAGE_DIR, LOGO_ICON, SFX_DIR
-from .assets import load_fox_icons, load_tomato_sprites
+from .assets import SpriteMap, load_fox_icons, load_tomato_sprites
 from .themes import DEFAULT_THEME, THEMES as THEME_MAP, build_stylesheet, resolve_theme
 from .utils import can_reset_timer, clamp_duration_minutes, seconds_to_clock
 
@@ -21,8 +20,8 @@ ALERT_PATH = SFX_DIR / "pomodoro" / "pomodoro-alert.mp3"
 class PomodoroWindow(QWidget):
 	THEMES = THEME_MAP
 
-	tomato_sprites: dict[str, QPixmap | list[QPixmap]]
-	fox_icons: dict[str, QPixmap | list[QPixmap]]
+	tomato_sprites: SpriteMap
+	fox_icons: SpriteMap
 
 	def __init__(self, parent=None, tray_icon=None):
 		super().__init__(parent)
@@ -40,23 +39,19 @@ class PomodoroWindow(QWidget):
 		self.remaining_seconds = self.total_seconds
 		self.is_running = False
 		self.alert_dialog = None
-		self.fox_icons = load_fox_icons(IMAGE_DIR)
+		self.fox_icons = load_fox_icons(IMAGE_DIR, 40, self.devicePixelRatioF)
 		self.fox_icon_frame_top = True
 
 		self.timer = QTimer(self)
 		self.timer.setInterval(1000)
 		self.timer.timeout.connect(self._tick)
 
-		self.tomato_sprites = load_tomato_sprites(IMAGE_DIR)
+		self.tomato_sprites = load_tomato_sprites(IMAGE_DIR, 250, self.devicePixelRatioF)
 		self.tray_icon = tray_icon if tray_icon is not None else self._init_tray_icon()
 
-		self.alert_player = QMediaPlayer(self)
-		self.alert_audio = QAudioOutput(self)
-		self.alert_player.setAudioOutput(self.alert_audio)
-		try:
-			self.alert_player.setLoops(QMediaPlayer.Loops.Infinite)
-		except Exception:
-			pass
+		# Created on the first alert so an idle timer does not start the media backend.
+		self.alert_player = None
+		self.alert_audio = None
 
 		self._setup_ui()
 		self.theme_box.blockSignals(True)
@@ -189,14 +184,7 @@ class PomodoroWindow(QWidget):
 			pix = None
 
 		if pix is not None and self.fox_icon_label:
-			self.fox_icon_label.setPixmap(
-				pix.scaled(
-					40,
-					40,
-					Qt.AspectRatioMode.KeepAspectRatio,
-					Qt.TransformationMode.FastTransformation,
-				)
-			)
+			self.fox_icon_label.setPixmap(pix)
 		elif self.fox_icon_label:
 			self.fox_icon_label.clear()
 
@@ -219,14 +207,7 @@ class PomodoroWindow(QWidget):
 			pix = None
 
 		if pix is not None:
-			self.tomato_label.setPixmap(
-				pix.scaled(
-					250,
-					250,
-					Qt.AspectRatioMode.KeepAspectRatio,
-					Qt.TransformationMode.FastTransformation,
-				)
-			)
+			self.tomato_label.setPixmap(pix)
 		else:
 			self.tomato_label.clear()
 
@@ -334,6 +315,17 @@ class PomodoroWindow(QWidget):
 		alert_path = ALERT_PATH
 		if not alert_path.exists():
 			return
+		if self.alert_player is None:
+			# Imported on the first alert so start-up never loads QtMultimedia.
+			from PySide6.QtMultimedia import QAudioOutput, QMediaPlayer
+
+			self.alert_player = QMediaPlayer(self)
+			self.alert_audio = QAudioOutput(self)
+			self.alert_player.setAudioOutput(self.alert_audio)
+			try:
+				self.alert_player.setLoops(QMediaPlayer.Loops.Infinite)
+			except Exception:
+				pass
 		try:
 			self.alert_player.setSource(QUrl.fromLocalFile(str(alert_path)))
 			self.alert_audio.setVolume(1.0)
@@ -342,6 +334,8 @@ class PomodoroWindow(QWidget):
 			pass
 
 	def _stop_alert_sound(self):
+		if self.alert_player is None:
+			return
 		try:
 			self.alert_player.stop()
 		except Exception:
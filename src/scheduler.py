@@ -0,0 +1,139 @@
+### Scheduler ###
+'''
+One timer for all of the pet's timing
+'''
+
+import heapq
+import itertools
+import time
+from PySide6.QtCore import QObject, Qt, QTimer
+
+# Jobs due this close together run in the same wakeup.
+COALESCE_MS = 15
+
+
+class ScheduledJob:
+    __slots__ = ('key', 'callback', 'interval', 'deadline', 'active')
+
+    def __init__(self, key, callback, interval, deadline):
+        self.key = key
+        self.callback = callback
+        # Milliseconds between runs for repeating jobs, None for one-shots.
+        self.interval = interval
+        self.deadline = deadline
+        self.active = True
+
+
+class FrameScheduler(QObject):
+    """
+    Deadline queue behind a single coarse QTimer.
+
+    The timer sleeps until the earliest deadline, then runs every job due
+    within ``COALESCE_MS`` of it, so animation frames, walk decisions and
+    state changes share wakeups instead of each arming a timer of its own.
+    Keyed jobs behave like restarted QTimers: scheduling a key again
+    replaces its pending run. ``set_throttle`` stretches every delay, e.g.
+    while the pet is hidden.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._run_due)
+        self._heap = []
+        self._jobs = {}
+        self._order = itertools.count()
+        self._armed_for = None
+        self._throttle = 1.0
+        self.wakeups = 0
+        self.runs = 0
+
+    def call_later(self, delay_ms, callback, key=None):
+        """Run ``callback`` once after ``delay_ms``; a keyed call replaces the pending one."""
+        return self._schedule(key, callback, None, delay_ms)
+
+    def call_every(self, interval_ms, callback, key):
+        """Run ``callback`` every ``interval_ms``, first after one interval; restarts a running ``key``."""
+        return self._schedule(key, callback, interval_ms, interval_ms)
+
+    def cancel(self, key):
+        job = self._jobs.pop(key, None)
+        if job is not None:
+            job.active = False
+
+    def is_active(self, key):
+        return key in self._jobs
+
+    def set_throttle(self, factor):
+        """Stretch delays scheduled from now on, and the next run of repeating jobs, by ``factor``."""
+        self._throttle = max(1.0, factor)
+
+    def stats(self):
+        live = sum(1 for _, _, job in self._heap if job.active)
+        return {"wakeups": self.wakeups, "runs": self.runs, "pending": live, "throttle": self._throttle}
+
+    def _now(self):
+        return time.monotonic() * 1000.0
+
+    def _schedule(self, key, callback, interval, delay_ms):
+        if key is not None:
+            self.cancel(key)
+        job = ScheduledJob(key, callback, interval, self._now() + max(0, delay_ms) * self._throttle)
+        if key is not None:
+            self._jobs[key] = job
+        self._push(job)
+        self._arm()
+        return job
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.deadline, next(self._order), job))
+        # Replaced and cancelled jobs are dropped lazily; compact once they dominate.
+        if len(self._heap) > 64 and len(self._heap) > 4 * (len(self._jobs) + 8):
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+
+    def _arm(self):
+        while self._heap and not self._heap[0][2].active:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._timer.stop()
+            self._armed_for = None
+            return
+        deadline = self._heap[0][0]
+        if self._armed_for == deadline and self._timer.isActive():
+            return
+        self._armed_for = deadline
+        self._timer.start(max(0, round(deadline - self._now())))
+
+    def _run_due(self):
+        self.wakeups += 1
+        self._armed_for = None
+        horizon = self._now() + COALESCE_MS
+        due = []
+        while self._heap and self._heap[0][0] <= horizon:
+            job = heapq.heappop(self._heap)[2]
+            if job.active:
+                due.append(job)
+        for job in due:
+            if job.interval is not None:
+                job.deadline = self._now() + job.interval * self._throttle
+                self._push(job)
+        # Arm before any callback runs: a callback that spins a nested event
+        # loop, e.g. a modal dialog, must not stall every other job.
+        self._arm()
+        for job in due:
+            # A job run earlier in this batch may have cancelled or replaced it.
+            if not job.active:
+                continue
+            if job.interval is None:
+                job.active = False
+                if job.key is not None:
+                    self._jobs.pop(job.key, None)
+            self.runs += 1
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"Error in scheduled task: {e}")
+        self._arm()
@@ -0,0 +1,225 @@
+### Sprites ###
+'''
+Shared sprite atlases for the pet and its windows
+'''
+
+import os
+from collections.abc import Mapping
+from PySide6.QtCore import QRect, QSize, Qt
+from PySide6.QtGui import QImage, QPainter, QPixmap, QTransform
+
+# Atlas rows wrap at this width in pixels.
+ATLAS_WIDTH = 1024
+# Screens at or above this device pixel ratio use ``@2x`` files when present.
+HIDPI_RATIO = 1.5
+
+
+class _Frame:
+    __slots__ = ('file', 'mirrored')
+
+    def __init__(self, file, mirrored=False):
+        self.file = file
+        self.mirrored = mirrored
+
+
+class SpriteGroup:
+    """Files of one sprite group, packed into a single atlas image the first time a frame is used."""
+
+    def __init__(self, directory, sprites, mirrors=None):
+        try:
+            names = set(os.listdir(directory))
+        except OSError:
+            names = set()
+        self.directory = directory
+        # Sprites defined as one file are handed out as a pixmap, lists as frame lists.
+        self.single = {}
+        self.frames = {}
+        for name, files in sprites.items():
+            found = [_Frame(f) for f in ([files] if isinstance(files, str) else files) if f in names]
+            if found:
+                self.frames[name] = found
+                self.single[name] = isinstance(files, str)
+        # Missing directions are mirrored from their counterpart, e.g. left from right.
+        for name, source in (mirrors or {}).items():
+            if name not in self.frames and source in self.frames:
+                self.frames[name] = [_Frame(frame.file, not frame.mirrored) for frame in self.frames[source]]
+                self.single[name] = self.single[source]
+        files = {frame.file for frames in self.frames.values() for frame in frames}
+        self.hidpi_files = {f: _hidpi_name(f) for f in files if _hidpi_name(f) in names}
+        # Atlas image and frame rectangles per source scale (1 or 2).
+        self.atlases = {}
+
+    def atlas(self, scale):
+        if scale not in self.atlases:
+            if scale == 2:
+                files = {f: self.directory / name for f, name in self.hidpi_files.items()}
+            else:
+                files = {frame.file: self.directory / frame.file for frames in self.frames.values() for frame in frames}
+            self.atlases[scale] = _pack(files)
+        return self.atlases[scale]
+
+    def source(self, frame, dpr):
+        """Frame image at the best available scale, and that scale."""
+        scale = 2 if dpr >= HIDPI_RATIO and frame.file in self.hidpi_files else 1
+        image, rects = self.atlas(scale)
+        rect = rects.get(frame.file)
+        if rect is None:
+            return QImage(), scale
+        cut = image.copy(rect)
+        if frame.mirrored:
+            cut = cut.transformed(QTransform().scale(-1, 1))
+        return cut, scale
+
+
+def _hidpi_name(file):
+    stem, ext = os.path.splitext(file)
+    return f"{stem}@2x{ext}"
+
+
+def _pack(files):
+    """Decode ``files`` and lay them out in rows of one atlas image."""
+    images = {}
+    for key, path in files.items():
+        image = QImage(str(path))
+        if image.isNull():
+            print(f"Error loading sprite: {path}")
+            continue
+        images[key] = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+    rects = {}
+    x = y = row_height = width = 0
+    for key, image in sorted(images.items(), key=lambda item: -item[1].height()):
+        if x and x + image.width() > ATLAS_WIDTH:
+            x, y, row_height = 0, y + row_height, 0
+        rects[key] = QRect(x, y, image.width(), image.height())
+        x += image.width()
+        width = max(width, x)
+        row_height = max(row_height, image.height())
+    atlas = QImage(max(1, width), max(1, y + row_height), QImage.Format.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(atlas)
+    for key, rect in rects.items():
+        painter.drawImage(rect.topLeft(), images[key])
+    painter.end()
+    return atlas, rects
+
+
+def _dpr_key(dpr):
+    return round(dpr * 4) / 4
+
+
+class SpriteManager:
+    """
+    Lazily decoded sprite atlases with mirrored and HiDPI variants.
+
+    Defining a group only lists its directory. The first request decodes
+    every file of the group into one atlas; frames are cut from it and
+    scaled for the requested device pixel ratio and size, and each variant
+    is cached, so a pet moving between screens keeps both sets.
+    """
+
+    def __init__(self):
+        self.groups = {}
+        self.variants = {}
+
+    def define(self, group, directory, sprites, mirrors=None):
+        if group not in self.groups:
+            self.groups[group] = SpriteGroup(directory, sprites, mirrors)
+
+    def names(self, group):
+        return list(self.groups[group].frames)
+
+    def is_single(self, group, name):
+        return self.groups[group].single[name]
+
+    def frames(self, group, name, dpr=1.0, size=None):
+        """Pixmaps of ``name`` for screens at ``dpr``, optionally fitted into ``size`` x ``size`` logical pixels."""
+        key = (group, name, _dpr_key(dpr), size)
+        pixmaps = self.variants.get(key)
+        if pixmaps is None:
+            sprite_group = self.groups[group]
+            pixmaps = [self._render(sprite_group, frame, key[2], size) for frame in sprite_group.frames[name]]
+            self.variants[key] = pixmaps
+        return pixmaps
+
+    def _render(self, sprite_group, frame, dpr, size):
+        image, scale = sprite_group.source(frame, dpr)
+        if image.isNull():
+            return QPixmap()
+        logical = QSize(image.width() // scale, image.height() // scale)
+        if size is not None:
+            logical = logical.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio)
+        target = logical * dpr
+        if target != image.size():
+            # Pixel art: nearest-neighbour keeps the edges crisp.
+            image = image.scaled(
+                target,
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.FastTransformation,
+            )
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        return pixmap
+
+    def view(self, group, dpr=1.0, size=None):
+        return SpriteView(self, group, dpr, size)
+
+    def release(self, group=None):
+        """Drop cached variants, and the decoded atlases of ``group`` or of every group."""
+        groups = [group] if group is not None else list(self.groups)
+        self.variants = {key: value for key, value in self.variants.items() if key[0] not in groups}
+        for name in groups:
+            self.groups[name].atlases.clear()
+
+    def footprint(self):
+        """Decoded pixel memory in bytes, for profiling."""
+        atlas_bytes = sum(
+            image.sizeInBytes() for group in self.groups.values() for image, _ in group.atlases.values()
+        )
+        pixmaps = [pixmap for pixmaps in self.variants.values() for pixmap in pixmaps]
+        variant_bytes = sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps)
+        return {
+            "atlases": sum(len(group.atlases) for group in self.groups.values()),
+            "atlas_bytes": atlas_bytes,
+            "variants": len(pixmaps),
+            "variant_bytes": variant_bytes,
+            "total_bytes": atlas_bytes + variant_bytes,
+        }
+
+
+class SpriteView(Mapping):
+    """
+    Read-only ``name -> pixmap or [pixmaps]`` mapping over one group.
+
+    ``dpr`` may be a callable such as ``widget.devicePixelRatioF``, so the
+    variant for the widget's current screen is picked on every lookup.
+    """
+
+    def __init__(self, manager, group, dpr=1.0, size=None):
+        self.manager = manager
+        self.group = group
+        self.dpr = dpr
+        self.size = size
+
+    def __getitem__(self, name):
+        if name not in self.manager.groups[self.group].frames:
+            raise KeyError(name)
+        dpr = self.dpr() if callable(self.dpr) else self.dpr
+        frames = self.manager.frames(self.group, name, dpr, self.size)
+        return frames[0] if self.manager.is_single(self.group, name) else frames
+
+    def __iter__(self):
+        return iter(self.manager.names(self.group))
+
+    def __len__(self):
+        return len(self.manager.groups[self.group].frames)
+
+
+_shared = None
+
+
+def shared_sprites():
+    """The process-wide manager, so windows reuse each other's decoded atlases."""
+    global _shared
+    if _shared is None:
+        _shared = SpriteManager()
+    return _shared
@@ -0,0 +1,117 @@
+### State Machine ###
+'''
+Declared states, transitions and state-owned timers for the pet
+'''
+
+import itertools
+import time
+from collections import Counter
+
+
+class State:
+    __slots__ = ('name', 'targets', 'enter', 'exit')
+
+    def __init__(self, name, targets=(), enter=None, exit=None):
+        self.name = name
+        self.targets = frozenset(targets)
+        self.enter = enter
+        self.exit = exit
+
+
+class StateMachine:
+    """
+    Table-driven state machine on top of a ``FrameScheduler``.
+
+    Each state declares the states it may move to and optional enter/exit
+    hooks; any other transition is refused. Timers scheduled through the
+    machine belong to the current state, or to the states named in
+    ``within``, and are cancelled as soon as the machine leaves them, so a
+    step queued by one state can never fire in another. Time spent in each
+    state and transition counts are recorded for ``stats()``.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.states = {}
+        self.state = None
+        self._entered_at = 0.0
+        # Scheduler key -> states that keep the job alive.
+        self._owned = {}
+        self._ids = itertools.count()
+        # Seconds spent in each state over finished visits.
+        self.time_in_state = Counter()
+        self.entries = Counter()
+        self.transitions = Counter()
+        self.refused = Counter()
+
+    def add_state(self, name, targets=(), enter=None, exit=None):
+        self.states[name] = State(name, targets, enter, exit)
+
+    def start(self, name):
+        """Enter the initial state ``name`` without a transition."""
+        self._switch(name)
+
+    def can(self, target):
+        return self.state is not None and target in self.states[self.state].targets
+
+    def transition(self, target):
+        """Move to ``target`` if the current state allows it; returns whether it did."""
+        if not self.can(target):
+            self.refused[(self.state, target)] += 1
+            return False
+        exit_hook = self.states[self.state].exit
+        if exit_hook:
+            exit_hook()
+        self.transitions[(self.state, target)] += 1
+        self._switch(target)
+        return True
+
+    def after(self, delay_ms, callback, key=None, within=None):
+        """Run ``callback`` once after ``delay_ms`` unless the machine leaves ``within`` (default: the current state) first."""
+        key = self._own(key, within)
+        return self.scheduler.call_later(delay_ms, callback, key)
+
+    def every(self, interval_ms, callback, key, within=None):
+        """Run ``callback`` every ``interval_ms`` until the machine leaves ``within`` (default: the current state)."""
+        key = self._own(key, within)
+        return self.scheduler.call_every(interval_ms, callback, key)
+
+    def cancel(self, key):
+        self._owned.pop(key, None)
+        self.scheduler.cancel(key)
+
+    def is_pending(self, key):
+        return key in self._owned and self.scheduler.is_active(key)
+
+    def stats(self):
+        """Seconds spent per state (including the current visit), entries and transition counts."""
+        seconds = Counter(self.time_in_state)
+        if self.state is not None:
+            seconds[self.state] += time.monotonic() - self._entered_at
+        return {
+            "state": self.state,
+            "seconds": {name: round(value, 3) for name, value in seconds.items()},
+            "entries": dict(self.entries),
+            "transitions": {f"{a}->{b}": n for (a, b), n in self.transitions.items()},
+            "refused": {f"{a}->{b}": n for (a, b), n in self.refused.items()},
+        }
+
+    def _own(self, key, within):
+        if key is None:
+            key = f"{self.state}#{next(self._ids)}"
+        self._owned[key] = frozenset(within) if within is not None else frozenset((self.state,))
+        return key
+
+    def _switch(self, name):
+        state = self.states[name]
+        now = time.monotonic()
+        if self.state is not None:
+            self.time_in_state[self.state] += now - self._entered_at
+        self.state = name
+        self._entered_at = now
+        self.entries[name] += 1
+        for key, within in list(self._owned.items()):
+            if name not in within or not self.scheduler.is_active(key):
+                self.cancel(key)
+        if state.enter:
+            state.enter()
@@ -0,0 +1,42 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(scope="session")
+def qt_app():
+    from PySide6.QtCore import QCoreApplication
+
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def advance(self, ms, scheduler):
+        self.now += ms
+        scheduler._run_due()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def scheduler(qt_app, clock):
+    from src.scheduler import FrameScheduler
+
+    scheduler = FrameScheduler()
+    # Drive the queue by hand instead of waiting on the QTimer.
+    scheduler._now = lambda: clock.now
+    scheduler._timer.stop = lambda: None
+    yield scheduler
+    scheduler._heap.clear()
+    scheduler._jobs.clear()
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+
+from src.music_player.library import _MIGRATIONS, LibraryIndex
+
+
+def _row(path, size=1, mtime_ns=1, **fields):
+	row = {"path": path, "size": size, "mtime_ns": mtime_ns, "title": "Title", "artist": "Artist"}
+	row.update(fields)
+	return row
+
+
+def test_new_index_applies_every_migration(tmp_path):
+	index = LibraryIndex(tmp_path / "library.db")
+	index.close()
+	conn = sqlite3.connect(tmp_path / "library.db")
+	assert conn.execute("PRAGMA user_version").fetchone()[0] == len(_MIGRATIONS)
+	conn.close()
+
+
+def test_old_index_is_migrated_in_place(tmp_path):
+	db_path = tmp_path / "library.db"
+	conn = sqlite3.connect(db_path)
+	conn.execute(_MIGRATIONS[0])
+	conn.execute("PRAGMA user_version=1")
+	conn.execute(
+		"INSERT INTO tracks (path, size, mtime_ns, title, artist) VALUES (?, ?, ?, ?, ?)",
+		("/music/a.mp3", 10, 5_000_000_000, "A", "B"),
+	)
+	conn.commit()
+	conn.close()
+
+	index = LibraryIndex(db_path)
+	row = index.snapshot()["/music/a.mp3"]
+	assert row["added_at"] == 5.0
+	# Rows from before album tags were read are invalidated so they get parsed again.
+	assert row["mtime_ns"] == -1
+	assert row["album"] is None and row["has_lyrics"] is None
+	index.close()
+
+
+def test_upsert_updates_contents_but_keeps_added_at(tmp_path):
+	index = LibraryIndex(tmp_path / "library.db")
+	index.upsert_many([_row("/music/a.mp3", added_at=1.0, has_lyrics=True)])
+	index.upsert_many([_row("/music/a.mp3", size=2, title="Retagged", added_at=2.0, has_lyrics=False)])
+	row = index.snapshot()["/music/a.mp3"]
+	assert (row["size"], row["title"], row["added_at"]) == (2, "Retagged", 1.0)
+	assert row["has_lyrics"] == 0
+	index.close()
+
+
+def test_remove_many_drops_rows_and_envelopes(tmp_path):
+	index = LibraryIndex(tmp_path / "library.db")
+	index.upsert_many([_row("/music/a.mp3"), _row("/music/b.mp3")])
+	assert index.store_analysis("/music/a.mp3", 1, 1, -3.0, b"env")
+	index.remove_many(["/music/a.mp3"])
+	assert list(index.snapshot()) == ["/music/b.mp3"]
+	assert index.envelope("/music/a.mp3", 1, 1) is None
+	index.close()
+
+
+def test_rows_under_matches_only_that_directory(tmp_path):
+	base = os.path.join(os.sep, "music")
+	inside = [os.path.join(base, "a", "x.mp3"), os.path.join(base, "a", "sub", "y.mp3")]
+	outside = [os.path.join(base, "ab", "z.mp3"), os.path.join(base, "a.mp3")]
+	index = LibraryIndex(tmp_path / "library.db")
+	index.upsert_many(_row(path) for path in inside + outside)
+	assert sorted(index.rows_under(os.path.join(base, "a"))) == sorted(inside)
+	assert sorted(index.rows_under(os.path.join(base, "a") + os.sep)) == sorted(inside)
+	index.close()
+
+
+def test_rows_for_skips_unknown_paths(tmp_path):
+	index = LibraryIndex(tmp_path / "library.db")
+	paths = [f"/music/{n}.mp3" for n in range(1200)]
+	index.upsert_many(_row(path) for path in paths)
+	rows = index.rows_for(paths + ["/music/missing.mp3"])
+	assert len(rows) == len(paths)
+	index.close()
+
+
+def test_store_analysis_ignores_changed_files(tmp_path):
+	index = LibraryIndex(tmp_path / "library.db")
+	index.upsert_many([_row("/music/a.mp3", size=10, mtime_ns=20)])
+	assert not index.store_analysis("/music/a.mp3", 10, 21, -3.0, b"env", 120.0, 0.5)
+	assert index.store_analysis("/music/a.mp3", 10, 20, -3.0, b"env", 120.0, 0.5)
+	row = index.snapshot()["/music/a.mp3"]
+	assert (row["gain"], row["bpm"], row["beat_offset"]) == (-3.0, 120.0, 0.5)
+	assert index.envelope("/music/a.mp3", 10, 20) == b"env"
+	assert index.envelope("/music/a.mp3", 10, 21) is None
+	index.close()
+
+
+def test_unusable_cache_falls_back_to_memory(tmp_path, capsys):
+	(tmp_path / "file").write_text("not a directory")
+	index = LibraryIndex(tmp_path / "file" / "cache" / "library.db")
+	index.upsert_many([_row("/music/a.mp3")])
+	assert list(index.snapshot()) == ["/music/a.mp3"]
+	index.close()
+
+	(tmp_path / "corrupt.db").write_bytes(b"not a database" * 100)
+	index = LibraryIndex(tmp_path / "corrupt.db")
+	assert index.snapshot() == {}
+	index.close()
+	assert capsys.readouterr().out.count("Error opening library index") == 2
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from src.music_player.loudness import MAX_GAIN_DB, LoudnessMeter, gain_for, gain_to_volume
+
+RATE = 48000
+
+
+def _sine(seconds, amplitude, frequency=997.0, rate=RATE):
+	t = np.arange(int(seconds * rate)) / rate
+	return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def _measure(samples, channels, chunk=None):
+	meter = LoudnessMeter(RATE, channels)
+	chunk = chunk or len(samples)
+	for start in range(0, len(samples), chunk):
+		meter.feed(samples[start : start + chunk])
+	return meter.integrated()
+
+
+def test_full_scale_997hz_in_one_channel_reads_minus_3_lufs():
+	# BS.1770 reference: a 0 dBFS 997 Hz sine in a single channel measures -3.01 LKFS.
+	assert _measure(_sine(5.0, 1.0), channels=1) == pytest.approx(-3.01, abs=0.05)
+
+
+def test_stereo_997hz_tracks_level():
+	mono = _sine(5.0, 10 ** (-20 / 20))
+	stereo = np.repeat(mono, 2)
+	assert _measure(stereo, channels=2) == pytest.approx(-20.0, abs=0.05)
+
+
+def test_chunking_does_not_change_the_result():
+	samples = np.repeat(_sine(3.0, 0.3), 2)
+	whole = _measure(samples, channels=2)
+	assert _measure(samples, channels=2, chunk=12_346) == pytest.approx(whole, abs=1e-4)
+
+
+def test_silence_and_short_input_have_no_loudness():
+	assert _measure(np.zeros(RATE * 2, dtype=np.float32), channels=1) is None
+	assert _measure(_sine(0.3, 1.0), channels=1) is None
+
+
+def test_gain_for_clamps_and_handles_unknown():
+	assert gain_for(None) == 0.0
+	assert gain_for(-20.0, target=-14.0) == pytest.approx(6.0)
+	assert gain_for(-60.0, target=-14.0) == MAX_GAIN_DB
+	assert gain_for(10.0, target=-14.0) == -MAX_GAIN_DB
+	assert gain_to_volume(None) == 1.0
+	assert gain_to_volume(-20.0) == pytest.approx(0.1)
@@ -0,0 +1,38 @@
+from src.music_player.lyrics import Lyrics, parse_lrc
+
+
+def test_parse_lrc_sorts_lines_and_expands_repeated_timestamps():
+	lyrics = parse_lrc(
+		"[ar:Someone]\n"
+		"[00:12.50]Second\n"
+		"[00:01.00][00:30.00]Chorus\n"
+		"not a lyric line\n"
+	)
+	assert lyrics.times == [1000, 12500, 30000]
+	assert lyrics.lines == ["Chorus", "Second", "Chorus"]
+
+
+def test_parse_lrc_handles_timestamp_variants():
+	lyrics = parse_lrc("[01:02:50]Colon hundredths\n[1:5]Short\n[00:07.123]<00:07.20>Word <00:08.00>timed\n")
+	assert lyrics.times == [7123, 62500, 65000]
+	assert lyrics.lines == ["Word timed", "Colon hundredths", "Short"]
+
+
+def test_parse_lrc_applies_offset():
+	lyrics = parse_lrc("[offset:+500]\n[00:00.20]First\n[00:02.00]Second\n")
+	assert lyrics.times == [0, 1500]
+
+
+def test_line_at():
+	lyrics = Lyrics([(1000, "one"), (3000, "two")])
+	assert lyrics.line_at(0) == ""
+	assert lyrics.index_at(999) == -1
+	assert lyrics.line_at(1000) == "one"
+	assert lyrics.line_at(2999) == "one"
+	assert lyrics.line_at(3000) == "two"
+	assert lyrics.line_at(10**9) == "two"
+
+
+def test_empty_lyrics_are_falsy():
+	assert not parse_lrc("plain text without timestamps")
+	assert len(Lyrics()) == 0
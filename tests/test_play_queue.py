@@ -0,0 +1,90 @@
+from src.music_player.play_queue import PlayQueue
+from src.music_player.playlist_control import Track
+
+
+def _tracks(count):
+	return [Track(f"/music/{n}.mp3", f"Song {n}", "Artist") for n in range(count)]
+
+
+def _play_shuffled(queue):
+	track = queue.next_shuffled()
+	queue.visit(track)
+	return track
+
+
+def test_shuffle_plays_every_track_once_per_cycle():
+	tracks = _tracks(8)
+	queue = PlayQueue()
+	queue.reset(tracks)
+	played = [_play_shuffled(queue) for _ in tracks]
+	assert sorted(played, key=tracks.index) == tracks
+	# The next cycle starts without repeating the track that just played.
+	assert queue.next_shuffled() is not played[-1]
+
+
+def test_peek_is_stable_until_visited():
+	queue = PlayQueue()
+	queue.reset(_tracks(8))
+	peeked = queue.next_shuffled()
+	assert all(queue.next_shuffled() is peeked for _ in range(5))
+	queue.visit(peeked)
+	assert queue.next_shuffled() is not peeked
+
+
+def test_discard_keeps_the_peeked_track():
+	for _ in range(200):
+		tracks = _tracks(10)
+		queue = PlayQueue()
+		queue.reset(tracks)
+		_play_shuffled(queue)
+		peeked = queue.next_shuffled()
+		queue.discard([track for track in tracks if track is not peeked][:6])
+		assert queue.next_shuffled() is peeked
+
+
+def test_discarding_the_peeked_track_draws_another():
+	tracks = _tracks(4)
+	queue = PlayQueue()
+	queue.reset(tracks)
+	peeked = queue.next_shuffled()
+	queue.discard([peeked])
+	assert peeked not in queue
+	drawn = queue.next_shuffled()
+	assert drawn in queue and drawn is not peeked
+	assert len(queue) == 3
+
+
+def test_discarding_the_current_track_clears_it():
+	queue = PlayQueue()
+	queue.reset(_tracks(3))
+	current = _play_shuffled(queue)
+	queue.discard([current])
+	assert queue.current is None
+
+
+def test_user_queue_takes_priority_and_skips_removed_tracks():
+	a, b, c = _tracks(3)
+	queue = PlayQueue()
+	queue.reset([a, b, c])
+	queue.enqueue(a)
+	queue.enqueue(b)
+	queue.play_next(c)
+	assert queue.upcoming() == [c, a, b]
+	queue.discard([c])
+	assert queue.peek_queued() is a
+	assert queue.next_queued() is a
+	assert queue.next_queued() is b
+	assert queue.next_queued() is None
+
+
+def test_previous_steps_back_and_next_retraces():
+	a, b, c = _tracks(3)
+	queue = PlayQueue()
+	queue.reset([a, b, c])
+	for track in (a, b, c):
+		queue.visit(track)
+	assert queue.previous() is b
+	assert queue.previous() is a
+	assert queue.next_shuffled() is b
+	queue.visit(b)
+	assert queue.next_shuffled() is c
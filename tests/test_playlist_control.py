@@ -0,0 +1,23 @@
+from src.music_player import playlist_control
+from src.music_player.library import LibraryIndex
+from src.music_player.scan_worker import read_index_row
+
+
+def test_serial_scan_skips_unreadable_files(tmp_path, monkeypatch, capsys):
+	def flaky(path, stat):
+		if path.name == "broken.mp3":
+			raise ValueError("unreadable")
+		return read_index_row(path, stat)
+
+	music = tmp_path / "music"
+	music.mkdir()
+	for name in ("a.mp3", "broken.mp3", "b.mp3"):
+		(music / name).write_bytes(b"not really audio")
+	monkeypatch.setattr(playlist_control, "read_index_row", flaky)
+	library = LibraryIndex(tmp_path / "library.db")
+
+	songs = playlist_control.scan_music_directory(music, library)
+	assert sorted(song.path for song in songs) == [str(music / "a.mp3"), str(music / "b.mp3")]
+	assert str(music / "broken.mp3") not in library.snapshot()
+	assert "Error reading tags for" in capsys.readouterr().out
+	library.close()
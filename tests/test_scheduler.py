@@ -0,0 +1,105 @@
+from PySide6.QtCore import QEventLoop, QTimer
+
+from src.scheduler import COALESCE_MS, FrameScheduler
+
+
+def test_call_later_runs_once_when_due(scheduler, clock):
+    runs = []
+    scheduler.call_later(100, lambda: runs.append(clock.now))
+    clock.advance(50, scheduler)
+    assert runs == []
+    clock.advance(50, scheduler)
+    clock.advance(100, scheduler)
+    assert runs == [100]
+    assert scheduler.stats()["pending"] == 0
+
+
+def test_keyed_call_replaces_pending_run(scheduler, clock):
+    runs = []
+    scheduler.call_later(100, lambda: runs.append("first"), key="step")
+    scheduler.call_later(200, lambda: runs.append("second"), key="step")
+    clock.advance(100, scheduler)
+    assert runs == [] and scheduler.is_active("step")
+    clock.advance(100, scheduler)
+    assert runs == ["second"] and not scheduler.is_active("step")
+
+
+def test_jobs_due_together_share_a_wakeup(scheduler, clock):
+    runs = []
+    scheduler.call_later(100, lambda: runs.append("a"))
+    scheduler.call_later(100 + COALESCE_MS, lambda: runs.append("b"))
+    scheduler.call_later(100 + 2 * COALESCE_MS + 1, lambda: runs.append("c"))
+    clock.advance(100, scheduler)
+    assert runs == ["a", "b"]
+    assert scheduler.wakeups == 1
+
+
+def test_call_every_repeats_until_cancelled(scheduler, clock):
+    runs = []
+    scheduler.call_every(100, lambda: runs.append(clock.now), key="tick")
+    for _ in range(3):
+        clock.advance(100, scheduler)
+    scheduler.cancel("tick")
+    clock.advance(100, scheduler)
+    assert runs == [100, 200, 300]
+
+
+def test_throttle_stretches_delays(scheduler, clock):
+    runs = []
+    scheduler.set_throttle(4)
+    scheduler.call_later(100, lambda: runs.append(clock.now))
+    clock.advance(300, scheduler)
+    assert runs == []
+    clock.advance(100, scheduler)
+    assert runs == [400]
+    scheduler.set_throttle(0.5)
+    assert scheduler.stats()["throttle"] == 1.0
+
+
+def test_failing_job_does_not_stop_the_batch(scheduler, clock, capsys):
+    runs = []
+    scheduler.call_later(10, lambda: 1 / 0)
+    scheduler.call_later(10, lambda: runs.append("ran"))
+    clock.advance(10, scheduler)
+    assert runs == ["ran"]
+    assert "Error in scheduled task" in capsys.readouterr().out
+
+
+def test_job_cancelled_earlier_in_the_batch_is_skipped(scheduler, clock):
+    runs = []
+    scheduler.call_later(10, lambda: scheduler.cancel("later"))
+    scheduler.call_later(10, lambda: runs.append("later"), key="later")
+    clock.advance(10, scheduler)
+    assert runs == []
+
+
+def test_nested_event_loop_keeps_running_jobs(qt_app):
+    # A callback that blocks in a nested event loop, like ``QDialog.exec()``,
+    # must not stall the rest of the queue.
+    scheduler = FrameScheduler()
+    ticks = []
+    during = []
+    outer = QEventLoop()
+
+    def modal():
+        nested = QEventLoop()
+        QTimer.singleShot(300, nested.quit)
+        start = len(ticks)
+        nested.exec()
+        during.append(len(ticks) - start)
+        outer.quit()
+
+    scheduler.call_every(20, lambda: ticks.append(1), key="tick")
+    scheduler.call_later(10, modal)
+    QTimer.singleShot(5000, outer.quit)
+    outer.exec()
+    scheduler.cancel("tick")
+    assert during and during[0] >= 5
+
+
+def test_short_intervals_wait_for_the_next_wakeup(scheduler, clock):
+    runs = []
+    scheduler.call_every(5, lambda: runs.append(clock.now), key="fast")
+    clock.advance(5, scheduler)
+    clock.advance(5, scheduler)
+    assert runs == [5, 10]
@@ -0,0 +1,63 @@
+from src.music_player.playlist_control import Track
+from src.music_player.search import TrackSearchIndex, normalize_text
+
+
+def _index():
+	tracks = {
+		"tho": Track("/music/nang_tho.mp3", "Nàng Thơ", "Hoàng Dũng", added_at=3.0),
+		"blue": Track("/music/blue.flac", "Blue in Green", "Miles Davis", added_at=1.0),
+		"so": Track("/music/so_what.mp3", "So What", "Miles Davis", added_at=2.0),
+	}
+	index = TrackSearchIndex()
+	index.add(tracks.values())
+	return index, tracks
+
+
+def test_normalize_text_folds_case_and_accents():
+	assert normalize_text("Nàng THƠ") == "nang tho"
+
+
+def test_search_ignores_accents_and_case():
+	index, tracks = _index()
+	assert index.search("NANG tho") == {tracks["tho"]}
+
+
+def test_every_word_must_match():
+	index, tracks = _index()
+	assert index.search("miles") == {tracks["blue"], tracks["so"]}
+	assert index.search("miles green") == {tracks["blue"]}
+	assert index.search("miles zebra") == set()
+
+
+def test_short_terms_and_filenames_match():
+	index, tracks = _index()
+	assert index.search("so") == {tracks["so"]}
+	assert index.search("flac") == {tracks["blue"]}
+
+
+def test_long_terms_are_verified_beyond_trigrams():
+	index, tracks = _index()
+	# Every trigram of "whatso" occurs in "so_what.mp3", but the word itself does not.
+	assert index.search("whatso") == set()
+
+
+def test_empty_query_returns_none():
+	index, _ = _index()
+	assert index.search("   ") is None
+
+
+def test_remove_drops_tracks_from_results():
+	index, tracks = _index()
+	assert index.search("mi") == {tracks["blue"], tracks["so"]}
+	index.remove([tracks["so"]])
+	assert index.search("miles") == {tracks["blue"]}
+	assert index.search("mi") == {tracks["blue"]}
+	assert len(index) == 2
+
+
+def test_sort_keys():
+	index, tracks = _index()
+	songs = list(tracks.values())
+	assert sorted(songs, key=index.sort_key("title")) == [tracks["blue"], tracks["tho"], tracks["so"]]
+	assert sorted(songs, key=index.sort_key("added")) == [tracks["tho"], tracks["so"], tracks["blue"]]
+	assert sorted(songs, key=index.sort_key("unknown")) == sorted(songs, key=index.sort_key("title"))
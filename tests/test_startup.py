@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_pet_import_does_not_load_the_media_backend():
+    # A fresh interpreter, so modules imported by other tests do not count.
+    code = (
+        "import sys, src.desktop_pet\n"
+        "loaded = [m for m in sys.modules if 'QtMultimedia' in m or m == 'src.music_player.music_player']\n"
+        "print(','.join(loaded))\n"
+    )
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
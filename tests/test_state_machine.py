@@ -0,0 +1,60 @@
+from src.state_machine import StateMachine
+
+
+def _machine(scheduler, log):
+    machine = StateMachine(scheduler)
+    for name, targets in (("idle", ("walk", "sleep")), ("walk", ("idle",)), ("sleep", ("idle",))):
+        machine.add_state(
+            name,
+            targets,
+            enter=lambda name=name: log.append(f"enter {name}"),
+            exit=lambda name=name: log.append(f"exit {name}"),
+        )
+    return machine
+
+
+def test_transitions_follow_the_table(scheduler):
+    log = []
+    machine = _machine(scheduler, log)
+    machine.start("idle")
+    assert machine.transition("walk")
+    assert not machine.transition("sleep")
+    assert machine.state == "walk"
+    assert machine.transition("idle")
+    assert log == ["enter idle", "exit idle", "enter walk", "exit walk", "enter idle"]
+
+    stats = machine.stats()
+    assert stats["transitions"] == {"idle->walk": 1, "walk->idle": 1}
+    assert stats["refused"] == {"walk->sleep": 1}
+    assert stats["entries"] == {"idle": 2, "walk": 1}
+
+
+def test_state_timers_are_cancelled_on_exit(scheduler, clock):
+    runs = []
+    machine = _machine(scheduler, [])
+    machine.start("idle")
+    machine.after(100, lambda: runs.append("idle step"), key="step")
+    machine.every(50, lambda: runs.append("blink"), key="blink", within=("idle", "walk"))
+    machine.transition("walk")
+    assert not machine.is_pending("step")
+    assert machine.is_pending("blink")
+    clock.advance(50, scheduler)
+    clock.advance(50, scheduler)
+    assert runs == ["blink", "blink"]
+    machine.transition("idle")
+    machine.transition("sleep")
+    assert not machine.is_pending("blink")
+    runs.clear()
+    clock.advance(500, scheduler)
+    assert runs == []
+
+
+def test_unkeyed_timers_belong_to_the_current_state(scheduler, clock):
+    runs = []
+    machine = _machine(scheduler, [])
+    machine.start("idle")
+    machine.after(100, lambda: runs.append("idle"))
+    machine.transition("walk")
+    machine.after(100, lambda: runs.append("walk"))
+    clock.advance(100, scheduler)
+    assert runs == ["walk"]
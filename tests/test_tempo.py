@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.music_player.tempo import TempoTracker
+
+RATE = 44100
+
+
+def _click_track(bpm, seconds, offset, channels=2):
+	samples = np.zeros(int(seconds * RATE), dtype=np.float32)
+	rng = np.random.default_rng(0)
+	burst = (rng.uniform(-1.0, 1.0, int(0.01 * RATE)) * np.hanning(int(0.01 * RATE))).astype(np.float32)
+	period = 60.0 / bpm
+	time = offset
+	while time + 0.01 < seconds:
+		start = int(time * RATE)
+		samples[start : start + len(burst)] += burst
+		time += period
+	return np.repeat(samples, channels)
+
+
+def _track(samples, chunk=16_384):
+	tracker = TempoTracker(RATE, 2)
+	for start in range(0, len(samples), chunk):
+		tracker.feed(samples[start : start + chunk])
+	return tracker.result()
+
+
+@pytest.mark.parametrize("bpm", [70.0, 100.0, 120.0, 140.0, 150.0, 165.0, 180.0])
+def test_click_track_tempo(bpm):
+	grid = _track(_click_track(bpm, 20.0, offset=0.1))
+	assert grid is not None
+	assert grid.bpm == pytest.approx(bpm, abs=1.0)
+
+
+def test_slow_pulse_is_not_doubled():
+	# Nothing falls between the beats, so the half lag must not win.
+	grid = _track(_click_track(75.0, 20.0, offset=0.1))
+	assert grid.bpm == pytest.approx(75.0, abs=1.0)
+
+
+def test_click_track_phase():
+	period = 0.5
+	grid = _track(_click_track(120.0, 20.0, offset=0.2))
+	distance = abs(grid.offset - 0.2) % period
+	assert min(distance, period - distance) < 0.03
+
+
+def test_short_or_silent_input_has_no_grid():
+	assert _track(_click_track(120.0, 5.0, offset=0.0)) is None
+	assert _track(np.zeros(RATE * 2 * 15, dtype=np.float32)) is None
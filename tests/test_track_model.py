@@ -0,0 +1,57 @@
+import pytest
+
+from src.music_player.playlist_control import Track
+from src.music_player.search import TrackSearchIndex
+from src.music_player.track_model import TrackTableModel
+
+
+def _track(title, duration):
+	return Track(f"/music/{title}.mp3", title, "Artist", duration)
+
+
+@pytest.fixture
+def model(qt_app):
+	model = TrackTableModel()
+	model.resets = 0
+	model.modelReset.connect(lambda: setattr(model, "resets", model.resets + 1))
+	return model
+
+
+def test_totals_follow_appends_and_removals(model):
+	model.append([_track("a", 10.0), _track("b", 20.0)])
+	model.append([_track("c", None)])
+	assert model.visible_seconds() == 30.0
+	model.remove_rows([0])
+	assert model.visible_seconds() == 20.0
+	assert model.resets == 0
+
+
+def test_append_while_filtered_shows_only_matches(model):
+	index = TrackSearchIndex()
+	first = [_track("red", 10.0), _track("blue", 20.0)]
+	index.add(first)
+	model.append(first)
+	model.set_filter(index.search("red"))
+	resets = model.resets
+
+	batch = [_track("red two", 5.0), _track("green", 7.0)]
+	index.add(batch)
+	model.append(batch, index.matching("red", batch))
+	assert model.resets == resets
+	assert [track.title for track in model.visible_tracks()] == ["red", "red two"]
+	assert model.visible_seconds() == 15.0
+	assert model.source_row(1) == 2
+
+	# Appended matches survive a reorder, and the visible total carries over.
+	model.sort_by(lambda track: track.title)
+	assert [track.title for track in model.visible_tracks()] == ["red", "red two"]
+	assert model.visible_seconds() == 15.0
+
+
+def test_removing_filtered_rows_updates_the_visible_total(model):
+	tracks = [_track("red", 10.0), _track("blue", 20.0), _track("red two", 5.0)]
+	model.append(tracks)
+	model.set_filter({tracks[0], tracks[2]})
+	model.remove_rows([0, 1])
+	assert [track.title for track in model.visible_tracks()] == ["red two"]
+	assert model.visible_seconds() == 5.0
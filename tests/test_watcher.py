@@ -0,0 +1,79 @@
+import pytest
+
+from src.music_player import watcher as watcher_module
+from src.music_player.library import LibraryIndex
+from src.music_player.watcher import WATCH_RETRY_LIMIT, LibraryWatcher
+
+
+def _fake_row(path, stat):
+	if path.name.startswith("broken"):
+		raise ValueError("unreadable")
+	return {
+		"path": str(path),
+		"size": stat.st_size,
+		"mtime_ns": stat.st_mtime_ns,
+		"title": path.stem,
+		"artist": "Artist",
+		"duration": 1.0,
+		"art_hash": None,
+	}
+
+
+@pytest.fixture
+def watcher(qt_app, tmp_path, monkeypatch):
+	monkeypatch.setattr(watcher_module, "read_index_row", _fake_row)
+	library = LibraryIndex(tmp_path / "library.db")
+	watcher = LibraryWatcher(library)
+	yield watcher
+	watcher.stop()
+	library.close()
+
+
+def _sync(watcher, directory):
+	return watcher._diff([str(directory)], {str(directory)})
+
+
+def test_unreadable_file_does_not_drop_the_batch(watcher, tmp_path, capsys):
+	music = tmp_path / "music"
+	music.mkdir()
+	(music / "good.mp3").write_bytes(b"a")
+	(music / "broken.mp3").write_bytes(b"b")
+	added, removed, updated, new_dirs, gone_dirs, failed = _sync(watcher, music)
+	assert [track.title for track in added] == ["good"]
+	assert failed == [str(music)]
+	assert list(watcher.library.snapshot()) == [str(music / "good.mp3")]
+	assert "Error reading tags" in capsys.readouterr().out
+
+
+def test_failed_directories_are_retried_a_bounded_number_of_times(watcher, tmp_path, capsys):
+	directory = str(tmp_path)
+	for _ in range(WATCH_RETRY_LIMIT):
+		watcher._apply_synced([directory], [], [], [], [], [], [directory])
+		assert watcher._dirty == {directory}
+		watcher._dirty.clear()
+	watcher._apply_synced([directory], [], [], [], [], [], [directory])
+	assert watcher._dirty == set()
+	assert "giving up" in capsys.readouterr().out
+
+
+def test_sidecar_changes_refresh_their_tracks(watcher, tmp_path):
+	music = tmp_path / "music"
+	music.mkdir()
+	(music / "one.mp3").write_bytes(b"a")
+	(music / "two.mp3").write_bytes(b"b")
+	_sync(watcher, music)
+	watcher._remember_sidecars([str(music)])
+
+	(music / "one.lrc").write_text("[00:01.00]Hello")
+	_, _, updated, _, _, _ = _sync(watcher, music)
+	assert [(old, track.lyrics_path) for old, track in updated] == [
+		(str(music / "one.mp3"), str(music / "one.lrc"))
+	]
+
+	(music / "cover.jpg").write_bytes(b"jpg")
+	_, _, updated, _, _, _ = _sync(watcher, music)
+	assert sorted(track.thumbnail_path for _, track in updated) == [str(music / "cover.jpg")] * 2
+
+	(music / "one.lrc").unlink()
+	_, _, updated, _, _, _ = _sync(watcher, music)
+	assert [(old, track.lyrics_path) for old, track in updated] == [(str(music / "one.mp3"), None)]